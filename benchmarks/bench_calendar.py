@@ -0,0 +1,55 @@
+"""Calendar call latency with a fresh client per call vs the shared cached client.
+
+Runs against benchmarks.fake_calendar, so no Google account is needed.
+Run from the repository root: python -m benchmarks.bench_calendar
+"""
+import statistics
+import threading
+import time
+from google.auth.credentials import AnonymousCredentials
+from benchmarks.fake_calendar import FakeCalendarServer
+from modules.calendar_client import CalendarClient, set_calendar_client
+from modules.reminders import fetch_reminders_for_period, set_google_reminder
+
+CALLS = 50
+THREADS = 4
+
+def timed(func, calls):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def report(label, samples):
+    print(f"{label:<32} mean={statistics.mean(samples):7.2f} ms  p50={statistics.median(samples):7.2f} ms  max={max(samples):7.2f} ms")
+
+if __name__ == "__main__":
+    server = FakeCalendarServer().start()
+    make_client = lambda: CalendarClient(credentials=AnonymousCredentials(), api_endpoint=server.endpoint)
+    set_calendar_client(make_client())
+    set_google_reminder(time.strftime('%Y-%m-%d'), '11:59 PM', 'Benchmark reminder', False)
+
+    def fresh_client_call():
+        set_calendar_client(make_client())
+        fetch_reminders_for_period('day')
+
+    report("fresh client per call", timed(fresh_client_call, CALLS))
+    set_calendar_client(make_client())
+    report("shared cached client", timed(lambda: fetch_reminders_for_period('day'), CALLS))
+
+    errors = []
+    def worker():
+        try:
+            timed(lambda: fetch_reminders_for_period('week'), CALLS)
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"{THREADS} threads x {CALLS} calls: {time.perf_counter() - start:.2f} s, errors={len(errors)}")
+    server.stop()
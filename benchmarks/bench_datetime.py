@@ -0,0 +1,129 @@
+"""Accuracy and latency of reminder datetime parsing on a labeled corpus.
+
+Compares the old extract_datetime (a new parsedatetime Calendar and regex fixups per
+call) with modules.datetime_parser, cold, memoized and in batch. Every phrase is
+resolved as if said on Sunday 2026-12-20 at 16:30, so month and year roll-overs are
+exercised.
+Run from the repository root: python -m benchmarks.bench_datetime [--min-accuracy 1.0]
+"""
+import argparse
+import datetime
+import re
+import statistics
+import sys
+import time
+import parsedatetime as pdt
+from modules.datetime_parser import DatetimeParser
+
+NOW = datetime.datetime(2026, 12, 20, 16, 30)
+
+# (phrase, expected datetime, recurring[, time said if not NOW])
+CORPUS = [
+    ("Remind me to drink water at 5 pm", "2026-12-20 17:00", False),
+    ("Remind me to pick up the kids at 3:15 pm", "2026-12-21 15:15", False),
+    ("Set a reminder to call mom tomorrow at 10 am", "2026-12-21 10:00", False),
+    ("Remind me to take my meds every day at 8 am", "2026-12-21 08:00", True),
+    ("Remind me to water the plants every day at 7 pm", "2026-12-20 19:00", True),
+    ("Remind me to meditate everyday at 6 am", "2026-12-21 06:00", True),
+    ("Add to my reminders to submit the report on the 21st at 3 pm", "2026-12-21 15:00", False),
+    ("Remind me to back up my laptop on the 31st at 8 pm", "2026-12-31 20:00", False),
+    ("Remind me to pay rent on the 1st at 9 am", "2027-01-01 09:00", False),
+    ("Remind me to renew my passport on the 5th at noon", "2027-01-05 12:00", False),
+    ("Remind me to submit the form on the 15th at 4 pm", "2027-01-15 16:00", False),
+    ("Remind me to call grandma on the 20th at 5 pm", "2026-12-20 17:00", False),
+    ("Remind me to book flights on the 5th of january at 9 am", "2027-01-05 09:00", False),
+    ("Remind me to buy a gift on December 24 at 6 pm", "2026-12-24 18:00", False),
+    ("Remind me to file taxes on January 15 at 10 am", "2027-01-15 10:00", False),
+    ("Remind me to go for a run tomorrow morning", "2026-12-21 06:00", False),
+    ("Remind me to call the dentist next monday", "2026-12-21 09:00", False),
+    ("Remind me to clean the fridge on friday", "2026-12-25 09:00", False),
+    ("Remind me to stretch this evening", "2026-12-20 18:00", False),
+    ("Remind me to read tonight", "2026-12-20 21:00", False),
+    ("Remind me to journal tonight at 10 pm", "2026-12-20 22:00", False),
+    ("Remind me to stand up at 4:45 pm", "2026-12-20 16:45", False),
+    ("Remind me to check the oven in 20 minutes", "2026-12-20 16:50", False),
+    ("Remind me to take a break in 2 hours", "2026-12-20 18:30", False),
+    # Pinned to a day that has already passed: kept rather than moved to tomorrow
+    ("Remind me to stretch this evening", "2026-12-20 18:00", False, NOW.replace(hour=18, minute=30)),
+    ("Remind me to call grandma on the 20th at 8 am", "2026-12-20 08:00", False),
+]
+ROUNDS = 20
+
+def legacy_extract_datetime(user_input, now=NOW):
+    """The original extract_datetime, with `now` injected instead of the system clock"""
+    cal = pdt.Calendar()
+    time_struct, parse_status = cal.parse(user_input, now.timetuple())
+    datetime_obj = datetime.datetime(*time_struct[:6])
+    if datetime_obj.date() < now.date():
+        datetime_obj = datetime_obj.replace(month=datetime_obj.month % 12 + 1)
+    if "on the" in user_input and datetime_obj.day == 1:
+        match = re.search(r"on the (\d+)(st|nd|rd|th)", user_input)
+        if match:
+            datetime_obj = datetime_obj.replace(day=int(match.group(1)))
+    time_adjustments = {"morning": 7, "afternoon": 13, "evening": 19, "night": 21}
+    if datetime_obj.time() == datetime.time(0, 0):
+        for phrase, hour in time_adjustments.items():
+            if phrase in user_input:
+                datetime_obj = datetime_obj.replace(hour=hour)
+                break
+    return datetime_obj, "every day" in user_input or "everyday" in user_input
+
+def accuracy(resolve):
+    """Returns (fraction correct, phrases resolved wrongly as (phrase, got, expected))"""
+    wrong = []
+    for phrase, expected, recurring, *said in CORPUS:
+        try:
+            moment, is_recurring = resolve(phrase, said[0] if said else NOW)
+            got = moment.strftime('%Y-%m-%d %H:%M')
+        except Exception as e:
+            got, is_recurring = f"error: {e}", None
+        if got != expected or is_recurring != recurring:
+            wrong.append((phrase, got + (" (recurring)" if is_recurring else ""), expected))
+    return 1 - len(wrong) / len(CORPUS), wrong
+
+def latencies(resolve, rounds):
+    samples = []
+    for _ in range(rounds):
+        for phrase, _, _, *said in CORPUS:
+            start = time.perf_counter()
+            resolve(phrase, said[0] if said else NOW)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def report(label, score, samples):
+    print(f"{label:<24} accuracy={score:6.1%}  mean={statistics.mean(samples):7.3f} ms  "
+          f"p95={sorted(samples)[int(len(samples) * 0.95) - 1]:7.3f} ms")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--min-accuracy', type=float, default=None, help="fail when the new parser scores lower")
+    args = arg_parser.parse_args()
+    legacy_score, legacy_wrong = accuracy(legacy_extract_datetime)
+    report("before (per-call)", legacy_score, latencies(legacy_extract_datetime, ROUNDS))
+
+    def new_resolve(phrase, now, parser=None):
+        parsed = (parser or datetime_parser).parse(phrase, now=now)
+        return parsed.datetime, parsed.is_recurring
+
+    def cold_resolve(phrase, now):
+        cold_parser.clear()
+        return new_resolve(phrase, now, cold_parser)
+
+    cold_parser = DatetimeParser()
+    score, wrong = accuracy(cold_resolve)
+    report("after (cold cache)", score, latencies(cold_resolve, ROUNDS))
+    datetime_parser = DatetimeParser()
+    report("after (memoized)", score, latencies(new_resolve, ROUNDS))
+    print(f"{'':<24} cache hits={datetime_parser.hits} misses={datetime_parser.misses}")
+
+    batch = [phrase for phrase, *_ in CORPUS] * ROUNDS
+    start = time.perf_counter()
+    DatetimeParser().parse_many(batch, now=NOW)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{'after (parse_many)':<24} {elapsed / len(batch):7.3f} ms/phrase over {len(batch)} phrases")
+
+    for label, mistakes in (("before", legacy_wrong), ("after", wrong)):
+        for phrase, got, expected in mistakes:
+            print(f"  {label} wrong: {phrase!r}: got {got}, expected {expected}")
+    if args.min_accuracy is not None and score < args.min_accuracy:
+        sys.exit(1)
@@ -0,0 +1,47 @@
+"""ElevenLabs request latency: a new connection per request vs the shared pooled client.
+
+On loopback only the TCP handshake is saved; against api.elevenlabs.io every new
+connection also pays for a TLS handshake.
+Runs against benchmarks.fake_elevenlabs, then checks that injected 503s are retried
+and prints the client's per-endpoint latency histograms.
+Run from the repository root: python -m benchmarks.bench_http
+"""
+import statistics
+import time
+import requests
+from benchmarks.fake_elevenlabs import FakeElevenLabsServer
+from modules.http_client import HTTPClient
+
+ROUNDS = 30
+TEXT = "Okay."  # Short, so connection setup is not hidden behind synthesis
+
+def measure(server, post):
+    connections_before = server.connection_count
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        response = post(f"{server.base_url}/text-to-speech/voice/stream", json={'text': TEXT}, stream=True)
+        response.content
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, server.connection_count - connections_before
+
+if __name__ == "__main__":
+    server = FakeElevenLabsServer(first_byte_latency=0.0, realtime_factor=0.0).start()
+    client = HTTPClient(backoff=0.01)
+    for label, post in (("requests.post (new connection)", requests.post), ("pooled HTTPClient", client.post)):
+        samples, connections = measure(server, post)
+        print(f"{label:<32} mean={statistics.mean(samples):6.2f} ms  p95={sorted(samples)[int(len(samples) * 0.95) - 1]:6.2f} ms  "
+              f"connections={connections}")
+
+    server.fail_next(2)
+    response = client.get(f"{server.base_url}/voices", endpoint="voices")
+    print(f"voices after 2 injected 503s: HTTP {response.status_code}, {len(response.json()['voices'])} voices")
+    server.fail_next(10)
+    response = client.get(f"{server.base_url}/voices", endpoint="voices")
+    print(f"voices with the server still failing after the retries: HTTP {response.status_code}")
+
+    for endpoint, summary in client.stats().items():
+        print(f"{endpoint}: count={summary['count']} errors={summary['errors']} retries={summary['retries']} "
+              f"p50<={summary['p50_ms']} ms p95<={summary['p95_ms']} ms max={summary['max_ms']:.1f} ms")
+    client.close()
+    server.stop()
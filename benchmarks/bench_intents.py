@@ -0,0 +1,45 @@
+"""Micro-benchmark: compiled intent classifier vs the old per-call list scans.
+
+Run from the repository root: python -m benchmarks.bench_intents
+"""
+import timeit
+from modules.intents import (CLEAR_INTENT_PHRASES, INQUIRY_PHRASES, VAGUE_PHRASES, STOP_PHRASES,
+                             classify_intent)
+
+CORPUS = [
+    "Remind me to drink water at 5 pm",
+    "Can you set a reminder for my dentist appointment?",
+    "How do I set a reminder?",
+    "I need a reminder",
+    "Set a reminder to call mom tomorrow at 10 am",
+    "What's a good way to start working when I feel stuck?",
+    "Tell me something encouraging",
+    "I keep getting distracted by my phone, any tips?",
+    "goodbye",
+    "Add to my reminders to submit the report on the 21st at 3 pm",
+    "Can you help me plan my afternoon so I don't procrastinate on the essay I have due on Friday?",
+    "exit",
+] * 50
+NUMBER = 20
+
+def legacy_classify(user_input):
+    """The old path: stop check, then is_reminder_request, then handle_reminder_request's inquiry scan"""
+    if user_input.lower().strip() in STOP_PHRASES:
+        return 'stop'
+    user_input_lower = user_input.lower()
+    if any(pattern in user_input_lower for pattern in CLEAR_INTENT_PHRASES + INQUIRY_PHRASES + VAGUE_PHRASES):
+        if any(pattern in user_input.lower() for pattern in INQUIRY_PHRASES):
+            return 'reminder_inquiry'
+        return 'reminder_create'
+    return None
+
+def compiled_classify(user_input):
+    intent = classify_intent(user_input)
+    return intent.category if intent else None
+
+if __name__ == "__main__":
+    mismatches = [text for text in set(CORPUS) if legacy_classify(text) != compiled_classify(text)]
+    print(f"{len(set(CORPUS))} distinct utterances, {len(mismatches)} classified differently: {mismatches}")
+    for label, func in (("legacy list scans", legacy_classify), ("compiled classifier", compiled_classify)):
+        seconds = timeit.timeit(lambda: [func(text) for text in CORPUS], number=NUMBER)
+        print(f"{label:<20} {seconds / (NUMBER * len(CORPUS)) * 1e6:6.2f} µs/utterance")
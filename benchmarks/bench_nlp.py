@@ -0,0 +1,53 @@
+"""Per-call latency of reminder extraction: spacy.load per call vs the shared pipeline.
+
+Run from the repository root: python -m benchmarks.bench_nlp
+"""
+import statistics
+import time
+import spacy
+from modules import nlp
+from modules.reminders import extract_reminder_content, extract_reminder_contents, extract_datetime
+
+UTTERANCES = [
+    "Remind me to drink water at 5 pm",
+    "Set a reminder to call mom tomorrow at 10 am",
+    "Remind me to take my meds every day at 8 am",
+    "Add to my reminders to submit the report on the 21st at 3 pm",
+    "Remind me to stretch this evening",
+]
+ROUNDS = 20
+
+def time_calls(func, inputs, rounds):
+    """Returns per-call latencies in milliseconds"""
+    samples = []
+    for _ in range(rounds):
+        for text in inputs:
+            start = time.perf_counter()
+            func(text)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<28} n={len(samples):<4} mean={statistics.mean(samples):8.2f} ms  p50={statistics.median(samples):8.2f} ms  p95={p95:8.2f} ms")
+
+def uncached(text):
+    """Baseline: the old behaviour, loading the full model on every call"""
+    doc = spacy.load(nlp.SPACY_MODEL)(text)
+    return extract_reminder_content(text, extract_datetime(text), doc=doc)
+
+def cached(text):
+    return extract_reminder_content(text, extract_datetime(text))
+
+if __name__ == "__main__":
+    report("before (spacy.load per call)", time_calls(uncached, UTTERANCES, 2))
+    start = time.perf_counter()
+    nlp.warm_up(background=False)
+    print(f"shared pipeline warm-up: {(time.perf_counter() - start) * 1000:.2f} ms")
+    report("after (shared pipeline)", time_calls(cached, UTTERANCES, ROUNDS))
+    batch = UTTERANCES * ROUNDS
+    start = time.perf_counter()
+    extract_reminder_contents(batch)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{'after (nlp.pipe batch)':<28} n={len(batch):<4} mean={elapsed / len(batch):8.2f} ms/utterance")
@@ -0,0 +1,58 @@
+"""Todo list view latency: live Calendar round trip vs the local reminder store.
+
+Runs against benchmarks.fake_calendar, so no Google account is needed. Pass
+--latency to simulate a real network round trip (Google is typically 100-300 ms).
+Run from the repository root: python -m benchmarks.bench_reminder_store [--latency 0.15]
+"""
+import argparse
+import datetime
+import statistics
+import time
+from google.auth.credentials import AnonymousCredentials
+from benchmarks.fake_calendar import FakeCalendarServer
+from modules.calendar_client import CalendarClient, set_calendar_client
+from modules.datetime_parser import RECURRENCE_DAILY, ParsedDatetime
+from modules.reminder_store import ReminderStore, ReminderSync
+from modules.reminders import build_reminder_event, fetch_reminders_for_period, get_period_bounds
+
+def timed(func, calls):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def report(label, samples):
+    print(f"{label:<28} mean={statistics.mean(samples):8.3f} ms  p50={statistics.median(samples):8.3f} ms  max={max(samples):8.3f} ms")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--reminders', type=int, default=200)
+    arg_parser.add_argument('--calls', type=int, default=50)
+    arg_parser.add_argument('--latency', type=float, default=0.0, help="simulated seconds per Calendar request")
+    args = arg_parser.parse_args()
+
+    server = FakeCalendarServer(latency=args.latency).start()
+    set_calendar_client(CalendarClient(credentials=AnonymousCredentials(), api_endpoint=server.endpoint))
+    store = ReminderStore(':memory:')
+    sync = ReminderSync(store)
+    start = datetime.datetime.now().replace(second=0, microsecond=0)
+    for i in range(args.reminders):
+        moment = start + datetime.timedelta(hours=i)
+        store.add(build_reminder_event(f"Reminder {i}", ParsedDatetime(moment, RECURRENCE_DAILY if i % 20 == 0 else None, 1.0)))
+    began = time.perf_counter()
+    sync.sync()
+    print(f"initial push of {args.reminders} reminders: {time.perf_counter() - began:.2f} s, {server.request_count} requests")
+
+    report("live events().list (week)", timed(lambda: fetch_reminders_for_period('week'), args.calls))
+    week_start, week_end = get_period_bounds('week')
+    report("local store (week)", timed(lambda: store.get_reminders(week_start, week_end), args.calls))
+    day_start, day_end = get_period_bounds('day')
+    report("local store (day)", timed(lambda: store.get_reminders(day_start, day_end), args.calls))
+
+    requests_before = server.request_count
+    began = time.perf_counter()
+    sync.sync()
+    print(f"incremental sync with no changes: {(time.perf_counter() - began) * 1000:.1f} ms, {server.request_count - requests_before} request(s)")
+    server.stop()
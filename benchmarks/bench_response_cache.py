@@ -0,0 +1,73 @@
+"""Time spent waiting for answers to a day of repeated questions, with and without the response cache.
+
+Uses benchmarks.fake_openai for completions and embeddings, so no API key or network
+is needed. Each question is asked as a fresh conversation, like small talk at the
+start of a session.
+Run from the repository root: python -m benchmarks.bench_response_cache [--threshold 0.8]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from benchmarks.fake_openai import FakeChatCompletion, FakeEmbedding
+from modules import ai
+from modules.response_cache import ResponseCache
+
+# Groups of rewordings of the same question
+QUESTIONS = [
+    ["What can you do?", "what can you do", "What CAN you do??"],
+    ["How do I set a reminder?", "how do i set up a reminder", "How do I set a reminder"],
+    ["Help me focus", "help me focus please", "Help me focus!"],
+    ["I can't get started on my homework", "i cant get started on my homework"],
+    ["Give me a tip for staying on task", "give me a tip for staying on task."],
+]
+# Unrelated one-off questions
+UNIQUE = ["What should I cook tonight?", "Tell me about black holes", "Plan my Saturday", "Write a haiku about tea",
+          "Why is the sky blue?", "Suggest a name for my cat", "How long should a nap be?", "Explain compound interest"]
+ROUNDS = 60
+
+def workload(seed=1):
+    rng = random.Random(seed)
+    prompts = []
+    for _ in range(ROUNDS):
+        if rng.random() < 0.8:
+            prompts.append(rng.choice(rng.choice(QUESTIONS)))
+        else:
+            prompts.append(rng.choice(UNIQUE))
+    return prompts
+
+def run(prompts):
+    start = time.perf_counter()
+    for prompt in prompts:
+        ai.get_openai_response([("User", prompt)])
+    return (time.perf_counter() - start) * 1000
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--threshold', type=float, default=0.8, help="Similarity threshold (the fake embedding scores lower than real ones)")
+    args = arg_parser.parse_args()
+    completion = FakeChatCompletion(first_token_latency=0.4, token_latency=0.01)
+    embedding = FakeEmbedding(latency=0.05)
+    ai.set_completion_backend(completion.create)
+    ai.set_embedding_backend(embedding.embed)
+    prompts = workload()
+
+    ai.RESPONSE_CACHE = False
+    uncached = run(prompts)
+    print(f"{'no cache':<16} {uncached:8.0f} ms  completions={completion.calls}")
+
+    for label, semantic in (("exact only", False), ("exact+semantic", True)):
+        completion.calls = embedding.calls = 0
+        path = os.path.join(tempfile.mkdtemp(), 'responses.json')
+        ai.RESPONSE_CACHE = True
+        ai._response_cache = ResponseCache(path, threshold=args.threshold,
+                                           embed=embedding.embed if semantic else None)
+        elapsed = run(prompts)
+        stats = ai.response_cache_stats()
+        print(f"{label:<16} {elapsed:8.0f} ms  completions={completion.calls} embeddings={embedding.calls}  "
+              f"hit rate={stats['hit_rate']:.0%} (exact={stats['exact_hits']} semantic={stats['semantic_hits']})  "
+              f"completion time saved={stats['saved_ms']:.0f} ms")
+        ai._response_cache.close()
+        reloaded = ResponseCache(path)
+        print(f"{'':<16} {len(reloaded)} entries reloaded from disk")
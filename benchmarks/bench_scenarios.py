@@ -0,0 +1,208 @@
+"""End-to-end scenario benchmarks with JSON results, for catching regressions on a plain Linux box.
+
+Drives process_input, create_reminder, get_reminders_for_period and speak against
+benchmarks.fake_openai, benchmarks.fake_calendar and benchmarks.fake_elevenlabs, so
+it needs no API keys, Google account, network or sound card. Each scenario runs in
+latency mode (one operation at a time) and throughput mode (--workers threads).
+The reminder store lives in a temporary database.
+
+Results, including per-stage p50/p95 from modules.tracing, are written with --output.
+Pass a previous run as --baseline to exit with status 1 when a p95 latency or a
+throughput got more than --max-regression worse.
+Run from the repository root: python -m benchmarks.bench_scenarios [--output results.json] [--baseline old.json]
+"""
+import os
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from google.auth.credentials import AnonymousCredentials
+from benchmarks import fake_elevenlabs
+from benchmarks.fake_calendar import FakeCalendarServer
+from benchmarks.fake_elevenlabs import FakeElevenLabsServer
+from benchmarks.fake_openai import FakeChatCompletion
+from modules import ai, reminder_store, tracing, utils
+from modules.calendar_client import CalendarClient, set_calendar_client
+from modules.datetime_parser import RECURRENCE_DAILY, ParsedDatetime
+from modules.process_input import process_input
+from modules.reminders import build_reminder_event, create_reminder, get_reminders_for_period
+
+SCENARIOS = ['process_input', 'create_reminder', 'get_reminders_for_period', 'speak']
+MODES = ['latency', 'throughput']
+
+CHATS = ["Help me focus", "What can you do?", "Give me a tip for staying on task",
+         "I can't get started on my homework", "Plan my Saturday"]
+DICTATIONS = ["Remind me to drink water at 5 pm", "Set a reminder to call mom tomorrow at 10 am",
+              "Remind me to take my meds every day at 8 am", "Remind me to pay rent on the 1st at 9 am",
+              "Remind me to clean the fridge on friday"]
+PERIODS = ['day', 'week']
+SPEECH = ["Reminder saved successfully.", "How can I help you today?", "Let's start with the easiest task."]
+STORED_REMINDERS = 200
+SPEECH_SECONDS_PER_CHAR = 0.005  # Keeps playback short; the request and first audio dominate
+
+# ======================== Scenarios ========================
+
+def run_process_input(i):
+    return process_input(CHATS[i % len(CHATS)], [])
+
+def run_create_reminder(i):
+    return create_reminder(DICTATIONS[i % len(DICTATIONS)])
+
+def run_get_reminders_for_period(i):
+    return get_reminders_for_period(PERIODS[i % len(PERIODS)])
+
+def run_speak(i):
+    return utils.speak(SPEECH[i % len(SPEECH)])
+
+RUNNERS = {
+    'process_input': run_process_input,
+    'create_reminder': run_create_reminder,
+    'get_reminders_for_period': run_get_reminders_for_period,
+    'speak': run_speak,
+}
+
+def setup(args, workdir):
+    """Starts the fakes and points the app's clients and the reminder store at them"""
+    ai.RESPONSE_CACHE = False
+    ai.set_completion_backend(FakeChatCompletion(first_token_latency=args.openai_latency, token_latency=0.002,
+                                                 jitter=args.jitter).create)
+    calendar = FakeCalendarServer(latency=args.calendar_latency, jitter=args.jitter).start()
+    set_calendar_client(CalendarClient(credentials=AnonymousCredentials(), api_endpoint=calendar.endpoint))
+    store = reminder_store.ReminderStore(os.path.join(workdir, 'reminders.db'))
+    start = datetime.datetime.now().replace(second=0, microsecond=0)
+    for i in range(STORED_REMINDERS):
+        moment = start + datetime.timedelta(hours=i)
+        store.add(build_reminder_event(f"Reminder {i}", ParsedDatetime(moment, RECURRENCE_DAILY if i % 20 == 0 else None, 1.0)))
+    sync = reminder_store.ReminderSync(store)
+    sync.sync()
+    reminder_store._store, reminder_store._sync = store, sync.start()
+
+    fake_elevenlabs.SECONDS_PER_CHAR = SPEECH_SECONDS_PER_CHAR
+    tts = FakeElevenLabsServer(first_byte_latency=args.tts_latency, jitter=args.jitter).start()
+    utils.ELEVENLABS_API_URL = tts.base_url
+    utils.TTS_ENGINE = 2
+    utils.TTS_CACHE = False
+    utils.init_audio()
+    return [calendar, tts], sync
+
+# ======================== Measurement ========================
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[max(int(len(ordered) * fraction) - 1, 0)]
+
+def measure_latency(run, operations):
+    samples = []
+    for i in range(operations):
+        start = time.perf_counter()
+        run(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'operations': operations,
+        'mean_ms': statistics.mean(samples),
+        'p50_ms': statistics.median(samples),
+        'p95_ms': percentile(samples, 0.95),
+        'max_ms': max(samples),
+    }
+
+def measure_throughput(run, operations, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(run, range(operations)))
+    elapsed = time.perf_counter() - start
+    return {'operations': operations, 'workers': workers, 'seconds': elapsed, 'ops_per_sec': operations / elapsed}
+
+def run_scenario(name, mode, args):
+    tracing.get_tracer().clear()
+    run = RUNNERS[name]
+    try:
+        run(0)  # Warm up: first connections, lazy imports, the speech worker
+        tracing.get_tracer().clear()
+        if mode == 'latency':
+            result = measure_latency(run, args.operations)
+        else:
+            result = measure_throughput(run, args.operations, args.workers)
+    except Exception as e:
+        return {'error': repr(e)}
+    result['stages'] = {stage: {'count': stats['count'], 'p50_ms': stats['p50'], 'p95_ms': stats['p95']}
+                        for stage, stats in tracing.get_tracer().summary().items()}
+    return result
+
+# ======================== Comparison ========================
+
+def regressions(results, baseline, max_regression):
+    """Returns a message for every p95 latency or throughput more than max_regression worse than baseline"""
+    found = []
+    for name, modes in results.items():
+        for mode, result in modes.items():
+            before = baseline.get(name, {}).get(mode, {})
+            if 'error' in result or 'error' in before:
+                continue
+            if mode == 'latency' and 'p95_ms' in before and result['p95_ms'] > before['p95_ms'] * (1 + max_regression):
+                found.append(f"{name} {mode}: p95 {before['p95_ms']:.1f} -> {result['p95_ms']:.1f} ms")
+            if mode == 'throughput' and 'ops_per_sec' in before and result['ops_per_sec'] < before['ops_per_sec'] * (1 - max_regression):
+                found.append(f"{name} {mode}: {before['ops_per_sec']:.1f} -> {result['ops_per_sec']:.1f} ops/s")
+    return found
+
+def report(name, mode, result):
+    if 'error' in result:
+        print(f"{name:<26} {mode:<10} failed: {result['error']}")
+    elif mode == 'latency':
+        print(f"{name:<26} {mode:<10} mean={result['mean_ms']:8.2f} ms  p50={result['p50_ms']:8.2f} ms  "
+              f"p95={result['p95_ms']:8.2f} ms  max={result['max_ms']:8.2f} ms")
+    else:
+        print(f"{name:<26} {mode:<10} {result['ops_per_sec']:8.1f} ops/s with {result['workers']} workers")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    arg_parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    arg_parser.add_argument('--operations', type=int, default=40, help="operations per scenario and mode")
+    arg_parser.add_argument('--workers', type=int, default=8, help="threads in throughput mode")
+    arg_parser.add_argument('--openai-latency', type=float, default=0.3, help="seconds to the first completion token")
+    arg_parser.add_argument('--calendar-latency', type=float, default=0.1, help="seconds per Calendar request")
+    arg_parser.add_argument('--tts-latency', type=float, default=0.2, help="seconds to the first ElevenLabs audio byte")
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help="uniform +/- seconds added to every fake latency")
+    arg_parser.add_argument('--output', default=None, help="write the results here as JSON")
+    arg_parser.add_argument('--baseline', default=None, help="results JSON of an earlier run to compare against")
+    arg_parser.add_argument('--max-regression', type=float, default=0.2, help="tolerated slowdown against the baseline")
+    args = arg_parser.parse_args()
+
+    tracing.set_enabled(True)
+    servers, sync = setup(args, tempfile.mkdtemp())
+    results = {}
+    for name in args.scenarios:
+        for mode in args.modes:
+            results.setdefault(name, {})[mode] = result = run_scenario(name, mode, args)
+            report(name, mode, result)
+    sync.stop()
+    for server in servers:
+        server.stop()
+
+    document = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'args': vars(args),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+        print(f"results written to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f)['results'], args.max_regression)
+        for message in found:
+            print(f"  regression: {message}")
+        if found:
+            sys.exit(1)
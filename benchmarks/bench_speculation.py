@@ -0,0 +1,59 @@
+"""Turn latency and wasted LLM requests of process_input vs the speculative process_input_async.
+
+Uses benchmarks.fake_openai for answers and a temporary reminder store, so no API
+key, Google account or network is needed; the spaCy model must be installed. Each
+input kind is timed separately: dictations that are saved, dictations the reminder
+path can't use (which fall through to the answer), and plain chat.
+Run from the repository root: python -m benchmarks.bench_speculation [--openai-latency 0.5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from benchmarks.fake_openai import FakeChatCompletion
+from modules import ai, reminder_store
+from modules.nlp import warm_up
+from modules.process_input import process_input, process_input_async
+
+INPUTS = {
+    'reminder': ["Remind me to drink water at 5 pm", "Remind me to call mom tomorrow at 10 am",
+                 "Set a reminder to stretch every day at 8 am"],
+    'fall-through': ["Remind me to tomorrow", "Remind me to at 5 pm", "Set a reminder to on friday"],
+    'chat': ["Help me focus", "Give me a tip for staying on task", "What can you do?"],
+}
+ROUNDS = 3
+
+def timed_turns(run, texts):
+    samples = []
+    for _ in range(ROUNDS):
+        for text in texts:
+            start = time.perf_counter()
+            run(text, [])
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--openai-latency', type=float, default=0.5, help="seconds to the first completion token")
+    args = arg_parser.parse_args()
+    completion = FakeChatCompletion(first_token_latency=args.openai_latency, token_latency=0.005)
+    ai.set_completion_backend(completion.create)
+    store = reminder_store.ReminderStore(os.path.join(tempfile.mkdtemp(), 'reminders.db'))
+    reminder_store._store, reminder_store._sync = store, reminder_store.ReminderSync(store)  # Never pushed
+    warm_up(background=False)
+
+    loop = asyncio.new_event_loop()  # One long-lived loop; asyncio.run() would wait for discarded answers on exit
+    variants = [("process_input", process_input)]
+    for speculation in ('never', 'inconclusive', 'always'):
+        variants.append((f"async ({speculation})",
+                         lambda text, history, speculation=speculation:
+                         loop.run_until_complete(process_input_async(text, history, speculation))))
+    for kind, texts in INPUTS.items():
+        print(f"{kind}:")
+        for label, run in variants:
+            completion.calls = 0
+            samples = timed_turns(run, texts)
+            print(f"  {label:<22} mean={statistics.mean(samples):8.1f} ms  max={max(samples):8.1f} ms  "
+                  f"LLM requests={completion.calls}/{len(samples)}")
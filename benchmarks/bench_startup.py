@@ -0,0 +1,87 @@
+"""Startup benchmark: import cost of gui.py and time to the first drawn frame.
+
+Imports run in a fresh interpreter under `python -X importtime`, so nothing cached in
+this process skews the numbers. Exits non-zero when a threshold is exceeded, which
+makes it usable as a guard against heavy imports creeping back into startup.
+Run from the repository root: python -m benchmarks.bench_startup [--max-import-ms 500]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+# Libraries that should only load on first use or on a warm-up thread
+HEAVY_MODULES = ['spacy', 'googleapiclient', 'google_auth_oauthlib', 'pygame', 'pyttsx3',
+                 'speech_recognition', 'openai', 'tiktoken', 'playsound', 'requests']
+
+FIRST_FRAME_SCRIPT = """
+import time
+start = time.perf_counter()
+import tkinter as tk
+import gui
+root = tk.Tk()
+root.configure(bg=gui.ChatInterface.BACKGROUND_COLOR)
+chat_interface = gui.ChatInterface(root)
+root.update()
+print(time.perf_counter() - start)
+root.destroy()
+"""
+
+def measure_imports(module):
+    """Imports module in a fresh interpreter and returns {name: cumulative µs} for top-level imports"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            timings[match.group(4)] = int(match.group(2))
+    return timings
+
+def measure_first_frame():
+    """Returns seconds from interpreter start to the first drawn ChatInterface frame, or None without a display"""
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+        return None
+    result = subprocess.run([sys.executable, '-c', FIRST_FRAME_SCRIPT], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"drawing the first frame failed:\n{result.stderr.strip()}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--module', default='gui')
+    arg_parser.add_argument('--top', type=int, default=15, help="number of slowest imports to list")
+    arg_parser.add_argument('--max-import-ms', type=float, default=None, help="fail when importing takes longer")
+    arg_parser.add_argument('--max-first-frame-ms', type=float, default=None, help="fail when the first frame takes longer")
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    timings = measure_imports(args.module)
+    wall = time.perf_counter() - start
+    total_ms = timings.get(args.module, 0) / 1000
+    print(f"import {args.module}: {total_ms:.1f} ms cumulative ({wall * 1000:.0f} ms including interpreter start)")
+    for name, us in sorted(timings.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+    eager = sorted(name for name in timings if name.split('.')[0] in HEAVY_MODULES)
+    if eager:
+        print(f"heavy modules imported eagerly: {', '.join(eager)}")
+
+    first_frame = measure_first_frame()
+    if first_frame is None:
+        print("first frame: skipped (no display)")
+    else:
+        print(f"first frame: {first_frame * 1000:.0f} ms")
+
+    failures = []
+    if args.max_import_ms is not None and total_ms > args.max_import_ms:
+        failures.append(f"import took {total_ms:.1f} ms > {args.max_import_ms} ms")
+    if args.max_first_frame_ms is not None and first_frame is not None and first_frame * 1000 > args.max_first_frame_ms:
+        failures.append(f"first frame took {first_frame * 1000:.0f} ms > {args.max_first_frame_ms} ms")
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
@@ -0,0 +1,30 @@
+"""Perceived latency of a chat turn: blocking completion vs token streaming.
+
+Uses benchmarks.fake_openai, so no API key or network is needed.
+Run from the repository root: python -m benchmarks.bench_streaming
+"""
+import time
+from benchmarks.fake_openai import FakeChatCompletion
+from modules.ai import set_completion_backend, get_openai_response, stream_openai_response
+from modules.utils import SentenceSplitter
+
+if __name__ == "__main__":
+    backend = FakeChatCompletion()
+    set_completion_backend(backend.create)
+    history = [("User", "Help me focus")]
+
+    start = time.perf_counter()
+    get_openai_response(history)
+    blocking = (time.perf_counter() - start) * 1000
+    print(f"blocking: first text shown after {blocking:7.1f} ms, first sentence spoken after {blocking:7.1f} ms")
+
+    start = time.perf_counter()
+    first_token = first_sentence = None
+    splitter = SentenceSplitter()
+    for delta in stream_openai_response(history):
+        now = (time.perf_counter() - start) * 1000
+        first_token = first_token or now
+        if splitter.feed(delta) and first_sentence is None:
+            first_sentence = now
+    total = (time.perf_counter() - start) * 1000
+    print(f"streaming: first text shown after {first_token:6.1f} ms, first sentence spoken after {first_sentence:6.1f} ms, done after {total:7.1f} ms")
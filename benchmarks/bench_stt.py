@@ -0,0 +1,70 @@
+"""Speech-to-text benchmark over a directory of WAV clips.
+
+For each clip the audio is streamed to the backend in microphone-sized chunks as fast
+as possible. Reports the real-time factor (processing time / audio duration) and the
+final-result latency (time from the last chunk to the final transcript). If a clip has
+a matching .txt file next to it, word error rate is reported too.
+Run from the repository root: python -m benchmarks.bench_stt clips/ --backend vosk
+"""
+import argparse
+import glob
+import os
+import statistics
+import time
+import wave
+from modules.utils import get_stt_backend
+
+CHUNK = 1024
+
+def word_errors(reference, hypothesis):
+    """Returns the word-level edit distance between two transcripts"""
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ref_word != hyp_word))
+    return row[-1], len(ref)
+
+def run_clip(backend, path):
+    with wave.open(path, 'rb') as wav:
+        if wav.getnchannels() != 1:
+            raise ValueError(f"{path}: only mono clips are supported")
+        rate, width = wav.getframerate(), wav.getsampwidth()
+        frames = wav.readframes(wav.getnframes())
+    duration = len(frames) / width / rate
+    step = CHUNK * width
+    start = time.perf_counter()
+    stream = backend.open_stream(rate, width)
+    for i in range(0, len(frames), step):
+        stream.feed(frames[i:i + step])
+    last_chunk = time.perf_counter()
+    text = stream.finish() or ''
+    end = time.perf_counter()
+    return text, duration, end - start, end - last_chunk
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('clip_dir')
+    arg_parser.add_argument('--backend', default=None, help="google or vosk (default: STT_BACKEND)")
+    args = arg_parser.parse_args()
+
+    backend = get_stt_backend(args.backend)
+    rtfs, latencies = [], []
+    errors = words = 0
+    for path in sorted(glob.glob(os.path.join(args.clip_dir, '*.wav'))):
+        text, duration, elapsed, latency = run_clip(backend, path)
+        rtfs.append(elapsed / duration)
+        latencies.append(latency * 1000)
+        reference_path = os.path.splitext(path)[0] + '.txt'
+        if os.path.exists(reference_path):
+            with open(reference_path) as f:
+                clip_errors, clip_words = word_errors(f.read(), text)
+            errors += clip_errors
+            words += clip_words
+        print(f"{os.path.basename(path):<30} {duration:6.2f} s audio  RTF={elapsed / duration:5.2f}  latency={latency * 1000:7.1f} ms  \"{text}\"")
+    if rtfs:
+        print(f"\n{backend.name}: {len(rtfs)} clips  mean RTF={statistics.mean(rtfs):.2f}  "
+              f"p50 latency={statistics.median(latencies):.1f} ms  max latency={max(latencies):.1f} ms")
+        if words:
+            print(f"word error rate: {errors / words:.1%}")
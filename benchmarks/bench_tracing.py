@@ -0,0 +1,50 @@
+"""Overhead of the tracing layer, and a sample Chrome trace of a few chat turns.
+
+Uses benchmarks.fake_openai, so no API key or network is needed.
+Run from the repository root: python -m benchmarks.bench_tracing [--trace trace.json]
+"""
+import argparse
+import time
+from benchmarks.fake_openai import FakeChatCompletion
+from modules import tracing
+from modules.ai import set_completion_backend
+from modules.process_input import process_input_stream
+
+CALLS = 200000
+TURNS = ["Help me focus", "What can you do?", "Give me a tip for staying on task"]
+
+@tracing.traced('bench.noop')
+def traced_noop():
+    pass
+
+def noop():
+    pass
+
+def per_call_ns(func):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        func()
+    return (time.perf_counter() - start) * 1e9 / CALLS
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--trace', default=None, help="write a Chrome trace of the sample turns here")
+    args = arg_parser.parse_args()
+
+    baseline = per_call_ns(noop)
+    tracing.set_enabled(False)
+    disabled = per_call_ns(traced_noop)
+    tracing.set_enabled(True)
+    enabled = per_call_ns(traced_noop)
+    print(f"plain call {baseline:6.0f} ns  traced, tracing off {disabled:6.0f} ns  traced, tracing on {enabled:6.0f} ns")
+
+    tracing.get_tracer().clear()
+    set_completion_backend(FakeChatCompletion(first_token_latency=0.05, token_latency=0.002).create)
+    history = []
+    for text in TURNS:
+        for _ in process_input_stream(text, history):
+            pass
+    for stage, stats in sorted(tracing.get_tracer().summary().items()):
+        print(f"{stage:<16} n={stats['count']:<3} p50={stats['p50']:8.2f} ms  p95={stats['p95']:8.2f} ms")
+    if args.trace:
+        print(f"trace written to {tracing.get_tracer().export_chrome_trace(args.trace)}")
@@ -0,0 +1,52 @@
+"""Time-to-first-audio for ElevenLabs TTS: buffered download vs streaming vs cached replay.
+
+Runs against benchmarks.fake_elevenlabs with SDL's dummy audio driver, so it needs
+neither an API key nor a sound card.
+Run from the repository root: python -m benchmarks.bench_tts
+"""
+import os
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import statistics
+import tempfile
+import time
+from benchmarks.fake_elevenlabs import FakeElevenLabsServer
+from modules import utils
+from modules.audio_cache import AudioCache
+
+TEXTS = [
+    "How can I help you today?",
+    "Reminder saved successfully.",
+    "Let's break that task into three small steps and start with the easiest one.",
+]
+ROUNDS = 3
+
+def buffered_ttfa(text):
+    """The old path: audio cannot start before the whole response has arrived"""
+    start = time.perf_counter()
+    utils.request_elevenlabs_audio(text, stream=False).content
+    return (time.perf_counter() - start) * 1000
+
+def streaming_ttfa(text):
+    start = time.perf_counter()
+    first_audio = []
+    utils.speak_elevenlabs(text, on_first_audio=lambda: first_audio.append(time.perf_counter()))
+    return (first_audio[0] - start) * 1000
+
+if __name__ == "__main__":
+    server = FakeElevenLabsServer().start()
+    utils.ELEVENLABS_API_URL = server.base_url
+    utils.TTS_STREAMING = True
+    utils.init_audio()
+    utils.TTS_CACHE = False
+    for label, measure in (("buffered (download then play)", buffered_ttfa), ("streaming", streaming_ttfa)):
+        samples = [measure(text) for _ in range(ROUNDS) for text in TEXTS]
+        print(f"{label:<30} time-to-first-audio mean={statistics.mean(samples):7.1f} ms  max={max(samples):7.1f} ms")
+    utils.TTS_CACHE = True
+    utils._audio_cache = AudioCache(tempfile.mkdtemp())
+    for text in TEXTS:
+        utils.speak_elevenlabs(text)  # Populate the cache
+    requests_before = server.request_count
+    samples = [streaming_ttfa(text) for _ in range(ROUNDS) for text in TEXTS]
+    print(f"{'cached replay':<30} time-to-first-audio mean={statistics.mean(samples):7.1f} ms  max={max(samples):7.1f} ms  "
+          f"API calls={server.request_count - requests_before}")
+    server.stop()
@@ -0,0 +1,43 @@
+"""Runs the voice pipeline headless over WAV files and prints per-stage latency.
+
+The LLM is replaced by benchmarks.fake_openai and TTS by a sleep, so only speech
+recognition can touch the network (nothing does with --fake-stt or --stt vosk).
+Run from the repository root: python -m benchmarks.bench_voice clips/*.wav [--fake-stt]
+"""
+import argparse
+import time
+from benchmarks.fake_openai import FakeChatCompletion
+from modules.ai import set_completion_backend
+from modules.utils import STTBackend, get_stt_backend
+from modules.voice_engine import VoiceEngine, WavSource
+
+class FakeSTT(STTBackend):
+    name = 'fake'
+
+    def transcribe(self, audio):
+        time.sleep(0.3)
+        return "help me focus"
+
+def fake_speak(sentence):
+    time.sleep(0.05 * len(sentence.split()))
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('wav_files', nargs='+')
+    arg_parser.add_argument('--fake-stt', action='store_true', help="skip speech recognition entirely")
+    arg_parser.add_argument('--stt', default=None, help="speech-to-text backend, e.g. google or vosk")
+    arg_parser.add_argument('--realtime', action='store_true', help="feed audio at real-time speed")
+    args = arg_parser.parse_args()
+
+    set_completion_backend(FakeChatCompletion().create)
+    engine = VoiceEngine(
+        [],
+        source=WavSource(args.wav_files, realtime=args.realtime),
+        stt=FakeSTT() if args.fake_stt else get_stt_backend(args.stt),
+        speak_fn=fake_speak,
+    )
+    start = time.perf_counter()
+    engine.start().join()
+    print(f"{len(args.wav_files)} clips in {time.perf_counter() - start:.2f} s")
+    for stage, stats in engine.metrics.summary().items():
+        print(f"{stage:<16} n={stats['count']:<4} mean={stats['mean']:8.1f} ms  p50={stats['p50']:8.1f} ms  p95={stats['p95']:8.1f} ms")
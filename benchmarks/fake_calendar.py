@@ -0,0 +1,213 @@
+"""In-memory stand-in for the Google Calendar v3 events API, served over local HTTP.
+
+Usage:
+    server = FakeCalendarServer(latency=0.05).start()
+    set_calendar_client(CalendarClient(credentials=AnonymousCredentials(), api_endpoint=server.endpoint))
+"""
+import datetime
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+EVENTS_PATH = re.compile(r"/calendar/v3/calendars/(?P<calendar>[^/]+)/events(?:/(?P<event>[^/?]+))?$")
+BATCH_PATH = "/batch/calendar/v3"
+
+class FakeCalendarServer:
+    """Threaded HTTP server holding calendar events in a dict"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0):
+        self.events = {}
+        self.revision = 0  # Bumped on every change; sync tokens are revisions
+        self.latency = latency
+        self.jitter = jitter
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/calendar/v3/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def delay(self):
+        """Sleeps for the configured latency plus uniform jitter"""
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def list_events(self, query):
+        time_min = query.get('timeMin', [None])[0]
+        time_max = query.get('timeMax', [None])[0]
+        sync_token = query.get('syncToken', [None])[0]
+        with self._lock:
+            if sync_token is not None:
+                if not sync_token.isdigit() or int(sync_token) > self.revision:
+                    return None  # Unknown token: the client has to run a full sync
+                items = [self._public(e) for e in self.events.values() if e['_revision'] > int(sync_token)]
+                return {'kind': 'calendar#events', 'items': items, 'nextSyncToken': str(self.revision)}
+            show_deleted = query.get('showDeleted', ['false'])[0] == 'true'
+            items = [self._public(e) for e in self.events.values() if show_deleted or e.get('status') != 'cancelled']
+            revision = self.revision
+        if time_min:
+            items = [e for e in items if e['start'].get('dateTime', '') >= time_min[:19]]
+        if time_max:
+            items = [e for e in items if e['start'].get('dateTime', '') <= time_max[:19]]
+        items.sort(key=lambda e: e['start'].get('dateTime', ''))
+        return {'kind': 'calendar#events', 'items': items, 'nextSyncToken': str(revision)}
+
+    def insert_event(self, body):
+        """Stores a new event; returns None if its client-chosen id is taken"""
+        event = dict(body)
+        event.setdefault('id', uuid.uuid4().hex)
+        event.setdefault('status', 'confirmed')
+        event['htmlLink'] = f"http://localhost/event?eid={event['id']}"
+        with self._lock:
+            if event['id'] in self.events:
+                return None
+            self._store(event)
+        return self._public(event)
+
+    def instance(self, event_id):
+        """Builds one occurrence of a recurring event from its '<series>_<start>' instance id"""
+        series_id, _, stamp = event_id.rpartition('_')
+        series = self.events.get(series_id)
+        if series is None or not series.get('recurrence'):
+            return None
+        try:
+            start = datetime.datetime.strptime(stamp, '%Y%m%dT%H%M%SZ').replace(tzinfo=datetime.timezone.utc)
+        except ValueError:
+            return None
+        original = {'dateTime': start.isoformat(), 'timeZone': series['start'].get('timeZone', 'UTC')}
+        event = {key: value for key, value in series.items() if key not in ('recurrence', '_revision')}
+        event.update(id=event_id, recurringEventId=series_id, originalStartTime=original, start=original, end=original)
+        return event
+
+    def _store(self, event):
+        self.revision += 1
+        event['_revision'] = self.revision
+        self.events[event['id']] = event
+
+    @staticmethod
+    def _public(event):
+        return {key: value for key, value in event.items() if not key.startswith('_')}
+
+    def dispatch(self, method, path, body=None):
+        """Handles one events API call and returns (status, response body)"""
+        url = urlparse(path)
+        match = EVENTS_PATH.match(url.path)
+        if not match:
+            return 404, {'error': {'code': 404, 'message': 'Not Found'}}
+        event_id = match.group('event')
+        if event_id is None and method == 'GET':
+            result = self.list_events(parse_qs(url.query))
+            if result is None:
+                return 410, {'error': {'code': 410, 'message': 'Sync token is no longer valid'}}
+            return 200, result
+        if event_id is None and method == 'POST':
+            event = self.insert_event(body or {})
+            if event is None:
+                return 409, {'error': {'code': 409, 'message': 'The requested identifier already exists.'}}
+            return 200, event
+        with self._lock:
+            event = self.events.get(event_id) or self.instance(event_id)
+        if event is None:
+            return 404, {'error': {'code': 404, 'message': 'Not Found'}}
+        if method == 'GET':
+            return 200, self._public(event)
+        if method in ('PUT', 'PATCH'):
+            with self._lock:
+                event = dict(event, **(body or {})) if method == 'PATCH' else dict(body or {}, id=event_id)
+                self._store(event)
+            return 200, self._public(event)
+        if method == 'DELETE':
+            with self._lock:
+                self._store(dict(event, status='cancelled'))
+            return 204, None
+        return 405, {}
+
+    def dispatch_batch(self, content_type, payload):
+        """Handles a multipart/mixed batch request and returns (content type, multipart response body)"""
+        message = BytesParser().parsebytes(b'Content-Type: ' + content_type.encode() + b'\r\n\r\n' + payload)
+        boundary = uuid.uuid4().hex
+        parts = []
+        for part in message.get_payload():
+            request = part.get_payload()
+            request_line, _, rest = request.partition('\n')
+            method, path, _ = request_line.strip().split(' ', 2)
+            body = re.split(r'\r?\n\r?\n', rest, maxsplit=1)[1] if re.search(r'\r?\n\r?\n', rest) else ''
+            status, result = self.dispatch(method, path, json.loads(body) if body.strip() else None)
+            content_id = part['Content-ID'].strip('<>')
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: application/json\r\n\r\n"
+                f"{json.dumps(result) if result is not None else ''}\r\n")
+        return f'multipart/mixed; boundary="{boundary}"', (''.join(parts) + f"--{boundary}--\r\n").encode('utf-8')
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body=None, content_type='application/json'):
+                if status == 204:
+                    self.send_response(204)
+                    self.end_headers()
+                    return
+                payload = body if isinstance(body, bytes) else json.dumps(body or {}).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _read(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                return self.rfile.read(length)
+
+            def _route(self, method):
+                with server._lock:
+                    server.request_count += 1
+                server.delay()
+                if method == 'POST' and urlparse(self.path).path == BATCH_PATH:
+                    content_type, payload = server.dispatch_batch(self.headers['Content-Type'], self._read())
+                    return self._send(200, payload, content_type)
+                body = self._read() if method in ('POST', 'PUT', 'PATCH') else b''
+                status, result = server.dispatch(method, self.path, json.loads(body) if body else None)
+                return self._send(status, result)
+
+            def do_GET(self):
+                self._route('GET')
+
+            def do_POST(self):
+                self._route('POST')
+
+            def do_PUT(self):
+                self._route('PUT')
+
+            def do_PATCH(self):
+                self._route('PATCH')
+
+            def do_DELETE(self):
+                self._route('DELETE')
+
+        return Handler
@@ -0,0 +1,145 @@
+"""Local stand-in for the ElevenLabs text-to-speech and voice list endpoints.
+
+Synthesizes a sine tone whose length scales with the text and dribbles it out at a
+configurable synthesis speed, so time-to-first-audio can be measured offline. It can
+also answer the next few requests with 503 and counts TCP connections, to exercise
+retries and keep-alive pooling.
+"""
+import json
+import math
+import random
+import re
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+TTS_PATH = re.compile(r"/v1/text-to-speech/(?P<voice>[^/]+)(?P<stream>/stream)?$")
+VOICES_PATH = "/v1/voices"
+SECONDS_PER_CHAR = 0.06
+CHUNK_SECONDS = 0.1
+VOICES = [{'name': "Rachel", 'voice_id': "21m00Tcm4TlvDq8ikWAM"}, {'name': "Adam", 'voice_id': "pNInz6obpgDQGcFmaJgB"}]
+
+def synthesize_pcm(text, sample_rate):
+    """Returns 16-bit mono PCM for a 440 Hz tone lasting SECONDS_PER_CHAR per character"""
+    samples = int(max(len(text), 1) * SECONDS_PER_CHAR * sample_rate)
+    return b"".join(struct.pack('<h', int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate))) for i in range(samples))
+
+class FakeElevenLabsServer:
+    """Threaded HTTP server emulating /v1/text-to-speech/{voice}[/stream] and /v1/voices"""
+
+    def __init__(self, host='127.0.0.1', port=0, first_byte_latency=0.2, realtime_factor=0.5, jitter=0.0, failures=0):
+        self.first_byte_latency = first_byte_latency
+        self.realtime_factor = realtime_factor  # Seconds of synthesis per second of audio
+        self.jitter = jitter
+        self.failures = failures  # The next this many requests get 503 Service Unavailable
+        self.request_count = 0
+        self.connection_count = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def fail_next(self, count):
+        with self._lock:
+            self.failures = count
+
+    def sleep(self, seconds):
+        seconds += random.uniform(-self.jitter, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # Headers and body go out in separate writes; avoid delayed-ACK stalls
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connection_count += 1
+
+            def send_empty(self, status, headers=()):
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def begin(self):
+                """Counts the request; returns False after answering it with an injected 503"""
+                with server._lock:
+                    server.request_count += 1
+                    failing = server.failures > 0
+                    server.failures -= failing
+                if failing:
+                    self.send_empty(503, [('Retry-After', '0')])
+                return not failing
+
+            def do_GET(self):
+                if not self.begin():
+                    return
+                if urlparse(self.path).path != VOICES_PATH:
+                    self.send_empty(404)
+                    return
+                server.sleep(server.first_byte_latency)
+                payload = json.dumps({'voices': VOICES}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                if not self.begin():
+                    return
+                url = urlparse(self.path)
+                match = TTS_PATH.match(url.path)
+                if not match:
+                    self.send_empty(404)
+                    return
+                output_format = parse_qs(url.query).get('output_format', ['pcm_22050'])[0]
+                sample_rate = int(output_format.split('_')[-1])
+                audio = synthesize_pcm(body.get('text', ''), sample_rate)
+                chunk_bytes = int(sample_rate * CHUNK_SECONDS) * 2
+                chunks = [audio[i:i + chunk_bytes] for i in range(0, len(audio), chunk_bytes)]
+                server.sleep(server.first_byte_latency)
+                if match.group('stream'):
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'audio/pcm')
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    self.end_headers()
+                    for chunk in chunks:
+                        self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                        self.wfile.flush()
+                        server.sleep(CHUNK_SECONDS * server.realtime_factor)
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    server.sleep(len(chunks) * CHUNK_SECONDS * server.realtime_factor)
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'audio/pcm')
+                    self.send_header('Content-Length', str(len(audio)))
+                    self.end_headers()
+                    self.wfile.write(audio)
+
+        return Handler
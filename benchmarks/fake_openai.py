@@ -0,0 +1,68 @@
+"""Offline stand-ins for openai.ChatCompletion.create and openai.Embedding.create with configurable latency.
+
+Install them with modules.ai.set_completion_backend(FakeChatCompletion().create) and
+modules.ai.set_embedding_backend(FakeEmbedding().embed).
+"""
+import hashlib
+import random
+import re
+import time
+
+DEFAULT_REPLY = ("Sure! Let's take it one step at a time. First, pick the smallest task on your list. "
+                 "Then set a timer for ten minutes and start. You've got this!")
+
+class FakeChatCompletion:
+    """Returns canned replies as full responses or as a stream of delta chunks"""
+
+    def __init__(self, reply=DEFAULT_REPLY, first_token_latency=0.5, token_latency=0.03, jitter=0.0):
+        self.reply = reply  # A string, or a callable taking the messages list
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.jitter = jitter
+        self.calls = 0
+
+    def sleep(self, seconds):
+        seconds += random.uniform(-self.jitter, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def create(self, messages, stream=False, **kwargs):
+        self.calls += 1
+        reply = self.reply(messages) if callable(self.reply) else self.reply
+        tokens = re.findall(r'\s*\S+', reply)
+        if stream:
+            return self._stream(tokens)
+        self.sleep(self.first_token_latency + self.token_latency * len(tokens))
+        return {'choices': [{'message': {'role': 'assistant', 'content': reply}, 'finish_reason': 'stop'}]}
+
+    def _stream(self, tokens):
+        self.sleep(self.first_token_latency)
+        yield {'choices': [{'delta': {'role': 'assistant'}, 'finish_reason': None}]}
+        for token in tokens:
+            yield {'choices': [{'delta': {'content': token}, 'finish_reason': None}]}
+            self.sleep(self.token_latency)
+        yield {'choices': [{'delta': {}, 'finish_reason': 'stop'}]}
+
+class FakeEmbedding:
+    """Embeds text as hashed character trigram counts.
+
+    Rewordings that share most of their characters score high, unrelated prompts low,
+    but the scale differs from real embeddings, so pick the threshold accordingly.
+    """
+
+    def __init__(self, dimensions=512, latency=0.15, jitter=0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+
+    def embed(self, text):
+        self.calls += 1
+        seconds = self.latency + random.uniform(-self.jitter, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+        vector = [0.0] * self.dimensions
+        padded = f"  {text} "
+        for i in range(len(padded) - 2):
+            vector[int(hashlib.md5(padded[i:i + 3].encode('utf-8')).hexdigest()[:8], 16) % self.dimensions] += 1
+        return vector
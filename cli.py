@@ -0,0 +1,54 @@
+"""Headless IVA: runs utterances from a file or stdin and writes one JSON result per line, in input order.
+
+Each line is an utterance, or a JSON object like {"text": "...", "session": "..."};
+turns sharing a session are answered as one conversation. Reminder dictations are
+extracted on worker processes and saved, chat turns are answered on threads and
+spoken. Pass --no-side-effects to skip saving reminders, Calendar sync and speech.
+
+Examples:
+    python cli.py dictations.txt --no-side-effects > reminders.jsonl
+    cat transcript.jsonl | python cli.py --no-side-effects
+"""
+import argparse
+import json
+import sys
+from modules.batch import BATCH_PROCESSES, BATCH_THREADS, BatchProcessor, sync_reminders
+
+# ======================== Main Execution ========================
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('input', nargs='?', default='-', help="utterance file, or - for stdin (default)")
+    arg_parser.add_argument('-o', '--output', default='-', help="JSONL result file, or - for stdout (default)")
+    arg_parser.add_argument('--processes', type=int, default=BATCH_PROCESSES, help="reminder extraction worker processes")
+    arg_parser.add_argument('--threads', type=int, default=BATCH_THREADS, help="chat turns answered at once")
+    arg_parser.add_argument('--no-side-effects', action='store_true',
+                            help="don't save reminders, sync Google Calendar or speak replies")
+    args = arg_parser.parse_args(argv)
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    stdout, sys.stdout = sys.stdout, sys.stderr  # Modules print progress and errors; keep them out of the results
+
+    def write(result):
+        sink.write(json.dumps(result, ensure_ascii=False) + "\n")
+        sink.flush()
+
+    processor = BatchProcessor(args.processes, args.threads, side_effects=not args.no_side_effects)
+    try:
+        summary = processor.run(source, write)
+    finally:
+        sys.stdout = stdout
+        if args.input != '-':
+            source.close()
+        if args.output != '-':
+            sink.close()
+    if processor.side_effects and summary['kinds'].get('reminder'):
+        sync_reminders()
+    kinds = ", ".join(f"{count} {kind}" for kind, count in sorted(summary['kinds'].items()))
+    print(f"{summary['utterances']} utterances in {summary['seconds']:.2f} s "
+          f"({summary['per_second']:.1f} utterances/s): {kinds or 'none'}; {summary['errors']} errors", file=sys.stderr)
+    return 1 if summary['errors'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
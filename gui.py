@@ -1,13 +1,22 @@
-import random
 import threading
 import tkinter as tk
-from tkinter import font, ttk, StringVar, messagebox, PhotoImage
+from tkinter import font, ttk, StringVar, messagebox, filedialog, PhotoImage
 from PIL import Image, ImageDraw, ImageTk
-from playsound import playsound
-import requests
-from modules.process_input import process_input
-from modules.utils import speak, recognize_speech
-from modules.reminders import get_reminders_for_period, mark_reminder_as_done
+from modules.gradient import GradientRenderer, RESIZE_DEBOUNCE_MS
+from modules.focus_timer import FocusTimer, ADJUST_STEP, WORK
+from modules.audio import play_cue, preload_cues
+from modules.quotes import QuoteProvider
+from modules.process_input import process_input_stream, is_stop_command
+from modules.utils import speak, speak_async, SentenceSplitter
+from modules.voice_engine import VoiceEngine
+from modules.memory import ConversationMemory
+from modules.journal import ConversationJournal
+from modules.reminders import import_reminders_from_file
+from modules.reminders_view import RemindersViewModel, MESSAGE_ROW_ID, diff_rows
+from modules.reminder_store import get_reminder_sync
+from modules.nlp import warm_up as warm_up_nlp
+from modules import tracing
+
 
 class ChatInterface:
     """Class to create and manage the chat interface for IVA."""
@@ -39,32 +48,29 @@ class ChatInterface:
     POMODORO_TIME = 25 * 60
     BREAK_TIME = 5 * 60
 
+    # Latency stats panel (toggled with F12)
+    STATS_PANEL_REFRESH_MS = 1000
+
     # ======================== Initialization and Setup ========================
 
     def __init__(self, root):
         self.root = root
-        self.previous_questions_and_answers = []
+        self.previous_questions_and_answers = ConversationMemory.from_journal(ConversationJournal())
         self.mic_mode = False
-        self.is_timer_running = False
-        self.current_time = self.POMODORO_TIME
+        self.voice_engine = None
+        self.focus_timer = FocusTimer(self.POMODORO_TIME, self.BREAK_TIME, on_phase_end=self.on_focus_phase_end)
         self.timer_id = None
-        self.timer_var = StringVar(value="25:00")
+        self.timer_var = StringVar(value=self.focus_timer.display_text())
+        self.gradient_renderer = GradientRenderer()  # Shared by every frame's background
+        self.stats_panel = None
+        self.stats_panel_id = None
         self.setup_ui()
+        self.root.bind('<F12>', self.toggle_stats_panel)
         self.initial_ai_message()
 
     def create_gradient(self, width, height, color1, color2):
-        """Create a vertical gradient and return it as a PhotoImage."""
-        gradient = Image.new("RGB", (width, height), color1)
-        draw = ImageDraw.Draw(gradient)
-        r1, g1, b1 = gradient.getpixel((0, 0))
-        r2, g2, b2 = int(color2[1:3], 16), int(color2[3:5], 16), int(color2[5:7], 16)
-        dr = (r2 - r1) / height
-        dg = (g2 - g1) / height
-        db = (b2 - b1) / height
-        for i in range(height):
-            r, g, b = r1 + dr * i, g1 + dg * i, b1 + db * i
-            draw.line((0, i, width, i), fill=(int(r), int(g), int(b)))
-        return ImageTk.PhotoImage(gradient)
+        """Create a vertical gradient and return it as a PhotoImage (cached per size)."""
+        return self.gradient_renderer.photo(width, height, color1, color2)
     
     def setup_ui(self):
         # Main window setup
@@ -105,19 +111,27 @@ class ChatInterface:
         self.setup_focus_mode_components()
 
     def apply_gradient(self, frame):
-        """Apply a gradient background to a frame."""
+        """Apply a gradient background to a frame, redrawn once a resize has settled."""
         gradient_label = tk.Label(frame)
         gradient_label.place(x=0, y=0, relwidth=1, relheight=1)
+        state = {'pending': None, 'size': None}
 
-        def redraw_gradient(event):
-            # Redraw gradient with the new size
-            width, height = event.width, event.height
-            if width > 1 and height > 1:
+        def redraw_gradient():
+            state['pending'] = None
+            width, height = frame.winfo_width(), frame.winfo_height()
+            if width > 1 and height > 1 and (width, height) != state['size']:
+                state['size'] = (width, height)
                 gradient = self.create_gradient(width, height, '#a1c4fd', '#c2e9fb')
                 gradient_label.config(image=gradient)
                 gradient_label.image = gradient  # Keep a reference
 
-        frame.bind("<Configure>", redraw_gradient)                 
+        def schedule_redraw(event):
+            # Dragging the sash fires <Configure> continuously; only render after it stops
+            if state['pending'] is not None:
+                self.root.after_cancel(state['pending'])
+            state['pending'] = self.root.after(RESIZE_DEBOUNCE_MS, redraw_gradient)
+
+        frame.bind("<Configure>", schedule_redraw)
 
  # ======================== Chat Feature ========================
 
@@ -185,6 +199,13 @@ class ChatInterface:
         self.chat_text.config(state=tk.DISABLED)
         self.chat_text.see(tk.END)
 
+    def append_text(self, text):
+        """Append text to the last line of the chat text widget without a newline."""
+        self.chat_text.config(state=tk.NORMAL)
+        self.chat_text.insert(tk.END, text)
+        self.chat_text.config(state=tk.DISABLED)
+        self.chat_text.see(tk.END)
+
     def focus_in(self, event):
         """Handle focus-in event on the text field."""
         if self.text_field.get() == 'Message IVA...':
@@ -209,18 +230,16 @@ class ChatInterface:
         """Run the speak function in a separate thread."""
         speak(message)        
 
-    def speech_recognition_and_response(self):
-        """Handle the speech recognition and response in a separate thread."""
-        text = recognize_speech()
-        if text:
-            self.root.after(0, lambda: self.append_message("--> User: " + text))
-            self.root.after(0, self.start_typing_animation)
-            response = process_input(text, self.previous_questions_and_answers)
-            self.root.after(0, lambda: [self.stop_typing_animation(), self.append_message("➢ IVA: " + response) if response else None])
-            speak(response)
-            if self.mic_mode:
-                self.listen_process_and_respond()                 
-    
+    def start_voice_engine(self):
+        """Start the continuous voice pipeline, marshalling its callbacks onto the Tk thread."""
+        self.voice_engine = VoiceEngine(
+            self.previous_questions_and_answers,
+            on_user_text=lambda text: self.root.after(0, lambda: self.append_message("--> User: " + text)),
+            on_response_start=lambda: self.root.after(0, lambda: self.append_text("➢ IVA: ")),
+            on_response_delta=lambda delta: self.root.after(0, lambda: self.append_text(delta)),
+            on_response_end=lambda: self.root.after(0, lambda: self.append_text("\n")),
+        ).start()
+
     def send_message(self, event=None):
         """Handle sending of a message."""
         message = self.text_field.get().strip()
@@ -233,28 +252,46 @@ class ChatInterface:
     def process_text_input(self, message):
         """Process text input in a separate thread."""
         self.root.after(0, self.start_typing_animation)
-        response = process_input(message, self.previous_questions_and_answers)
-        self.root.after(0, self.stop_typing_animation)
-        if response:
-            self.root.after(0, lambda: self.append_message("➢ IVA: " + response))
-            speak(response)
-
-    def listen_process_and_respond(self):
-        """Start the listening and responding process in a separate thread."""
-        if self.mic_mode:
-            threading.Thread(target=self.speech_recognition_and_response, daemon=True).start()
-    
+        self.stream_response(message)
+
+    def stream_response(self, message):
+        """Render the response into the chat as it streams and speak each finished sentence."""
+        splitter = SentenceSplitter()
+        started = False
+        for delta in process_input_stream(message, self.previous_questions_and_answers):
+            if not started:
+                started = True
+                self.root.after(0, lambda: [self.stop_typing_animation(), self.append_text("➢ IVA: ")])
+            self.root.after(0, lambda delta=delta: self.append_text(delta))
+            for sentence in splitter.feed(delta):
+                speak_async(sentence)
+        for sentence in splitter.flush():
+            speak_async(sentence)
+        self.root.after(0, self.stop_typing_animation if not started else lambda: self.append_text("\n"))
+        if is_stop_command(message):
+            self.root.after(0, self.close)
+
+    def close(self):
+        """Stop background work, finish writing the journal and close the window."""
+        if self.voice_engine is not None:
+            self.voice_engine.stop()
+        self.previous_questions_and_answers.close()
+        self.root.destroy()
+
     def toggle_and_manage_mic_mode(self):
         """Toggle microphone input state and manage listening process."""
         if self.mic_mode:
             self.mic_mode = False
             self.text_field['state'] = tk.NORMAL
             self.send_button['state'] = tk.NORMAL
+            if self.voice_engine is not None:
+                self.voice_engine.stop()
+                self.voice_engine = None
         else:
             self.mic_mode = True
             self.text_field['state'] = tk.DISABLED
             self.send_button['state'] = tk.DISABLED
-            self.listen_process_and_respond()                 
+            self.start_voice_engine()
 
  # ======================== Reminders Feature ========================        
 
@@ -268,6 +305,10 @@ class ChatInterface:
         self.toggle_view_button.pack(side=tk.RIGHT)
         self.refresh_button = tk.Button(self.todo_list_label_frame, text="Refresh", command=self.refresh_threaded, bg=self.TODO_LIST_LABEL_BG, fg=self.TODO_LIST_LABEL_FG)
         self.refresh_button.pack(side=tk.RIGHT, padx=(5, 0))
+        self.done_button = tk.Button(self.todo_list_label_frame, text="Done", command=self.mark_done, bg=self.TODO_LIST_LABEL_BG, fg=self.TODO_LIST_LABEL_FG)
+        self.done_button.pack(side=tk.RIGHT, padx=(5, 0))
+        self.import_button = tk.Button(self.todo_list_label_frame, text="Import", command=self.import_reminders, bg=self.TODO_LIST_LABEL_BG, fg=self.TODO_LIST_LABEL_FG)
+        self.import_button.pack(side=tk.RIGHT, padx=(5, 0))
         self.todo_list_tree = ttk.Treeview(self.features_frame, columns=('Reminder', 'Date'), style="Treeview")
         self.todo_list_tree.heading('#0', text='Done')
         self.todo_list_tree.heading('Reminder', text='Reminder')
@@ -280,52 +321,77 @@ class ChatInterface:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.todo_list_tree.configure(yscrollcommand=scrollbar.set)
         self.todo_list_tree.bind('<Double-1>', self.mark_done)
-        self.current_view = "day"
-        self.display_reminders()
-
-    def display_reminders(self):
-        """Fetch and display reminders in the Todo list box based on the current view."""
-        try:
-            self.todo_list_tree.delete(*self.todo_list_tree.get_children())  # Clear existing entries
-            reminders = get_reminders_for_period(self.current_view)
-            if reminders:
-                for reminder in reminders:
-                    self.todo_list_tree.insert('', tk.END, text='✓', values=(reminder['summary'], reminder['time']), iid=reminder['id'])
+        self.reminders_view = RemindersViewModel(schedule=lambda callback: self.root.after(0, callback))
+        self.reminders_view.add_listener(self.display_reminders)
+        self.reminders_view.add_error_listener(messagebox.showerror)
+        self.displayed_reminders = []
+        self.display_reminders([], self.reminders_view.message)
+        self.reminders_view.refresh()
+        # Refetch from the local store whenever the background sync brings in changes
+        get_reminder_sync().add_listener(lambda: self.root.after(0, self.reminders_view.refresh))
+
+    @property
+    def current_view(self):
+        return self.reminders_view.view
+
+    def display_reminders(self, rows, message=None):
+        """Bring the Todo list box in line with rows, touching only the rows that changed."""
+        tree = self.todo_list_tree
+        if tree.exists(MESSAGE_ROW_ID):
+            tree.delete(MESSAGE_ROW_ID)
+        removed, operations = diff_rows(self.displayed_reminders, rows)
+        if removed:
+            tree.delete(*removed)
+        for operation in operations:
+            if operation[0] == 'insert':
+                _, index, (row_id, summary, time) = operation
+                tree.insert('', index, iid=row_id, text='✓', values=(summary, time))
+            elif operation[0] == 'update':
+                row_id, summary, time = operation[1]
+                tree.item(row_id, values=(summary, time))
             else:
-                self.todo_list_tree.insert('', tk.END, text='', values=("No reminders for today.", ""))
-        except Exception as e:
-            self.todo_list_tree.insert('', tk.END, text='', values=(f"Error fetching reminders: {e}", ""))
+                tree.move(operation[2], '', operation[1])
+        self.displayed_reminders = rows
+        if message:
+            tree.insert('', tk.END, iid=MESSAGE_ROW_ID, text='', values=(message, ""))
 
      # ======================== Reminders Feature Event Handling ========================     
 
     def refresh_threaded(self):
-        """Run the refresh reminders in a separate thread."""
-        threading.Thread(target=self.refresh_reminders, daemon=True).start()
-    
-    def refresh_reminders(self):
-        """Refresh the displayed reminders."""
-        try:
-            self.todo_list_tree.delete(*self.todo_list_tree.get_children())  # Clear existing entries
-            reminders = get_reminders_for_period(self.current_view)
-            for reminder in reminders:
-                self.todo_list_tree.insert('', tk.END, text='✓', values=(reminder['summary'], reminder['time']), iid=reminder['id'])
-        except Exception as e:
-            messagebox.showerror("Refresh Error", f"An error occurred while refreshing reminders: {e}")    
+        """Sync with Google Calendar and refresh the reminders without blocking the UI."""
+        self.reminders_view.refresh(sync=True)
 
     def toggle_todo_view(self):
         """Toggle between today's and this week's todo list."""
         if self.current_view == "day":
-            self.current_view = "week"
+            self.reminders_view.set_view("week")
             self.toggle_view_button.config(text="Show Today")
         else:
-            self.current_view = "day"
+            self.reminders_view.set_view("day")
             self.toggle_view_button.config(text="Show Week")
-        self.display_reminders()    
 
-    def mark_done(self, event):
-        selected_item = self.todo_list_tree.selection()[0]
-        mark_reminder_as_done(selected_item)
-        self.todo_list_tree.delete(selected_item)
+    def mark_done(self, event=None):
+        """Mark every selected reminder as done; the rows go at once and the Calendar updates follow in the background."""
+        self.reminders_view.mark_done(self.todo_list_tree.selection())
+
+    def import_reminders(self):
+        """Create reminders from a text file with one reminder per line."""
+        path = filedialog.askopenfilename(title="Import reminders", filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+        if path:
+            threading.Thread(target=lambda: self.import_reminders_threaded(path), daemon=True).start()
+
+    def import_reminders_threaded(self, path):
+        """Parse and save imported reminders off the Tk thread, then report the result on it."""
+        try:
+            created, skipped = import_reminders_from_file(path)
+        except Exception as e:
+            error_message = f"Could not import reminders: {e}"  # e is unbound once the except block ends
+            self.root.after(0, lambda: messagebox.showerror("Import Error", error_message))
+            return
+        message = f"Imported {created} reminder(s)."
+        if skipped:
+            message += f"\n\nSkipped {len(skipped)} line(s):\n" + "\n".join(f"{line}: {reason}" for line, reason in skipped[:10])
+        self.root.after(0, lambda: [messagebox.showinfo("Import Reminders", message), self.reminders_view.refresh()])
 
  # ======================== Focus Mode Feature ========================            
 
@@ -337,7 +403,7 @@ class ChatInterface:
         self.timer_canvas = tk.Canvas(self.focus_mode_frame, width=200, height=200, bg=self.BACKGROUND_COLOR, highlightthickness=0)
         self.timer_canvas.pack(pady=20)
         self.draw_smooth_circle()
-        self.timer_text = self.timer_canvas.create_text(100, 100, text="25:00", fill=self.FONT_COLOR, font=('Arial', 20, 'bold'))  
+        self.timer_text = self.timer_canvas.create_text(100, 100, text=self.focus_timer.display_text(), fill=self.FONT_COLOR, font=('Arial', 20, 'bold'))
         # Buttons for controlling the timer (Start, Pause, Reset)
         control_button_frame = tk.Frame(self.focus_mode_frame, bg=self.BACKGROUND_COLOR)
         control_button_frame.pack(pady=(5, 15))
@@ -357,6 +423,8 @@ class ChatInterface:
         self.plus_five_button.pack(side=tk.LEFT, padx=10)
         # Display quote
         self.display_quote()
+        if self.focus_timer.running:  # A session restored from the last run keeps going
+            self.update_timer()
 
     def draw_smooth_circle(self):
         scale_factor = 4 
@@ -368,77 +436,126 @@ class ChatInterface:
         self.circle_image = ImageTk.PhotoImage(image)
         self.timer_canvas.create_image(100, 100, image=self.circle_image) 
 
-    def play_sound(self, sound_file):
-        """Play the specified sound file."""
-        playsound(sound_file)
+    def play_sound(self, *cues):
+        """Play preloaded sound cues on the shared mixer without blocking."""
+        play_cue(*cues)
                
     def update_timer(self):
-        if self.current_time > 0:
-            self.current_time -= 1
-            minutes, seconds = divmod(self.current_time, 60)
-            self.timer_var.set(f"{minutes:02d}:{seconds:02d}")
-            self.timer_canvas.itemconfig(self.timer_text, text=f"{minutes:02d}:{seconds:02d}")
-            self.timer_id = self.root.after(1000, self.update_timer)
-        else:
-            self.is_timer_running = False
-            self.current_time = self.BREAK_TIME
-            threading.Thread(target=lambda: self.play_sound('assets/End_Focus_Mode.mp3'), daemon=True).start()
-            self.start_focus_timer()
+        """Repaint the timer and schedule the next repaint for when the displayed second changes."""
+        self.timer_id = None
+        self.focus_timer.tick()
+        self.update_timer_display()
+        if self.focus_timer.running:
+            self.timer_id = self.root.after(int(self.focus_timer.next_repaint_delay() * 1000) + 1, self.update_timer)
 
     def update_timer_display(self):
-        minutes, seconds = divmod(self.current_time, 60)
-        self.timer_var.set(f"{minutes:02d}:{seconds:02d}")
-        self.timer_canvas.itemconfig(self.timer_text, text=f"{minutes:02d}:{seconds:02d}")
+        """Show the remaining time, touching the widgets only when the text changes."""
+        text = self.focus_timer.display_text()
+        if text != self.timer_var.get():
+            self.timer_var.set(text)
+            self.timer_canvas.itemconfig(self.timer_text, text=text)
+
+    def on_focus_phase_end(self, finished_phase, next_phase):
+        """Play the end-of-phase cue followed by the start cue for the next phase; a new cycle gets a new quote."""
+        self.play_sound('focus_end', 'focus_start')
+        if next_phase == WORK:
+            self.rotate_quote()
 
     def display_quote(self):
-        quote = self.fetch_quote()
-        quote_label = tk.Label(self.focus_mode_frame, text=quote, wraplength=140, justify="center", bg=self.BACKGROUND_COLOR, fg=self.FONT_COLOR)
-        quote_label.pack(pady=50)  
+        """Show a quote from the local cache and refresh the cache in the background if it is stale."""
+        self.quote_provider = QuoteProvider()
+        self.quote_label = tk.Label(self.focus_mode_frame, text=self.quote_provider.next_quote(), wraplength=140, justify="center", bg=self.BACKGROUND_COLOR, fg=self.FONT_COLOR)
+        self.quote_label.pack(pady=50)
+        self.quote_provider.refresh_in_background(on_update=lambda: self.root.after(0, self.rotate_quote))
+
+    def rotate_quote(self):
+        """Show the next quote, once per Pomodoro cycle."""
+        self.quote_label.config(text=self.quote_provider.next_quote())
 
  # ======================== Focus Mode Feature Event Handling ========================            
 
     def start_focus_timer(self):
         """Start or resume the Pomodoro timer."""
-        if not self.is_timer_running:
-            self.is_timer_running = True
-            threading.Thread(target=lambda: self.play_sound('assets/Start_Focus_Mode.mp3'), daemon=True).start()
+        if self.focus_timer.start():
+            self.play_sound('focus_start')
             self.update_timer()
 
     def pause_focus_timer(self):
         """Pause the Pomodoro timer."""
-        if self.is_timer_running:
-            self.is_timer_running = False
-            if self.timer_id is not None:
-                self.root.after_cancel(self.timer_id)
-                self.timer_id = None
+        self.focus_timer.pause()
+        self.cancel_timer_update()
+        self.update_timer_display()
 
     def reset_focus_timer(self):
-        self.pause_focus_timer()
-        self.current_time = self.POMODORO_TIME
+        self.focus_timer.reset()
+        self.cancel_timer_update()
         self.update_timer_display()
 
     def increase_timer(self):
-        if not self.is_timer_running:
-            self.current_time = min(self.current_time + 5 * 60, self.POMODORO_TIME + 30 * 60)
+        if self.focus_timer.adjust(ADJUST_STEP):
             self.update_timer_display()
 
     def decrease_timer(self):
-        if not self.is_timer_running:
-            self.current_time = max(self.current_time - 5 * 60, 5 * 60)
+        if self.focus_timer.adjust(-ADJUST_STEP):
             self.update_timer_display()
 
-    def fetch_quote(self):
-        try:
-            response = requests.get("https://type.fit/api/quotes")
-            if response.status_code == 200:
-                quotes = response.json()
-                quote = random.choice(quotes)['text']
-                return quote
+    def cancel_timer_update(self):
+        if self.timer_id is not None:
+            self.root.after_cancel(self.timer_id)
+            self.timer_id = None
+
+    # ======================== Latency Stats Panel ========================
+
+    def toggle_stats_panel(self, event=None):
+        """Show or hide the per-stage latency panel; opening it turns tracing on."""
+        if self.stats_panel is not None:
+            self.close_stats_panel()
+            return
+        tracing.set_enabled(True)
+        self.stats_panel = tk.Toplevel(self.root, bg=self.BACKGROUND_COLOR)
+        self.stats_panel.title("IVA - Latency")
+        self.stats_panel.protocol("WM_DELETE_WINDOW", self.close_stats_panel)
+        columns = ("count", "p50", "p95")
+        self.stats_tree = ttk.Treeview(self.stats_panel, columns=columns, height=12)
+        self.stats_tree.heading("#0", text="Stage")
+        self.stats_tree.column("#0", width=160)
+        for column in columns:
+            self.stats_tree.heading(column, text=column if column == "count" else f"{column} (ms)")
+            self.stats_tree.column(column, width=80, anchor=tk.E)
+        self.stats_tree.pack(fill=tk.BOTH, expand=True, padx=self.BUTTON_PADDING_X, pady=self.BUTTON_PADDING_Y)
+        tk.Button(self.stats_panel, text="Export trace", command=self.export_trace, bg=self.SEND_BUTTON_COLOR,
+                  fg="white", borderwidth=0).pack(pady=self.BUTTON_PADDING_Y)
+        self.update_stats_panel()
+
+    def update_stats_panel(self):
+        """Refresh the rolling p50/p95 of every traced stage."""
+        for stage, stats in sorted(tracing.get_tracer().summary().items()):
+            values = (stats['count'], f"{stats['p50']:.1f}", f"{stats['p95']:.1f}")
+            if self.stats_tree.exists(stage):
+                self.stats_tree.item(stage, values=values)
             else:
-                return "No quote available"
-        except Exception as e:
-            return "Error fetching quote"        
-          
+                self.stats_tree.insert("", tk.END, iid=stage, text=stage, values=values)
+        self.stats_panel_id = self.root.after(self.STATS_PANEL_REFRESH_MS, self.update_stats_panel)
+
+    def close_stats_panel(self):
+        if self.stats_panel_id is not None:
+            self.root.after_cancel(self.stats_panel_id)
+            self.stats_panel_id = None
+        if self.stats_panel is not None:
+            self.stats_panel.destroy()
+            self.stats_panel = None
+
+    def export_trace(self):
+        """Save the recorded spans as a Chrome trace (open in chrome://tracing or ui.perfetto.dev)."""
+        path = filedialog.asksaveasfilename(parent=self.stats_panel, title="Export trace", defaultextension=".json",
+                                            filetypes=[("Chrome trace", "*.json")])
+        if not path:
+            return
+        try:
+            tracing.get_tracer().export_chrome_trace(path)
+        except OSError as e:
+            messagebox.showerror("Export Error", f"Could not write the trace: {e}", parent=self.stats_panel)
+
     # ======================== Animation and Visual Effects ========================
 
     def start_typing_animation(self):
@@ -479,6 +596,9 @@ if __name__ == "__main__":
         root.iconphoto(True, icon)
         root.configure(bg=ChatInterface.BACKGROUND_COLOR)
         chat_interface = ChatInterface(root)
+        root.after_idle(warm_up_nlp)  # Load spaCy in the background once the first frame is up
+        root.after_idle(preload_cues)  # Decode the Focus Mode sounds before they are needed
+        root.protocol("WM_DELETE_WINDOW", chat_interface.close)
         root.mainloop()
     except Exception as e:
         messagebox.showerror("Fatal Error", f"An unrecoverable error occurred: {e}")
\ No newline at end of file
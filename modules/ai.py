@@ -1,4 +1,11 @@
-import openai
+import atexit
+import threading
+import time
+from modules.lazy import lazy_import
+from modules.response_cache import ResponseCache, split_prompt
+from modules.tracing import span, traced
+
+openai = lazy_import('openai')
 
 # ======================== Constants ========================
 OPENAI_API_KEY = ""  # Replace with your actual API key
@@ -14,17 +21,102 @@ MAX_TOKENS = 300
 FREQUENCY_PENALTY = 0
 PRESENCE_PENALTY = 0.6
 MAX_CONTEXT_QUESTIONS = 10
+SUMMARY_INSTRUCTIONS = """
+Update the running summary of a conversation between a user and IVA, an assistant for users with ADHD.
+Keep facts about the user, their tasks, plans, preferences and anything IVA promised. Be brief.
+Reply with the updated summary only.
+"""
+SUMMARY_MAX_TOKENS = 200
 
-# Setup
-openai.api_key = OPENAI_API_KEY  
+# Opt-in cache of answers to repeated questions ("what can you do", "help me focus", ...)
+RESPONSE_CACHE = False
+RESPONSE_CACHE_SEMANTIC = True  # Also reuse answers to differently worded prompts, at one embedding call per lookup
+EMBEDDING_MODEL = "text-embedding-ada-002"
 
-def get_openai_response(previous_questions_and_answers):
-    """Get response from openai"""
+
+def _openai_create(**kwargs):
+    """Create a chat completion with the openai package, configured on first use"""
+    if openai.api_key != OPENAI_API_KEY:
+        openai.api_key = OPENAI_API_KEY
+    return openai.ChatCompletion.create(**kwargs)
+
+# Backend used for chat completions; swap with set_completion_backend() for offline testing
+_create_completion = _openai_create
+
+def set_completion_backend(create):
+    """Replaces the function used to create chat completions (same signature as ChatCompletion.create)"""
+    global _create_completion
+    _create_completion = create
+
+def _openai_embed(text):
+    """Embed text with the openai package"""
+    if openai.api_key != OPENAI_API_KEY:
+        openai.api_key = OPENAI_API_KEY
+    return openai.Embedding.create(model=EMBEDDING_MODEL, input=text)['data'][0]['embedding']
+
+# Backend used for response cache embeddings (text -> list of floats)
+_create_embedding = _openai_embed
+
+def set_embedding_backend(embed):
+    """Replaces the function used to embed prompts for semantic response cache lookups"""
+    global _create_embedding
+    _create_embedding = embed
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """Returns the shared ResponseCache, loading it from disk on first use; None unless RESPONSE_CACHE is set"""
+    global _response_cache
+    if not RESPONSE_CACHE:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                embed = (lambda text: _create_embedding(text)) if RESPONSE_CACHE_SEMANTIC else None
+                _response_cache = ResponseCache(embed=embed)
+                atexit.register(_response_cache.close)
+    return _response_cache
+
+def response_cache_stats():
+    """Hit rate and completion time saved by the response cache, or None when it is off"""
+    cache = get_response_cache()
+    return cache.stats() if cache else None
+
+def _cached_response(messages):
+    """Returns (cached answer or None, prompt, context) for the messages about to be sent"""
+    cache = get_response_cache()
+    if cache is None:
+        return None, None, None
+    prompt, context = split_prompt(messages)
+    if prompt is None:
+        return None, None, None
+    return cache.get(prompt, context), prompt, context
+
+def _cache_response(prompt, context, answer, started):
+    cache = get_response_cache()
+    if cache is not None and prompt is not None and answer:
+        cache.put(prompt, context, answer, (time.perf_counter() - started) * 1000)
+
+def build_messages(previous_questions_and_answers):
+    """Builds the chat messages sent to openai from the conversation history"""
+    if hasattr(previous_questions_and_answers, 'build_messages'):
+        return previous_questions_and_answers.build_messages(INSTRUCTIONS)
     messages = [{"role": "system", "content": INSTRUCTIONS}]
     messages.extend({"role": role.lower(), "content": content} for role, content in
                     previous_questions_and_answers[-MAX_CONTEXT_QUESTIONS:])
+    return messages
+
+@traced('openai')
+def get_openai_response(previous_questions_and_answers):
+    """Get response from openai"""
+    messages = build_messages(previous_questions_and_answers)
+    cached, prompt, context = _cached_response(messages)
+    if cached is not None:
+        return cached
     try:
-        response = openai.ChatCompletion.create(
+        started = time.perf_counter()
+        response = _create_completion(
             model="gpt-3.5-turbo",
             messages=messages,
             temperature=TEMPERATURE,
@@ -32,7 +124,60 @@ def get_openai_response(previous_questions_and_answers):
             frequency_penalty=FREQUENCY_PENALTY,
             presence_penalty=PRESENCE_PENALTY,
         )
-        return response.choices[0].message['content'].strip()
+        answer = response['choices'][0]['message']['content'].strip()
+        _cache_response(prompt, context, answer, started)
+        return answer
     except openai.error.OpenAIError as e:
         print(f"OpenAI API error: {e}")
         return "Sorry, I couldn't process that request right now."
+
+def stream_openai_response(previous_questions_and_answers):
+    """Yield response text from openai as it is generated"""
+    messages = build_messages(previous_questions_and_answers)
+    cached, prompt, context = _cached_response(messages)
+    if cached is not None:
+        yield cached
+        return
+    with span('openai.stream') as stream_span:
+        try:
+            started = time.perf_counter()
+            response = _create_completion(
+                model="gpt-3.5-turbo",
+                messages=messages,
+                temperature=TEMPERATURE,
+                max_tokens=MAX_TOKENS,
+                frequency_penalty=FREQUENCY_PENALTY,
+                presence_penalty=PRESENCE_PENALTY,
+                stream=True,
+            )
+            parts = []
+            for chunk in response:
+                delta = chunk['choices'][0]['delta'].get('content')
+                if not delta:
+                    continue
+                if not parts:
+                    delta = delta.lstrip()
+                if delta:
+                    if not parts:
+                        stream_span.set(first_token_ms=(time.perf_counter() - started) * 1000)
+                    parts.append(delta)
+                    yield delta
+            _cache_response(prompt, context, "".join(parts).strip(), started)
+        except openai.error.OpenAIError as e:
+            print(f"OpenAI API error: {e}")
+            yield "Sorry, I couldn't process that request right now."
+
+@traced('openai.summary')
+def summarize_conversation(summary, turns):
+    """Fold conversation turns into a running summary using openai"""
+    transcript = "\n".join(f"{role}: {content}" for role, content in turns)
+    response = _create_completion(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+            {"role": "user", "content": f"Current summary:\n{summary or '(empty)'}\n\nNew turns:\n{transcript}"},
+        ],
+        temperature=0,
+        max_tokens=SUMMARY_MAX_TOKENS,
+    )
+    return response['choices'][0]['message']['content'].strip()
@@ -0,0 +1,146 @@
+import threading
+from modules.lazy import lazy_import
+
+pygame = lazy_import('pygame')
+numpy = lazy_import('numpy')
+
+# ======================== Constants ========================
+
+MIXER_FREQUENCY = 22050  # Matches the pcm_22050 stream requested from ElevenLabs
+MIXER_BUFFER = 256  # Samples per device buffer (~12 ms at 22050 Hz); smaller means lower latency
+SPEECH_CHANNEL = 0  # Mixer channel reserved for speech
+CUE_CHANNEL = 1  # Mixer channel reserved for sound effects
+DUCK_VOLUME = 0.35  # Speech volume while a cue plays over it
+
+# Sound effects, decoded into memory once
+CUES = {
+    'focus_start': 'assets/Start_Focus_Mode.mp3',
+    'focus_end': 'assets/End_Focus_Mode.mp3',
+}
+
+_mixer_lock = threading.Lock()
+_cues = {}  # name -> pygame Sound
+_cue_lock = threading.Lock()
+_duck_timer = None
+
+# ======================== Mixer ========================
+
+def init_audio():
+    """Opens the shared pygame mixer once and keeps it open for the life of the process"""
+    with _mixer_lock:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(frequency=MIXER_FREQUENCY, size=-16, channels=1, buffer=MIXER_BUFFER)
+            pygame.mixer.set_reserved(CUE_CHANNEL + 1)
+
+def speech_channel():
+    init_audio()
+    return pygame.mixer.Channel(SPEECH_CHANNEL)
+
+def stop_speech_output():
+    """Silences speech on the speech channel and the music stream used for MP3 speech"""
+    if pygame.mixer.get_init():
+        pygame.mixer.Channel(SPEECH_CHANNEL).stop()
+        pygame.mixer.music.stop()
+
+# ======================== Sound Effects ========================
+
+def preload_cues(background=True):
+    """Decodes every cue into memory, optionally on a daemon thread, so playing one never touches the disk"""
+    def _load():
+        for name in CUES:
+            try:
+                _get_cue(name)
+            except Exception as e:
+                print(f"Error loading sound cue {name}: {e}")
+    if background:
+        thread = threading.Thread(target=_load, daemon=True)
+        thread.start()
+        return thread
+    _load()
+    return None
+
+def play_cue(*names):
+    """Plays one cue, or several back to back, on the cue channel without blocking.
+
+    Speech keeps playing underneath at a lower volume until the cues are over.
+    """
+    sounds = []
+    for name in names:
+        try:
+            sounds.append(_get_cue(name))
+        except Exception as e:
+            print(f"Error playing sound cue {name}: {e}")
+    if not sounds:
+        return
+    channel = pygame.mixer.Channel(CUE_CHANNEL)
+    channel.play(sounds[0])
+    for sound in sounds[1:2]:
+        channel.queue(sound)  # A channel queues at most one sound after the current one
+    _duck_speech(sum(sound.get_length() for sound in sounds[:2]))
+
+def _get_cue(name):
+    sound = _cues.get(name)
+    if sound is None:
+        init_audio()
+        with _cue_lock:
+            sound = _cues.get(name)
+            if sound is None:
+                sound = pygame.mixer.Sound(file=CUES[name])
+                _cues[name] = sound
+    return sound
+
+def _duck_speech(seconds):
+    """Lowers speech volume for the given time, extending the dip if another cue starts meanwhile"""
+    global _duck_timer
+    with _cue_lock:
+        if _duck_timer is not None:
+            _duck_timer.cancel()
+        pygame.mixer.Channel(SPEECH_CHANNEL).set_volume(DUCK_VOLUME)
+        pygame.mixer.music.set_volume(DUCK_VOLUME)
+        _duck_timer = threading.Timer(seconds, _restore_speech)
+        _duck_timer.daemon = True
+        _duck_timer.start()
+
+def _restore_speech():
+    global _duck_timer
+    with _cue_lock:
+        _duck_timer = None
+        pygame.mixer.Channel(SPEECH_CHANNEL).set_volume(1.0)
+        pygame.mixer.music.set_volume(1.0)
+
+# ======================== PCM Helpers ========================
+# Signed little-endian PCM of 1 to 4 bytes per sample, as the standard library's audioop
+# (removed in Python 3.13) treated it
+
+def _pcm_samples(data, width):
+    """Returns the samples of PCM bytes as an int32 array"""
+    data = data[:len(data) - len(data) % width]
+    if width == 3:
+        raw = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, 3).astype(numpy.int32)
+        samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        return numpy.where(samples >= 1 << 23, samples - (1 << 24), samples)
+    return numpy.frombuffer(data, dtype={1: numpy.int8, 2: '<i2', 4: '<i4'}[width]).astype(numpy.int32)
+
+def pcm_rms(data, width):
+    """Root mean square of the samples, used as the energy of an audio chunk"""
+    samples = _pcm_samples(data, width)
+    if not len(samples):
+        return 0
+    return int(numpy.sqrt(numpy.mean(numpy.square(samples, dtype=numpy.float64))))
+
+def pcm_to_mono(data, width, channels):
+    """Averages interleaved channels into one"""
+    samples = _pcm_samples(data, width)
+    samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels)
+    mono = samples.mean(axis=1).astype(numpy.int32)
+    if width == 3:
+        return numpy.stack([mono & 0xFF, (mono >> 8) & 0xFF, (mono >> 16) & 0xFF], axis=1).astype(numpy.uint8).tobytes()
+    return mono.astype({1: numpy.int8, 2: '<i2', 4: '<i4'}[width]).tobytes()
+
+def pcm_to_16bit(data, width):
+    """Converts samples to 16-bit, keeping their scale"""
+    if width == 2:
+        return data
+    samples = _pcm_samples(data, width)
+    samples = samples << 8 if width == 1 else samples >> (8 * (width - 2))
+    return samples.astype('<i2').tobytes()
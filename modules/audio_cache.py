@@ -0,0 +1,94 @@
+import hashlib
+import os
+import threading
+import time
+
+# ======================== Constants ========================
+
+TTS_CACHE_DIR = os.path.join('cache', 'tts')
+TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024  # Least recently used clips are evicted past this size
+
+# ======================== Audio Cache ========================
+
+class AudioCache:
+    """On-disk LRU cache of synthesized speech keyed by (engine, voice, text).
+
+    The index of file sizes and last-use times is read from disk once and then kept
+    in memory; last use is mirrored to each file's mtime so order survives restarts.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = None  # key -> [file name, size, last_used]
+        self._total = 0
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._index = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                self._index[entry.name.split('.')[0]] = [entry.name, stat.st_size, stat.st_mtime]
+                self._total += stat.st_size
+
+    @staticmethod
+    def key(engine, voice, text):
+        return hashlib.sha1(f"{engine}\0{voice}\0{text}".encode('utf-8')).hexdigest()
+
+    def get(self, engine, voice, text):
+        """Returns the path of a cached clip, or None"""
+        key = self.key(engine, voice, text)
+        with self._lock:
+            self._load_index()
+            entry = self._index.get(key)
+            path = entry and os.path.join(self.directory, entry[0])
+            if path is None or not os.path.exists(path):
+                self.misses += 1
+                return None
+            entry[2] = time.time()
+            os.utime(path, (entry[2], entry[2]))
+            self.hits += 1
+            return path
+
+    def put(self, engine, voice, text, data, extension):
+        """Stores audio bytes for a phrase and returns the cached file's path, or None if the clip can't fit"""
+        if len(data) > self.max_bytes:
+            return None  # Eviction would delete it straight away
+        key = self.key(engine, voice, text)
+        name = f"{key}.{extension}"
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            self._load_index()
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            old = self._index.get(key)
+            if old:
+                self._total -= old[1]
+                if old[0] != name:
+                    os.remove(os.path.join(self.directory, old[0]))
+            self._index[key] = [name, len(data), time.time()]
+            self._total += len(data)
+            self._evict()
+        return path
+
+    def _evict(self):
+        """Deletes least recently used clips until the cache fits in max_bytes"""
+        if self._total <= self.max_bytes:
+            return
+        for key, (name, size, _) in sorted(self._index.items(), key=lambda item: item[1][2]):
+            if self._total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            del self._index[key]
+            self._total -= size
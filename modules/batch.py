@@ -0,0 +1,211 @@
+import collections
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from modules import nlp, utils
+from modules.ai import get_openai_response
+from modules.intents import REMINDER_INQUIRY, STOP, classify_intent, is_reminder_intent
+from modules.reminders import get_reminder_content, get_reminder_datetime, reminder_skip_reason, save_reminder
+from modules.reminder_store import get_reminder_sync
+
+# ======================== Constants ========================
+
+BATCH_PROCESSES = min(4, os.cpu_count() or 1)  # Reminder extraction workers; each loads its own spaCy pipeline
+BATCH_THREADS = 8  # Chat turns waiting on OpenAI at once
+MAX_PENDING = 256  # Utterances read ahead of the output; reading pauses beyond this
+
+# ======================== Input ========================
+
+def parse_utterance(line):
+    """Returns (session, text) for a plain-text line, or a JSON line like {"text": ..., "session": ...}.
+
+    Plain lines, and JSON lines without a session, are independent conversations.
+    """
+    line = line.strip()
+    if not line.startswith('{'):
+        return None, line
+    record = json.loads(line)
+    if not isinstance(record, dict) or not isinstance(record.get('text'), str):
+        raise ValueError("expected an object with a \"text\" string")
+    session = record.get('session')
+    return (None if session is None else str(session)), record['text'].strip()
+
+# ======================== Reminder Workers ========================
+
+def _init_worker():
+    sys.stdout = sys.stderr  # Stray prints must not end up in the JSONL output
+    nlp.warm_up(background=False)
+
+def extract_reminder(text):
+    """Returns (content or None, ParsedDatetime) for a dictation.
+
+    Runs in a worker process, against that worker's own spaCy pipeline.
+    """
+    parsed = get_reminder_datetime(text)
+    return get_reminder_content(text, parsed), parsed
+
+def _done(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+# ======================== Batch Processor ========================
+
+class BatchProcessor:
+    """Runs utterances through the intent matcher, reminder extraction and chat, reporting results in input order.
+
+    Reminder dictations are extracted on a pool of worker processes, started on
+    first use. Chat turns run on threads; turns of the same session run one after
+    another so each sees the replies before it, while sessions run side by side.
+    Reminders are saved, and chat replies spoken, as results are written unless
+    side_effects is False. Like import_reminders_from_file, dictations that are not
+    understood are reported and skipped rather than sent to the chat model.
+    """
+
+    def __init__(self, processes=BATCH_PROCESSES, threads=BATCH_THREADS, side_effects=True):
+        self.processes = processes
+        self.side_effects = side_effects
+        self.counts = collections.Counter()  # Utterances by kind
+        self.errors = 0
+        self.elapsed = 0.0
+        self._pool = None
+        self._threads = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='batch-chat')
+        self._sessions = {}  # session -> (history, future of its latest turn)
+        self._write_error = None
+
+    def run(self, lines, write):
+        """Processes every line, calling write(result dict) for each in input order; returns summary()"""
+        started = time.perf_counter()
+        pending = queue.Queue(maxsize=MAX_PENDING)
+        writer = threading.Thread(target=self._write_loop, args=(pending, write), daemon=True)
+        writer.start()
+        try:
+            for number, line in enumerate(lines, 1):
+                if line.strip():
+                    pending.put(self.submit(number, line))
+        finally:
+            pending.put(None)
+            writer.join()
+            self.close()
+            self.elapsed = time.perf_counter() - started
+        if self._write_error is not None:
+            raise self._write_error
+        return self.summary()
+
+    def submit(self, number, line):
+        """Classifies one line and starts its work; returns (result dict so far, future of the rest)"""
+        record = {'line': number}
+        try:
+            session, text = parse_utterance(line)
+        except ValueError as e:
+            record['kind'] = 'invalid'
+            return record, _done({'error': f"Unreadable line: {e}"})
+        record.update(session=session, text=text)
+        intent = classify_intent(text)
+        record['intent'] = intent.category if intent else None
+        if intent is not None and intent.category == STOP:
+            record['kind'] = 'stop'
+            return record, _done({'response': "Goodbye!"})
+        if is_reminder_intent(intent):
+            if intent.category == REMINDER_INQUIRY:
+                record['kind'] = 'inquiry'
+                return record, _done({'response': "Yes, you can set a reminder. Please provide the details."})
+            record['kind'] = 'reminder'
+            return record, self._get_pool().submit(extract_reminder, text)
+        record['kind'] = 'chat'
+        return record, self._submit_chat(session, text)
+
+    def summary(self):
+        """Returns utterance counts by kind, errors, elapsed seconds and utterances per second"""
+        total = sum(self.counts.values())
+        return {
+            'utterances': total,
+            'kinds': dict(self.counts),
+            'errors': self.errors,
+            'seconds': self.elapsed,
+            'per_second': total / self.elapsed if self.elapsed else 0.0,
+        }
+
+    def close(self):
+        self._threads.shutdown()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self.side_effects:
+            utils.wait_until_spoken()
+
+    # ---------- Work ----------
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawn: forking would copy this process's threads and open connections into the workers
+            self._pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_init_worker)
+        return self._pool
+
+    def _submit_chat(self, session, text):
+        if session is None:
+            return self._threads.submit(self._chat, [], text, None)
+        history, previous = self._sessions.get(session, ([], None))
+        future = self._threads.submit(self._chat, history, text, previous)
+        self._sessions[session] = (history, future)
+        return future
+
+    @staticmethod
+    def _chat(history, text, previous):
+        if previous is not None:
+            wait([previous])  # Submitted earlier, so it is already running on another thread
+        history.append(("User", text))
+        answer = get_openai_response(history)
+        history.append(("Assistant", answer))
+        return {'response': answer}
+
+    # ---------- Output ----------
+
+    def _write_loop(self, pending, write):
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            record, future = item
+            try:
+                result = future.result()
+                record.update(self._finish_reminder(result) if record['kind'] == 'reminder' else result)
+            except Exception as e:
+                record['error'] = repr(e)
+            self.counts[record['kind']] += 1
+            if 'error' in record:
+                self.errors += 1
+            elif self.side_effects and record['kind'] == 'chat':
+                utils.speak_async(record['response'])
+            if self._write_error is None:
+                try:
+                    write(record)
+                except Exception as e:  # e.g. a closed pipe; keep draining so reading does not block
+                    self._write_error = e
+
+    def _finish_reminder(self, extracted):
+        content, parsed = extracted
+        reason = reminder_skip_reason(content, parsed)
+        if reason:
+            return {'reminder': None, 'skipped': reason, 'response': None}
+        result = {
+            'reminder': {'content': content, 'datetime': parsed.datetime.isoformat(), 'recurrence': parsed.recurrence,
+                         'confidence': parsed.confidence},
+            'response': None,  # Nothing was saved
+        }
+        if self.side_effects:
+            result['response'] = " ".join(save_reminder(content, parsed))
+        return result
+
+def sync_reminders():
+    """Pushes reminders saved by a batch to Google Calendar before the process exits"""
+    try:
+        get_reminder_sync().sync()
+    except Exception as e:
+        print(f"Reminder sync failed, saved reminders stay queued: {e}")
@@ -0,0 +1,205 @@
+import datetime
+import json
+import os.path
+import threading
+import time
+from urllib.parse import urlsplit
+from modules.lazy import lazy_import
+from modules.tracing import span, traced
+
+httplib2 = lazy_import('httplib2')
+google_requests = lazy_import('google.auth.transport.requests')
+google_auth_exceptions = lazy_import('google.auth.exceptions')
+google_credentials = lazy_import('google.oauth2.credentials')
+google_auth_httplib2 = lazy_import('google_auth_httplib2')
+oauth_flow = lazy_import('google_auth_oauthlib.flow')
+discovery = lazy_import('googleapiclient.discovery')
+
+# ======================== Constants ========================
+
+TOKEN_PATH = os.path.join('config', 'token.json')  # Path to store access token
+CREDENTIALS_PATH = os.path.join('config', 'credentials.json')  # Path to store API credentials
+DISCOVERY_CACHE_PATH = os.path.join('config', 'calendar_v3_discovery.json')  # Local copy of the discovery document
+DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/calendar/v3/rest'
+SCOPES = ['https://www.googleapis.com/auth/calendar']  # Required scopes for Google Calendar access
+REFRESH_MARGIN = datetime.timedelta(minutes=5)  # Refresh credentials this long before they expire
+HTTP_TIMEOUT = 30  # Seconds
+BATCH_MAX_REQUESTS = 50  # Google accepts at most 50 calls per batch request
+BATCH_RETRIES = 3  # Extra attempts for calls rejected with a rate limit or server error
+BATCH_RETRY_DELAY = 1.0  # Seconds before the first retry; doubles on each attempt
+
+# ======================== Calendar Client ========================
+
+class CalendarClient:
+    """Process-wide Google Calendar client that reuses credentials and the discovery document.
+
+    Credentials and the parsed discovery document are shared; each thread gets its own
+    service object because the underlying httplib2 connection is not thread-safe.
+    """
+
+    def __init__(self, credentials=None, api_endpoint=None):
+        self._credentials = credentials
+        self._api_endpoint = api_endpoint
+        self._discovery_doc = None
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    def get_service(self):
+        """Returns this thread's Calendar service, building it once per thread"""
+        creds = self._get_credentials()
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            with span('calendar.build'):
+                http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+                client_options = {'api_endpoint': self._api_endpoint} if self._api_endpoint else None
+                service = discovery.build_from_document(self._get_discovery_doc(), http=http,
+                                                        client_options=client_options)
+            self._local.service = service
+        return service
+
+    def _get_credentials(self):
+        """Loads credentials once and refreshes them only when close to expiry"""
+        with self._lock:
+            creds = self._credentials
+            if creds is None:
+                creds = self._load_credentials()
+            elif self._needs_refresh(creds):
+                with span('calendar.auth'):
+                    creds.refresh(google_requests.Request())
+                    self._save_credentials(creds)
+            self._credentials = creds
+            return creds
+
+    def _needs_refresh(self, creds):
+        """Checks whether OAuth credentials are expired or about to expire"""
+        expiry = getattr(creds, 'expiry', None)
+        if expiry is None or not getattr(creds, 'refresh_token', None):
+            return False
+        return expiry - datetime.datetime.utcnow() < REFRESH_MARGIN
+
+    @traced('calendar.auth')
+    def _load_credentials(self):
+        """Reads token.json or runs the OAuth flow if no usable token exists"""
+        creds = None
+        if os.path.exists(TOKEN_PATH):
+            creds = google_credentials.Credentials.from_authorized_user_file(TOKEN_PATH)
+        if creds and creds.refresh_token and (not creds.valid or self._needs_refresh(creds)):
+            creds.refresh(google_requests.Request())
+            self._save_credentials(creds)
+        elif not creds or not creds.valid:
+            flow = oauth_flow.InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
+            creds = flow.run_local_server(port=0)
+            self._save_credentials(creds)
+        return creds
+
+    def _save_credentials(self, creds):
+        """Persists refreshed credentials so the next launch can reuse them"""
+        if hasattr(creds, 'to_json'):
+            with open(TOKEN_PATH, 'w') as token:
+                token.write(creds.to_json())
+
+    def _get_discovery_doc(self):
+        """Returns the Calendar v3 discovery document from memory, disk or the network"""
+        with self._lock:
+            if self._discovery_doc is None:
+                doc = load_discovery_doc()
+                if self._api_endpoint:
+                    # Batch requests go to rootUrl + batchPath, which client_options does not override
+                    parts = urlsplit(self._api_endpoint)
+                    doc = json.dumps(dict(json.loads(doc), rootUrl=f"{parts.scheme}://{parts.netloc}/"))
+                self._discovery_doc = doc
+            return self._discovery_doc
+
+def load_discovery_doc():
+    """Loads the discovery document from the local cache, fetching and caching it if missing"""
+    if os.path.exists(DISCOVERY_CACHE_PATH):
+        with open(DISCOVERY_CACHE_PATH) as f:
+            return f.read()
+    try:
+        from googleapiclient.discovery_cache import get_static_doc
+        doc = get_static_doc('calendar', 'v3')
+    except ImportError:
+        doc = None
+    if doc is None:
+        response, content = httplib2.Http(timeout=HTTP_TIMEOUT).request(DISCOVERY_URL)
+        if response.status != 200:
+            raise RuntimeError(f"Could not fetch Calendar discovery document: HTTP {response.status}")
+        doc = content.decode('utf-8')
+    json.loads(doc)  # Refuse to cache anything that is not valid JSON
+    os.makedirs(os.path.dirname(DISCOVERY_CACHE_PATH), exist_ok=True)
+    with open(DISCOVERY_CACHE_PATH, 'w') as f:
+        f.write(doc)
+    return doc
+
+# ======================== Batch Requests ========================
+
+@traced('calendar.batch')
+def execute_batch(service, requests, retries=BATCH_RETRIES, retry_delay=BATCH_RETRY_DELAY):
+    """Executes API requests in batches of up to 50 per HTTP round trip.
+
+    Returns a (response, exception) pair for each request, in order. Calls rejected
+    with a rate limit or server error are retried in a later batch with backoff.
+    Transport errors (e.g. no network) are raised.
+    """
+    results = [None] * len(requests)
+    remaining = list(range(len(requests)))
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(retry_delay * 2 ** (attempt - 1))
+        retry = []
+        for offset in range(0, len(remaining), BATCH_MAX_REQUESTS):
+            chunk = remaining[offset:offset + BATCH_MAX_REQUESTS]
+
+            def callback(request_id, response, exception):
+                index = int(request_id)
+                results[index] = (response, exception)
+                if exception is not None and is_transient_error(exception):
+                    retry.append(index)
+
+            batch = service.new_batch_http_request(callback=callback)
+            for index in chunk:
+                batch.add(requests[index], request_id=str(index))
+            batch.execute()
+        if not retry:
+            break
+        remaining = sorted(retry)
+    return results
+
+def http_status(error):
+    """Returns the HTTP status of a googleapiclient HttpError, or None for network errors"""
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    return int(status) if status is not None else None
+
+def is_network_error(error):
+    """Checks whether an error without an HTTP status came from the network (offline, DNS, timeout)"""
+    # socket timeouts and connection errors are OSErrors; httplib2 reports unknown hosts separately
+    return isinstance(error, (OSError, httplib2.ServerNotFoundError, google_auth_exceptions.TransportError))
+
+def is_transient_error(error):
+    """Checks whether a failed call is worth retrying later (offline, rate limited or a server error)"""
+    status = http_status(error)
+    if status is None:
+        return is_network_error(error)  # Anything else is a bug or a bad response; retrying won't help
+    if status == 403:
+        return any(reason in str(error) for reason in ('rateLimitExceeded', 'userRateLimitExceeded'))
+    return status == 429 or status >= 500
+
+# ======================== Shared Client ========================
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_calendar_client():
+    """Returns the shared CalendarClient, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = CalendarClient()
+    return _client
+
+def set_calendar_client(client):
+    """Replaces the shared client, e.g. with one pointed at a local fake server"""
+    global _client
+    with _client_lock:
+        _client = client
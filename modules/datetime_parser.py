@@ -0,0 +1,208 @@
+import calendar
+import collections
+import datetime
+import re
+import threading
+from modules.lazy import lazy_import
+
+pdt = lazy_import('parsedatetime')
+
+# ======================== Constants ========================
+
+DATETIME_CACHE_SIZE = 1024  # Memoized phrases per day
+DEFAULT_HOUR = 9  # Time given to reminders that name a day but no time, as parsedatetime does for "tomorrow"
+RECURRENCE_DAILY = 'RRULE:FREQ=DAILY'
+
+# parsedatetime parse status flags
+_DATE_PARSED = 1
+_TIME_PARSED = 2
+
+# Constants table, compiled once: hours for time-of-day words when no clock time is given ...
+TIME_OF_DAY_HOURS = {"morning": 7, "afternoon": 13, "evening": 19, "night": 21}
+_TIME_OF_DAY_PATTERN = re.compile('|'.join(TIME_OF_DAY_HOURS))
+# ... "on the 21st" / "on the 5th of january", which parsedatetime does not read as a day of the month ...
+_MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+_ORDINAL_DAY_PATTERN = re.compile(r"\bon the (\d{1,2})(?:st|nd|rd|th)\b(?: of (" + '|'.join(_MONTHS) + r"))?")
+# ... recurrence phrases and their RRULE ...
+RECURRENCE_PATTERNS = [(re.compile(r"\bevery ?day\b"), RECURRENCE_DAILY)]
+# ... words pinning a time to the current day, so it is never rolled over to tomorrow ...
+_THIS_DAY_PATTERN = re.compile(r"\b(?:this (?:morning|afternoon|evening)|tonight|today)\b")
+# ... clock times, as opposed to the hours parsedatetime gives "this evening" or "tonight" ...
+_CLOCK_PATTERN = re.compile(r"\d|\bnoon\b|\bmidnight\b")
+# ... and phrases resolved against the current time rather than the current day, which are never memoized
+_RELATIVE_PATTERN = re.compile(r"\b(?:in (?:an?|\d+|a few|half an) |from now\b|\bnow\b|\blater\b)")
+
+# How sure the resolution is, by (day named, source of the time of day)
+CONFIDENCE = {
+    (True, 'clock'): 1.0,  # "tomorrow at 10 am", "on the 21st at 3 pm"
+    (False, 'clock'): 0.9,  # "at 5 pm": today, or tomorrow once it has passed
+    (True, 'period'): 0.8,  # "friday morning"
+    (False, 'period'): 0.7,  # "this evening"
+    (True, 'default'): 0.6,  # "next monday": DEFAULT_HOUR
+    (False, 'default'): 0.0,  # Nothing recognised: now
+}
+PAST_CONFIDENCE = 0.3  # Cap for a time pinned to a day that has already passed, e.g. "this morning" said at 6 pm
+MIN_CONFIDENCE = 0.5  # Below this, callers ask for the time again instead of saving the reminder
+
+# ======================== Results ========================
+
+class ParsedDatetime(collections.namedtuple('ParsedDatetime', ['datetime', 'recurrence', 'confidence'])):
+    """A resolved reminder time: naive local datetime, RRULE line or None, and confidence from 0 to 1"""
+
+    __slots__ = ()
+
+    @property
+    def date_str(self):
+        return self.datetime.strftime('%Y-%m-%d')
+
+    @property
+    def time_str(self):
+        return self.datetime.strftime('%I:%M %p')
+
+    @property
+    def is_recurring(self):
+        return self.recurrence is not None
+
+    @property
+    def is_understood(self):
+        """Whether the time is clear enough to save: something was recognised and it is not in the past"""
+        return self.confidence >= MIN_CONFIDENCE
+
+# ======================== Datetime Parser ========================
+
+class DatetimeParser:
+    """Resolves the date, time and recurrence in reminder phrases like "every day at 8 am".
+
+    The parsedatetime Calendar is built once and shared. Phrases are resolved against
+    the start of the current day and memoized for that day, keyed by the normalized
+    phrase. After the lookup, a time that has already passed rolls over to tomorrow
+    ("at 5 pm" said at 6 pm) unless it is pinned to its day ("this morning", "on the
+    18th"); those are kept, with confidence capped at PAST_CONFIDENCE, below the
+    MIN_CONFIDENCE callers need to save them. Phrases relative to the current time
+    ("in 20 minutes") are never cached.
+    """
+
+    def __init__(self, cache_size=DATETIME_CACHE_SIZE, clock=datetime.datetime.now):
+        self.cache_size = cache_size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._calendar = None
+        self._parse_lock = threading.Lock()  # parsedatetime keeps per-parse state on the Calendar
+        self._cache = collections.OrderedDict()  # normalized phrase -> _parse_phrase() result
+        self._cache_day = None
+        self._lock = threading.Lock()
+
+    def parse(self, text, now=None):
+        """Returns the ParsedDatetime for one phrase"""
+        return self._resolve(text, now or self.clock())
+
+    def parse_many(self, texts, now=None):
+        """Resolves many phrases against the same moment, parsing each distinct phrase once"""
+        now = now or self.clock()
+        resolved = {}
+        for text in texts:
+            if text not in resolved:
+                resolved[text] = self._resolve(text, now)
+        return [resolved[text] for text in texts]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    # ---------- Resolution ----------
+
+    def _resolve(self, text, now):
+        phrase = " ".join(text.lower().split())
+        if _RELATIVE_PATTERN.search(phrase):
+            resolution = self._parse_phrase(phrase, now)
+        else:
+            resolution = self._cached(phrase, now.date())
+        moment, recurrence, day_named, time_source, pinned = resolution
+        confidence = CONFIDENCE[day_named, time_source]
+        if time_source == 'default' and not day_named:
+            moment = now.replace(second=0, microsecond=0)
+        elif moment < now:
+            if pinned:
+                confidence = min(confidence, PAST_CONFIDENCE)  # Kept, but not is_understood
+            else:
+                moment += datetime.timedelta(days=1)  # "at 5 pm" said at 6 pm means tomorrow
+        return ParsedDatetime(moment, recurrence, confidence)
+
+    def _cached(self, phrase, day):
+        with self._lock:
+            if self._cache_day != day:
+                self._cache.clear()
+                self._cache_day = day
+            resolution = self._cache.get(phrase)
+            if resolution is not None:
+                self._cache.move_to_end(phrase)
+                self.hits += 1
+                return resolution
+            self.misses += 1
+        resolution = self._parse_phrase(phrase, datetime.datetime.combine(day, datetime.time()))
+        with self._lock:
+            if self._cache_day == day:
+                self._cache[phrase] = resolution
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return resolution
+
+    def _parse_phrase(self, phrase, source):
+        """Returns (datetime, recurrence, day named, time source, pinned to its day) for a normalized phrase"""
+        with self._parse_lock:
+            if self._calendar is None:
+                self._calendar = pdt.Calendar(pdt.Constants())
+            time_struct, status = self._calendar.parse(phrase, source.timetuple())
+        moment = datetime.datetime(*time_struct[:6])
+        day_named = bool(status & _DATE_PARSED)
+        ordinal = _ORDINAL_DAY_PATTERN.search(phrase)
+        if ordinal:
+            month = _MONTHS[ordinal.group(2)] if ordinal.group(2) else None
+            day = _next_day_of_month(source.date(), int(ordinal.group(1)), month)
+            if day is not None:
+                moment = datetime.datetime.combine(day, moment.time())
+                day_named = True
+        if day_named and moment.date() < source.date():
+            moment = datetime.datetime.combine(_next_day_of_month(source.date(), moment.day, None) or source.date(),
+                                               moment.time())
+        if status & _TIME_PARSED:
+            time_source = 'clock' if _CLOCK_PATTERN.search(phrase) else 'period'
+        else:
+            period = _TIME_OF_DAY_PATTERN.search(phrase)
+            hour = TIME_OF_DAY_HOURS[period.group(0)] if period else DEFAULT_HOUR
+            moment = moment.replace(hour=hour, minute=0, second=0)
+            time_source = 'period' if period else 'default'
+        recurrence = next((rule for pattern, rule in RECURRENCE_PATTERNS if pattern.search(phrase)), None)
+        pinned = day_named or bool(_THIS_DAY_PATTERN.search(phrase))
+        return moment, recurrence, day_named, time_source, pinned
+
+def _next_day_of_month(today, day, month=None):
+    """First date on or after today falling on the given day (of the given month), or None if there is none"""
+    if day < 1:
+        return None
+    year, current = today.year, month or today.month
+    for _ in range(48):
+        if day <= calendar.monthrange(year, current)[1]:
+            candidate = datetime.date(year, current, day)
+            if candidate >= today:
+                return candidate
+        if month:
+            year += 1
+        else:
+            year, current = (year + 1, 1) if current == 12 else (year, current + 1)
+    return None
+
+# ======================== Shared Parser ========================
+
+_parser = None
+_parser_lock = threading.Lock()
+
+def get_datetime_parser():
+    """Returns the shared DatetimeParser"""
+    global _parser
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                _parser = DatetimeParser()
+    return _parser
@@ -0,0 +1,160 @@
+import json
+import math
+import os
+import time
+
+# ======================== Constants ========================
+
+FOCUS_STATE_PATH = os.path.join('data', 'focus_session.json')
+WORK_SECONDS = 25 * 60
+BREAK_SECONDS = 5 * 60
+ADJUST_STEP = 5 * 60  # What the -5 / +5 buttons add or remove
+MIN_SECONDS = 5 * 60
+MAX_EXTRA_SECONDS = 30 * 60  # A phase can be stretched to at most WORK_SECONDS plus this
+
+WORK = 'work'
+BREAK = 'break'
+
+# ======================== Focus Timer ========================
+
+class FocusTimer:
+    """Pomodoro timer that derives the remaining time from a deadline instead of counting ticks.
+
+    While running, remaining time is `deadline - clock()` on a monotonic clock, so a
+    stalled mainloop delays a repaint but never slows the timer. Work and break phases
+    alternate. The session is saved with a wall-clock deadline, so a running timer picks up
+    where it should be after a restart. Both clocks can be injected for testing.
+    """
+
+    def __init__(self, work_seconds=WORK_SECONDS, break_seconds=BREAK_SECONDS, state_path=FOCUS_STATE_PATH,
+                 clock=time.monotonic, wall_clock=time.time, on_phase_end=None):
+        self.work_seconds = work_seconds
+        self.break_seconds = break_seconds
+        self.state_path = state_path
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.on_phase_end = on_phase_end  # on_phase_end(finished_phase, next_phase)
+        self.phase = WORK
+        self.running = False
+        self._remaining = float(work_seconds)  # Valid while paused
+        self._deadline = None  # Monotonic deadline while running
+        self.load()
+
+    # ---------- Reading ----------
+
+    def remaining(self):
+        """Seconds left in the current phase"""
+        if self.running:
+            return max(0.0, self._deadline - self.clock())
+        return self._remaining
+
+    def display_seconds(self):
+        """Whole seconds to show; rounds up so the display reads 00:00 only when the phase is over"""
+        return math.ceil(self.remaining())
+
+    def display_text(self):
+        minutes, seconds = divmod(self.display_seconds(), 60)
+        return f"{minutes:02d}:{seconds:02d}"
+
+    def next_repaint_delay(self):
+        """Seconds until the displayed second changes (or the phase ends)"""
+        remaining = self.remaining()
+        delay = remaining - (math.ceil(remaining) - 1)
+        return delay if delay > 0 else 1.0
+
+    # ---------- Controls ----------
+
+    def start(self):
+        """Starts or resumes the current phase; returns False if it was already running"""
+        if self.running:
+            return False
+        self.running = True
+        self._deadline = self.clock() + self._remaining
+        self.save()
+        return True
+
+    def pause(self):
+        """Freezes the remaining time exactly; returns False if the timer was not running"""
+        if not self.running:
+            return False
+        self._remaining = self.remaining()
+        self.running = False
+        self._deadline = None
+        self.save()
+        return True
+
+    def reset(self):
+        """Stops the timer and goes back to a full work phase"""
+        self.running = False
+        self._deadline = None
+        self.phase = WORK
+        self._remaining = float(self.work_seconds)
+        self.save()
+
+    def adjust(self, seconds):
+        """Adds (or with a negative value removes) time while paused; returns False while running"""
+        if self.running:
+            return False
+        self._remaining = min(max(self._remaining + seconds, MIN_SECONDS), self.work_seconds + MAX_EXTRA_SECONDS)
+        self.save()
+        return True
+
+    def tick(self):
+        """Advances to the next phase if the current one is over; returns the finished phase or None"""
+        if not self.running or self.remaining() > 0:
+            return None
+        finished = self.phase
+        overshoot = self.clock() - self._deadline
+        self._next_phase()
+        # Start the next phase from the old deadline, not from now, so late ticks do not add up
+        self._deadline = self.clock() + max(0.0, self._remaining - overshoot)
+        self.save()
+        if self.on_phase_end:
+            self.on_phase_end(finished, self.phase)
+        return finished
+
+    def _next_phase(self):
+        self.phase = BREAK if self.phase == WORK else WORK
+        self._remaining = float(self.break_seconds if self.phase == BREAK else self.work_seconds)
+
+    # ---------- Persistence ----------
+
+    def save(self):
+        """Writes the session so it survives a restart"""
+        if not self.state_path:
+            return
+        state = {'phase': self.phase, 'running': self.running}
+        if self.running:
+            state['deadline'] = self.wall_clock() + self.remaining()
+        else:
+            state['remaining'] = self._remaining
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            temp_path = self.state_path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            print(f"Error saving focus session: {e}")
+
+    def load(self):
+        """Restores a saved session; a running one continues as if the app had never closed"""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading focus session: {e}")
+            return
+        self.phase = state.get('phase', WORK) if state.get('phase') in (WORK, BREAK) else WORK
+        if not state.get('running'):
+            self._remaining = float(state.get('remaining', self.work_seconds))
+            return
+        left = state['deadline'] - self.wall_clock()
+        # Skip over any phases that ended while the app was closed
+        while left <= 0:
+            self._next_phase()
+            left += self._remaining
+        self.running = True
+        self._deadline = self.clock() + left
@@ -0,0 +1,55 @@
+import collections
+import threading
+from PIL import Image, ImageColor, ImageTk
+
+# ======================== Constants ========================
+
+GRADIENT_CACHE_SIZE = 16  # Rendered sizes kept; a few frames times a few recent sizes each
+RESIZE_DEBOUNCE_MS = 120  # Render only once resizing has been quiet this long
+
+# ======================== Gradient Rendering ========================
+
+def gradient_column(height, color1, color2):
+    """Builds a 1-pixel-wide vertical gradient from color1 (top) to color2 (bottom).
+
+    The interpolation is done in C by Pillow: a 0-255 ramp is resized to the target
+    height and mapped through a lookup table per channel, instead of a Python loop per row.
+    """
+    ramp = Image.linear_gradient('L').resize((1, height), Image.Resampling.BILINEAR)
+    bands = [ramp.point([int(start + (end - start) * v / 255) for v in range(256)])
+             for start, end in zip(ImageColor.getrgb(color1)[:3], ImageColor.getrgb(color2)[:3])]
+    return Image.merge('RGB', bands)
+
+def render_gradient(width, height, color1, color2):
+    """Renders a width x height vertical gradient by stretching a single column"""
+    return gradient_column(height, color1, color2).resize((width, height), Image.Resampling.NEAREST)
+
+class GradientRenderer:
+    """Renders gradient backgrounds as PhotoImages, caching the most recently used sizes.
+
+    One renderer is shared by every frame, so frames of the same size share one image.
+    """
+
+    def __init__(self, max_entries=GRADIENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._cache = collections.OrderedDict()  # (width, height, color1, color2) -> PhotoImage
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def photo(self, width, height, color1, color2):
+        """Returns a PhotoImage of the gradient, rendering it only if this size is not cached"""
+        key = (width, height, color1, color2)
+        with self._lock:
+            photo = self._cache.get(key)
+            if photo is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return photo
+            self.misses += 1
+        photo = ImageTk.PhotoImage(render_gradient(width, height, color1, color2))
+        with self._lock:
+            self._cache[key] = photo
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return photo
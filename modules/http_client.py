@@ -0,0 +1,179 @@
+import bisect
+import threading
+import time
+from urllib.parse import urlsplit
+from modules.lazy import lazy_import
+
+requests = lazy_import('requests')
+requests_adapters = lazy_import('requests.adapters')
+urllib3_retry = lazy_import('urllib3.util.retry')
+
+# ======================== Constants ========================
+
+CONNECT_TIMEOUT = 3.05  # Seconds to open a connection (just over a TCP retransmit window)
+READ_TIMEOUT = 30  # Seconds to wait for the next bytes of a response
+RETRY_TOTAL = 3  # Retries after the first attempt
+RETRY_BACKOFF = 0.5  # Retry delays are 0.5 s, 1 s, 2 s ... unless the server sends Retry-After
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Methods retried after an error status. A TTS POST answered with 5xx may already have been
+# processed and billed, so POSTs are only retried when the connection could not be opened.
+RETRY_METHODS = ('GET', 'HEAD')
+POOL_CONNECTIONS = 4  # Keep-alive connections kept open per host
+
+# Upper bounds (ms) of the latency histogram buckets; slower requests land in a final overflow bucket
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# ======================== Latency Histogram ========================
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; percentiles are reported as their bucket's upper bound"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+        self.retries = 0
+
+    def record(self, ms):
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction):
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'retries': self.retries,
+            'mean_ms': self.total_ms / self.count if self.count else None,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': self.max_ms,
+            'buckets': dict(zip([f"<={bound}" for bound in self.bounds] + ["inf"], self.counts)),
+        }
+
+# ======================== HTTP Client ========================
+
+class HTTPClient:
+    """Shared requests wrapper with one keep-alive Session per host.
+
+    Every request gets connect/read timeouts and is retried with exponential backoff
+    on connection errors; GETs and HEADs also on 429/5xx responses. The time until the response
+    headers arrive is recorded per endpoint (the `endpoint` argument, or method plus
+    host and path), so streamed bodies are not counted.
+    """
+
+    def __init__(self, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), retries=RETRY_TOTAL, backoff=RETRY_BACKOFF,
+                 pool_connections=POOL_CONNECTIONS):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_connections = pool_connections
+        self._sessions = {}  # (scheme, host) -> Session
+        self._histograms = {}  # endpoint -> LatencyHistogram
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, endpoint=None, **kwargs):
+        """Sends a request through the host's pooled session and returns the requests Response.
+
+        Responses still failing after the retries are returned as-is, so callers check
+        the status code as they would with plain requests. A streamed response must be
+        read to the end or closed to give its connection back to the pool.
+        """
+        parts = urlsplit(url)
+        endpoint = endpoint or f"{method} {parts.netloc}{parts.path}"
+        kwargs.setdefault('timeout', self.timeout)
+        session = self._session(parts.scheme, parts.netloc)
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self._histogram(endpoint).errors += 1
+            raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        retries = getattr(response.raw, 'retries', None)
+        with self._lock:
+            histogram = self._histogram(endpoint)
+            histogram.record(elapsed_ms)
+            histogram.retries += len(retries.history) if retries is not None else 0
+            if response.status_code >= 400:
+                histogram.errors += 1
+        return response
+
+    def stats(self):
+        """Returns {endpoint: latency summary} for every endpoint called so far"""
+        with self._lock:
+            return {endpoint: histogram.summary() for endpoint, histogram in self._histograms.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
+
+    def _histogram(self, endpoint):
+        histogram = self._histograms.get(endpoint)
+        if histogram is None:
+            histogram = self._histograms[endpoint] = LatencyHistogram()
+        return histogram
+
+    def _session(self, scheme, host):
+        key = (scheme, host)
+        session = self._sessions.get(key)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is None:
+                    session = self._sessions[key] = self._new_session()
+        return session
+
+    def _new_session(self):
+        retry = urllib3_retry.Retry(
+            total=self.retries, connect=self.retries, read=False, backoff_factor=self.backoff,
+            status_forcelist=RETRY_STATUSES, allowed_methods=frozenset(RETRY_METHODS),
+            respect_retry_after_header=True, raise_on_status=False)
+        adapter = requests_adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.pool_connections, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+# ======================== Shared Client ========================
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client():
+    """Returns the process-wide HTTPClient so every caller reuses the same connections"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HTTPClient()
+    return _client
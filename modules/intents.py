@@ -0,0 +1,114 @@
+import collections
+import re
+
+# ======================== Intent Phrase Tables ========================
+
+# Inputs that end the session (matched against the whole input)
+STOP_PHRASES = ["exit", "goodbye"]
+# Patterns indicating a clear intent to set a reminder
+CLEAR_INTENT_PHRASES = [
+    "remind me to", "set a reminder to", "add to my reminders to"
+]
+# Patterns indicating a question or inquiry about setting a reminder
+INQUIRY_PHRASES = [
+    "can we set a reminder", "is it possible to set",
+    "how do i set", "can you set reminders",
+    "let's set a reminder", "i need a reminder",
+    "can you remind me something", "can you set a reminder for"
+]
+# Less specific commands that imply a reminder is needed
+VAGUE_PHRASES = [
+    "let's set a reminder", "i need a reminder",
+    "can you remind me something", "can you set a reminder for"
+]
+
+# ======================== Intent Categories ========================
+
+STOP = 'stop'
+REMINDER_INQUIRY = 'reminder_inquiry'  # Asking about reminders; answer without creating one
+REMINDER_CREATE = 'reminder_create'  # Dictating a reminder to create
+REMINDER_CATEGORIES = (REMINDER_INQUIRY, REMINDER_CREATE)
+
+# Phrase tables in priority order: when several phrases match, the earliest table wins.
+# Vague phrases ask for details rather than carrying them, so they are answered like inquiries.
+INTENT_TABLES = [
+    (REMINDER_INQUIRY, INQUIRY_PHRASES),
+    (REMINDER_INQUIRY, VAGUE_PHRASES),
+    (REMINDER_CREATE, CLEAR_INTENT_PHRASES),
+]
+
+Intent = collections.namedtuple('Intent', ['category', 'phrase', 'span'])
+
+def _trie_regex(phrases):
+    """Builds a regex with shared prefixes factored out, so matching walks a trie instead of trying every phrase"""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        end = node.get('') is True
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 and not end else '(?:' + '|'.join(branches) + ')'
+        return body + '?' if end else body
+
+    return build(trie)
+
+def _compile_tables(tables):
+    """Builds one case-insensitive pattern over every phrase table"""
+    priority = {}
+    for rank, (category, phrases) in enumerate(tables):
+        for phrase in phrases:
+            priority.setdefault(phrase.lower(), (rank, category))
+    return re.compile(_trie_regex(priority)), priority
+
+# Matched against lowercased input; a case-sensitive pattern is several times faster than re.IGNORECASE
+_PHRASE_PATTERN, _PHRASE_PRIORITY = _compile_tables(INTENT_TABLES)
+_PHRASE_PATTERN_ANY_CASE = re.compile(_PHRASE_PATTERN.pattern, re.IGNORECASE)
+_STOP_SET = frozenset(STOP_PHRASES)
+
+# ======================== Classification ========================
+
+def _phrase_of(match):
+    """Returns the table phrase a match stands for"""
+    phrase = match.group().lower()
+    if phrase not in _PHRASE_PRIORITY:
+        # Case-insensitive matches like "İ" lowercase to more than the phrase's own letters
+        phrase = next(known for known in _PHRASE_PRIORITY
+                      if re.fullmatch(re.escape(known), match.group(), re.IGNORECASE))
+    return phrase
+
+def classify_intent(user_input):
+    """Returns the Intent for user_input, or None when no phrase table matches"""
+    lowered = user_input.lower()
+    stripped = lowered.strip()
+    if stripped in _STOP_SET:
+        return Intent(STOP, stripped, (0, len(user_input)))
+    if len(lowered) == len(user_input):
+        pattern, text = _PHRASE_PATTERN, lowered
+    else:
+        # Lowercasing changed the length (rare non-ASCII input); match the original so spans line up
+        pattern, text = _PHRASE_PATTERN_ANY_CASE, user_input
+    best = pattern.search(text)
+    if best is None:
+        return None
+    phrase = _phrase_of(best)
+    rank, category = _PHRASE_PRIORITY[phrase]
+    match = best
+    while rank:  # Only a lower-priority phrase so far; a later phrase may outrank it
+        match = pattern.search(text, match.end())
+        if match is None:
+            break
+        later_phrase = _phrase_of(match)
+        later_rank, later_category = _PHRASE_PRIORITY[later_phrase]
+        if later_rank < rank:
+            best, phrase, rank, category = match, later_phrase, later_rank, later_category
+    return Intent(category, phrase, best.span())
+
+def is_reminder_intent(intent):
+    """Checks whether an Intent is about reminders"""
+    return intent is not None and intent.category in REMINDER_CATEGORIES
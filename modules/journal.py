@@ -0,0 +1,182 @@
+import datetime
+import glob
+import json
+import mmap
+import os
+import queue
+import threading
+
+# ======================== Constants ========================
+
+JOURNAL_DIR = 'journal'
+JOURNAL_NAME = 'iva_conversation'
+JOURNAL_MAX_BYTES = 5 * 1024 * 1024  # The journal is rotated once it grows past this size
+RESTORE_MAX_TURNS = 50  # Turns read back from the journal on startup
+
+# ======================== Conversation Journal ========================
+
+class ConversationJournal:
+    """Append-only JSONL record of the conversation, written as each turn happens.
+
+    Records are queued and written by a background thread to a line-buffered file,
+    so a crash loses at most the line being written and callers never wait on disk.
+    """
+
+    def __init__(self, directory=JOURNAL_DIR, name=JOURNAL_NAME, max_bytes=JOURNAL_MAX_BYTES):
+        self.directory = directory
+        self.name = name
+        self.max_bytes = max_bytes
+        self.path = os.path.join(directory, f"{name}.jsonl")
+        self._queue = queue.Queue()
+        self._file = None
+        self._writer = None
+        self._lock = threading.Lock()
+        self._seq = None  # Sequence number of the last recorded turn
+        self._carried_bytes = 0  # Size of what the current file started with after a rotation
+
+    # ---------- Writing ----------
+
+    def record(self, role, content):
+        """Queues one conversation turn to be appended and returns its sequence number"""
+        with self._lock:
+            if self._seq is None:
+                self._seq = _last_seq(self._latest_paths())
+            self._seq += 1
+            seq = self._seq
+        self._put({'seq': seq, 'ts': _now(), 'role': role, 'content': content})
+        return seq
+
+    def record_summary(self, summary, through):
+        """Queues the running summary of every turn up to sequence number `through`"""
+        self._put({'ts': _now(), 'summary': summary, 'through': through})
+
+    def flush(self):
+        """Blocks until every queued record is on disk"""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self):
+        """Writes what is queued, then stops the writer and closes the file"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+
+    def _put(self, record):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True)
+                self._writer.start()
+        self._queue.put(record)
+
+    def _write_loop(self):
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    if self._file is not None:
+                        self._file.close()
+                        self._file = None
+                    return
+                self._write(json.dumps(record, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"Error writing conversation journal: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, line):
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._file = open(self.path, 'a', buffering=1, encoding='utf-8')
+        self._file.write(line)
+        # Measured past the carried-over records, so a large carry-over can't cause a rotation on every write
+        if self._file.tell() - self._carried_bytes >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """Moves the full journal aside under a timestamped name and starts a new one.
+
+        The new file starts with the latest summary and the turns after it, up to
+        RESTORE_MAX_TURNS, so load() still finds the unsummarized conversation.
+        """
+        self._file.close()
+        self._file = None
+        stamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        rotated = os.path.join(self.directory, f"{self.name}_{stamp}.jsonl")
+        os.replace(self.path, rotated)
+        summary, turns = _read_tail(rotated, RESTORE_MAX_TURNS)
+        carried = [summary] if summary else []
+        self._file = open(self.path, 'a', buffering=1, encoding='utf-8')
+        for record in carried + turns:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")  # Not _write: never rotates again
+        self._carried_bytes = self._file.tell()
+
+    # ---------- Reading ----------
+
+    def load(self, max_turns=RESTORE_MAX_TURNS):
+        """Returns (summary, turns) from the end of the latest journal without reading all of it.
+
+        Turns already covered by the summary are left out.
+        """
+        for path in self._latest_paths():
+            summary, turns = _read_tail(path, max_turns)
+            if summary or turns:
+                return (summary['summary'] if summary else ""), [(turn['role'], turn['content']) for turn in turns]
+        return "", []
+
+    def _latest_paths(self):
+        rotated = sorted(glob.glob(os.path.join(self.directory, f"{self.name}_*.jsonl")), reverse=True)
+        return [self.path] + rotated[:1]
+
+def _read_tail(path, max_turns):
+    """Walks a journal backwards via mmap, returning the latest summary record (or None) and the turn records after it"""
+    summary, through, turns = None, None, []
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return summary, turns
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = len(mm)
+        while end > 0 and (through is None or len(turns) < max_turns):
+            start = mm.rfind(b'\n', 0, end - 1) + 1
+            line = mm[start:end].strip()
+            end = start
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # A line cut short by a crash
+            if 'summary' in record:
+                if through is None:
+                    summary, through = record, record['through']
+                continue
+            if through is not None and record['seq'] <= through:
+                break  # Everything from here back is in the summary
+            if len(turns) < max_turns:
+                turns.append(record)  # Past max_turns, keep walking back only to find the summary
+    turns.reverse()
+    return summary, turns
+
+def _last_seq(paths):
+    """Finds the last sequence number used so numbering continues across restarts"""
+    through = 0
+    for path in paths:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            continue
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            while end > 0:
+                start = mm.rfind(b'\n', 0, end - 1) + 1
+                line = mm[start:end].strip()
+                end = start
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if 'seq' in record:
+                    return record['seq']
+                through = max(through, record.get('through', 0))
+    return through
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec='seconds')
@@ -0,0 +1,47 @@
+import importlib
+import threading
+
+# ======================== Lazy Imports ========================
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    Heavy dependencies (spaCy, Google APIs, pygame, ...) are bound with lazy_import so
+    importing IVA's modules is cheap and each library loads only when first used.
+    The import is guarded by a lock so background warm-up threads can trigger it safely.
+    """
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with self.__dict__['_lock']:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self.__dict__['_name'])
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+def lazy_import(name):
+    """Returns a proxy for the named module that imports it on first use"""
+    return LazyModule(name)
+
+def preload(*modules):
+    """Imports lazy modules now, e.g. from a background warm-up thread"""
+    for module in modules:
+        if isinstance(module, LazyModule):
+            module._load()
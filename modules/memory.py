@@ -0,0 +1,205 @@
+import collections
+import threading
+from modules.ai import summarize_conversation
+
+# ======================== Constants ========================
+
+RECENT_TOKEN_BUDGET = 1500  # Tokens of recent turns sent verbatim with every request
+MAX_MESSAGE_TOKENS = 600  # Longer messages are truncated when sent to the model
+MAX_PENDING_TOKENS = 4000  # Evicted turns waiting for summarization; oldest are folded into a digest beyond this
+OVERFLOW_DIGEST_TOKENS = 400  # Size of the truncated digest that stands in for overflowing turns
+OVERFLOW_TURN_TOKENS = 40  # Each overflowing turn keeps at most this much in the digest
+OVERFLOW_ROLE = "Earlier turns (truncated)"  # Role of the digest entry handed to the summarizer
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and separators the chat format adds per message
+
+_encoding = None  # tiktoken encoding, loaded on first use; False when tiktoken is unavailable
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+                except ImportError:
+                    _encoding = False
+    return _encoding
+
+def count_tokens(text):
+    """Count tokens the way the chat model does"""
+    encoding = _get_encoding()
+    if not encoding:
+        return len(text) // 4 + 1  # Without tiktoken, ~4 characters per token is close enough for budgeting
+    return len(encoding.encode(text))
+
+def truncate_tokens(text, limit):
+    """Cut text down to at most limit tokens"""
+    encoding = _get_encoding()
+    if not encoding:
+        return text if len(text) <= limit * 4 else text[:limit * 4] + "…"
+    tokens = encoding.encode(text)
+    return text if len(tokens) <= limit else encoding.decode(tokens[:limit]) + "…"
+
+# ======================== Conversation Memory ========================
+
+class ConversationMemory:
+    """Token-budgeted conversation history with a rolling summary of older turns.
+
+    Behaves like the old previous_questions_and_answers list of (role, content) tuples
+    for appending and iterating, but only the recent window is kept. Turns that fall out
+    of the window are folded into a running summary on a background thread; if that
+    falls too far behind, the oldest of them are kept only as a truncated digest.
+    With a journal, every turn and summary is also appended to it as it happens.
+    """
+
+    def __init__(self, turns=(), token_budget=RECENT_TOKEN_BUDGET, summarize=summarize_conversation,
+                 summary="", journal=None):
+        self.token_budget = token_budget
+        self.summarize = summarize
+        self.summary = summary
+        self.journal = None
+        self._recent = collections.deque()  # (role, content, message dict, tokens, journal seq)
+        self._recent_tokens = 0
+        self._pending = collections.deque()  # Evicted (role, content, tokens, seq, number) awaiting summarization
+        self._pending_tokens = 0
+        self._evicted = 0  # Numbers pending entries in eviction order, so compact() knows which it summarized
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+        for role, content in turns:
+            self.append((role, content))
+        self.journal = journal  # Set afterwards so restored turns are not journaled twice
+
+    @classmethod
+    def from_journal(cls, journal, **kwargs):
+        """Rebuild memory from the end of the latest journal and keep journaling to it"""
+        summary, turns = journal.load()
+        return cls(turns, summary=summary, journal=journal, **kwargs)
+
+    # ---------- List-like interface ----------
+
+    def append(self, turn):
+        role, content = turn
+        seq = self.journal.record(role, content) if self.journal else None
+        message = {"role": role.lower(), "content": truncate_tokens(content, MAX_MESSAGE_TOKENS)}
+        tokens = count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+        with self._lock:
+            self._recent.append((role, content, message, tokens, seq))
+            self._recent_tokens += tokens
+            evicted = False
+            # Always keep the newest turn, even if it alone exceeds the budget
+            while self._recent_tokens > self.token_budget and len(self._recent) > 1:
+                old_role, old_content, _, old_tokens, old_seq = self._recent.popleft()
+                self._recent_tokens -= old_tokens
+                self._evicted += 1
+                self._pending.append((old_role, old_content, old_tokens, old_seq, self._evicted))
+                self._pending_tokens += old_tokens
+                evicted = True
+            folded = self._fold_overflow() if self._pending_tokens > MAX_PENDING_TOKENS else 0
+        if folded:
+            print(f"Conversation summary is behind: folded {folded} turns into a truncated digest")
+        if evicted and self.summarize:
+            self._start_worker()
+            self._wake.set()
+
+    def __iter__(self):
+        with self._lock:
+            turns = [(role, content) for role, content, _, _, _ in self._recent]
+        return iter(turns)
+
+    def __len__(self):
+        return len(self._recent)
+
+    def __getitem__(self, index):
+        with self._lock:
+            turns = [(role, content) for role, content, _, _, _ in self._recent]
+        return turns[index]
+
+    # ---------- Prompt building ----------
+
+    def build_messages(self, instructions):
+        """Return the system prompt, the running summary and the recent window as chat messages"""
+        messages = [{"role": "system", "content": instructions}]
+        with self._lock:
+            if self.summary:
+                messages.append({"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"})
+            messages.extend(message for _, _, message, _, _ in self._recent)
+        return messages
+
+    # ---------- Background summarization ----------
+
+    def _fold_overflow(self):
+        """Replace the oldest pending turns with one crude truncated digest; returns how many were folded.
+
+        Keeps the pending backlog under MAX_PENDING_TOKENS while summarization is failing
+        or behind, without losing those turns entirely. Call with the lock held.
+        """
+        parts = []
+        folded = 0
+        seq = None
+        while self._pending and self._pending_tokens + OVERFLOW_DIGEST_TOKENS > MAX_PENDING_TOKENS:
+            role, content, tokens, turn_seq, number = self._pending.popleft()
+            self._pending_tokens -= tokens
+            if role == OVERFLOW_ROLE:
+                parts.append(content)  # An earlier digest, already truncated
+            else:
+                parts.append(f"{role}: {truncate_tokens(content, OVERFLOW_TURN_TOKENS)}")
+                folded += 1
+            seq = turn_seq if turn_seq is not None else seq
+        # Leave room for the message overhead and the "…" truncation adds, so the digest fits what was freed
+        digest = truncate_tokens(" / ".join(parts), OVERFLOW_DIGEST_TOKENS - MESSAGE_OVERHEAD_TOKENS - 1)
+        tokens = count_tokens(digest) + MESSAGE_OVERHEAD_TOKENS
+        # Numbered like the newest turn it stands for, so it is summarized once that turn would have been
+        self._pending.appendleft((OVERFLOW_ROLE, digest, tokens, seq, number))
+        self._pending_tokens += tokens
+        return folded
+
+    def _start_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._summarize_loop, daemon=True)
+                self._worker.start()
+
+    def _summarize_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self.compact()
+
+    def compact(self):
+        """Fold pending evicted turns into the running summary"""
+        with self._lock:
+            if not self._pending:
+                return
+            snapshot = list(self._pending)
+            summary = self.summary
+        turns = [(role, content) for role, content, _, _, _ in snapshot]
+        try:
+            new_summary = self.summarize(summary, turns)
+        except Exception as e:
+            print(f"Error summarizing conversation: {e}")
+            return
+        if not new_summary:
+            return
+        with self._lock:
+            # Entries may have been folded into a digest meanwhile, so match by number rather than position
+            through = snapshot[-1][4]
+            while self._pending and self._pending[0][4] <= through:
+                self._pending_tokens -= self._pending.popleft()[2]
+            self.summary = new_summary
+        if self.journal and snapshot[-1][3] is not None:
+            self.journal.record_summary(new_summary, snapshot[-1][3])
+
+    # ---------- Persistence ----------
+
+    def flush(self):
+        """Wait until the journal has written every turn"""
+        if self.journal:
+            self.journal.flush()
+
+    def close(self):
+        """Flush and close the journal"""
+        if self.journal:
+            self.journal.close()
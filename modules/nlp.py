@@ -0,0 +1,51 @@
+import threading
+from modules.lazy import lazy_import
+from modules.tracing import span, traced
+
+spacy = lazy_import('spacy')
+
+# ======================== Constants ========================
+
+SPACY_MODEL = "en_core_web_sm"
+# Pipeline components the reminder path never reads (only NER is used)
+DISABLED_COMPONENTS = ["parser", "lemmatizer"]
+PIPE_BATCH_SIZE = 64
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+# ======================== NLP Engine ========================
+
+def get_nlp():
+    """Returns the shared spaCy pipeline, loading it once on first use"""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                with span('nlp.load'):
+                    _nlp = spacy.load(SPACY_MODEL, disable=DISABLED_COMPONENTS)
+    return _nlp
+
+def warm_up(background=True):
+    """Loads the pipeline and runs a dummy parse, optionally on a daemon thread"""
+    def _warm():
+        try:
+            get_nlp()("Remind me to drink water at 5 pm")
+        except Exception as e:
+            print(f"Error warming up spaCy: {e}")
+    if background:
+        thread = threading.Thread(target=_warm, daemon=True)
+        thread.start()
+        return thread
+    _warm()
+    return None
+
+@traced('nlp.parse')
+def parse(text):
+    """Parses a single text with the shared pipeline"""
+    return get_nlp()(text)
+
+@traced('nlp.parse_many')
+def parse_many(texts, batch_size=PIPE_BATCH_SIZE):
+    """Parses many texts in one pass with nlp.pipe, preserving input order"""
+    return list(get_nlp().pipe(texts, batch_size=batch_size))
@@ -1,27 +1,169 @@
-import sys
+import asyncio
+import threading
 from modules.utils import save_to_file
 from modules.reminders import handle_reminder_request
-from modules.ai import get_openai_response
+from modules.ai import get_openai_response, stream_openai_response
+from modules.datetime_parser import get_datetime_parser
+from modules.intents import REMINDER_CREATE, STOP, classify_intent
+from modules.tracing import span, wrap
 
-STOP_PHRASES = ["exit", "goodbye"]
+# ======================== Constants ========================
 
-def check_for_stop_command(user_input, previous_questions_and_answers):
-    """Check user_input for a stop keyword."""
-    user_input_lower = user_input.lower().strip()
-    if user_input_lower in STOP_PHRASES:
-        save_to_file("iva_conversation", '\n'.join([f"{role}: {content}" for role, content in previous_questions_and_answers]))
+# When process_input_async requests the answer before the reminder path has decided:
+# 'never', 'inconclusive' (only when the cheap checks can't vouch for the reminder) or 'always'
+SPECULATION = 'inconclusive'
+SPECULATE_BELOW_CONFIDENCE = 0.7  # 'inconclusive': datetime confidence under which a dictation may fall through
+MAX_SPECULATIVE_REQUESTS = 2  # Speculative answers in flight at once; beyond this, inputs wait for the reminder path
+
+_speculation_slots = threading.BoundedSemaphore(MAX_SPECULATIVE_REQUESTS)
+
+def is_stop_command(user_input):
+    """Check whether user_input is a stop keyword."""
+    intent = classify_intent(user_input)
+    return intent is not None and intent.category == STOP
+
+def check_for_stop_command(user_input, previous_questions_and_answers, intent=None):
+    """Check user_input for a stop keyword and make sure the transcript is saved."""
+    if intent is None:
+        intent = classify_intent(user_input)
+    if intent is not None and intent.category == STOP:
+        if isinstance(previous_questions_and_answers, list):
+            # Plain lists have no journal, so dump the transcript like before
+            save_to_file("iva_conversation", '\n'.join([f"{role}: {content}" for role, content in previous_questions_and_answers]))
+        else:
+            previous_questions_and_answers.flush()
         print("Goodbye!")
-        sys.exit(0)
+        return True
     return False
 
 def process_input(user_input, previous_questions_and_answers):
     """Process input and return answer"""
-    if check_for_stop_command(user_input, previous_questions_and_answers):
-        return "Goodbye!"
-    previous_questions_and_answers.append(("User", user_input))
-    response_messages = handle_reminder_request(user_input)
-    if response_messages:
-        return " ".join(response_messages)
-    answer = get_openai_response(previous_questions_and_answers)
-    previous_questions_and_answers.append(("Assistant", answer))
-    return answer
\ No newline at end of file
+    with span('process_input'):
+        with span('intent'):
+            intent = classify_intent(user_input)
+        if check_for_stop_command(user_input, previous_questions_and_answers, intent):
+            return "Goodbye!"
+        previous_questions_and_answers.append(("User", user_input))
+        response_messages = handle_reminder_request(user_input, intent)
+        if response_messages:
+            return " ".join(response_messages)
+        answer = get_openai_response(previous_questions_and_answers)
+        previous_questions_and_answers.append(("Assistant", answer))
+        return answer
+
+def process_input_stream(user_input, previous_questions_and_answers):
+    """Process input and yield the answer in pieces as it is generated"""
+    with span('process_input'):
+        with span('intent'):
+            intent = classify_intent(user_input)
+        if check_for_stop_command(user_input, previous_questions_and_answers, intent):
+            yield "Goodbye!"
+            return
+        previous_questions_and_answers.append(("User", user_input))
+        response_messages = handle_reminder_request(user_input, intent)
+        if response_messages:
+            yield " ".join(response_messages)
+            return
+        parts = []
+        for delta in stream_openai_response(previous_questions_and_answers):
+            parts.append(delta)
+            yield delta
+        previous_questions_and_answers.append(("Assistant", "".join(parts).strip()))
+
+# ======================== Speculative Processing ========================
+
+def should_speculate(user_input, intent, speculation=None):
+    """Cost guard: whether to request the answer while the reminder path is still running"""
+    speculation = speculation or SPECULATION
+    if speculation == 'never' or intent is None or intent.category != REMINDER_CREATE:
+        return False  # Only dictations run the slow reminder path and can still fall through to the answer
+    if speculation == 'always':
+        return True
+    # Memoized, and the reminder path parses the same phrase right after, so this check is nearly free
+    return get_datetime_parser().parse(user_input).confidence < SPECULATE_BELOW_CONFIDENCE
+
+class SpeculativeAnswer:
+    """An answer streamed on a worker thread; cancel() stops reading the stream and drops what was read"""
+
+    def __init__(self, previous_questions_and_answers):
+        self._cancelled = threading.Event()
+        # Submitted right away, so _run always runs and gives its slot back, even if cancelled first
+        self.future = asyncio.get_running_loop().run_in_executor(None, wrap(self._run), previous_questions_and_answers)
+        self.future.add_done_callback(lambda future: future.exception())  # Nobody awaits a cancelled answer
+
+    @classmethod
+    def start(cls, previous_questions_and_answers):
+        """Returns a SpeculativeAnswer, or None when MAX_SPECULATIVE_REQUESTS are already in flight"""
+        if not _speculation_slots.acquire(blocking=False):
+            return None
+        try:
+            return cls(previous_questions_and_answers)
+        except BaseException:
+            _speculation_slots.release()
+            raise
+
+    def _run(self, previous_questions_and_answers):
+        try:
+            if self._cancelled.is_set():
+                return None
+            parts = []
+            stream = stream_openai_response(previous_questions_and_answers)
+            try:
+                for delta in stream:
+                    if self._cancelled.is_set():
+                        return None  # Closing the stream below ends the request
+                    parts.append(delta)
+            finally:
+                stream.close()
+            return "".join(parts).strip()
+        finally:
+            _speculation_slots.release()
+
+    async def result(self):
+        return await asyncio.shield(self.future)
+
+    def cancel(self):
+        self._cancelled.set()
+
+async def process_input_async(user_input, previous_questions_and_answers, speculation=None):
+    """Like process_input, but may request the answer while the reminder path runs.
+
+    The reminder path runs on a worker thread. When should_speculate() allows it, the
+    answer is requested at the same time; it is cancelled once a reminder is saved,
+    and used as soon as the reminder path falls through. speculation overrides
+    SPECULATION for this call.
+    """
+    with span('process_input') as turn:
+        with span('intent'):
+            intent = classify_intent(user_input)
+        if check_for_stop_command(user_input, previous_questions_and_answers, intent):
+            return "Goodbye!"
+        previous_questions_and_answers.append(("User", user_input))
+        if intent is None or intent.category != REMINDER_CREATE:
+            response_messages = handle_reminder_request(user_input, intent)  # Decided by the intent alone
+            speculative = None
+        else:
+            speculative = SpeculativeAnswer.start(previous_questions_and_answers) \
+                if should_speculate(user_input, intent, speculation) else None
+            try:
+                response_messages = await asyncio.to_thread(handle_reminder_request, user_input, intent)
+            except BaseException:
+                if speculative is not None:
+                    speculative.cancel()
+                raise
+        if response_messages:
+            if speculative is not None:
+                speculative.cancel()
+                turn.set(speculation='discarded')
+            return " ".join(response_messages)
+        if speculative is not None:
+            turn.set(speculation='used')
+            try:
+                answer = await speculative.result()
+            except asyncio.CancelledError:
+                speculative.cancel()
+                raise
+        else:
+            answer = await asyncio.to_thread(get_openai_response, previous_questions_and_answers)
+        previous_questions_and_answers.append(("Assistant", answer))
+        return answer
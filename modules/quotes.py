@@ -0,0 +1,174 @@
+import array
+import json
+import mmap
+import os
+import random
+import threading
+import time
+from modules.http_client import get_http_client
+
+# ======================== Constants ========================
+
+QUOTES_URL = "https://type.fit/api/quotes"
+QUOTE_CACHE_DIR = os.path.join('cache', 'quotes')
+QUOTE_CACHE_TTL = 7 * 24 * 3600  # Seconds before the corpus is revalidated with the server
+QUOTE_TIMEOUT = 10  # Seconds
+# Shown until a corpus has been downloaded once, e.g. on a first launch without network
+FALLBACK_QUOTES = [
+    "The secret of getting ahead is getting started.",
+    "Focus on being productive instead of busy.",
+    "Small steps every day add up to big results.",
+    "You don't have to see the whole staircase, just take the first step.",
+    "Done is better than perfect.",
+]
+
+# ======================== Quote Provider ========================
+
+class QuoteProvider:
+    """Serves motivational quotes from an on-disk corpus without parsing it on every launch.
+
+    The corpus is stored as one quote per line plus an index of line offsets, both
+    memory-mapped, so picking a quote reads a single line. It is refreshed in the
+    background once older than the TTL, with a conditional request (ETag /
+    If-Modified-Since) so an unchanged corpus is not downloaded again.
+    """
+
+    def __init__(self, cache_dir=QUOTE_CACHE_DIR, url=QUOTES_URL, ttl=QUOTE_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.url = url
+        self.ttl = ttl
+        self.corpus_path = os.path.join(cache_dir, 'quotes.txt')
+        self.index_path = os.path.join(cache_dir, 'quotes.idx')
+        self.meta_path = os.path.join(cache_dir, 'quotes.json')
+        self._lock = threading.Lock()
+        self._corpus = None  # mmap of quotes.txt
+        self._index = None  # mmap of quotes.idx: count + 1 uint64 line offsets
+        self._count = 0
+        self._current = None
+        self._refreshing = False
+
+    # ---------- Picking quotes ----------
+
+    def __len__(self):
+        self._open()
+        return self._count or len(FALLBACK_QUOTES)
+
+    def quote(self, number):
+        """Returns quote `number` by reading just its line"""
+        self._open()
+        with self._lock:
+            if not self._count:
+                return FALLBACK_QUOTES[number % len(FALLBACK_QUOTES)]
+            number %= self._count
+            start, end = array.array('Q', self._index[number * 8:(number + 2) * 8])
+            return self._corpus[start:end].decode('utf-8').rstrip('\n')
+
+    def next_quote(self):
+        """Picks a random quote different from the current one, e.g. once per Pomodoro cycle"""
+        count = len(self)
+        number = random.randrange(count)
+        if count > 1 and number == self._current:
+            number = (number + 1) % count
+        self._current = number
+        return self.quote(number)
+
+    # ---------- Refreshing ----------
+
+    def is_stale(self):
+        meta = self._read_meta()
+        return not meta or time.time() - meta.get('checked', 0) > self.ttl or not os.path.exists(self.index_path)
+
+    def refresh_in_background(self, on_update=None):
+        """Revalidates a stale corpus on a daemon thread; on_update() runs there if it changed"""
+        if not self.is_stale() or self._refreshing:
+            return None
+
+        def _refresh():
+            try:
+                if self.refresh() and on_update:
+                    on_update()
+            except Exception as e:
+                print(f"Error refreshing quotes: {e}")
+            finally:
+                self._refreshing = False
+        self._refreshing = True
+        thread = threading.Thread(target=_refresh, daemon=True)
+        thread.start()
+        return thread
+
+    def refresh(self):
+        """Downloads the corpus if the server has a newer one; returns True if the cache changed"""
+        meta = self._read_meta()
+        headers = {}
+        if meta.get('etag') and os.path.exists(self.index_path):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified') and os.path.exists(self.index_path):
+            headers['If-Modified-Since'] = meta['last_modified']
+        response = get_http_client().get(self.url, headers=headers, timeout=QUOTE_TIMEOUT, endpoint="quotes")
+        if response.status_code == 304:
+            self._write_meta(dict(meta, checked=time.time()))
+            return False
+        response.raise_for_status()
+        texts = [" ".join(entry['text'].split()) for entry in response.json() if entry.get('text')]
+        self._write_corpus(texts)
+        self._write_meta({'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified'),
+                          'checked': time.time(), 'count': len(texts)})
+        return True
+
+    # ---------- Files ----------
+
+    def _open(self):
+        if self._index is not None or not os.path.exists(self.index_path):
+            return
+        with self._lock:
+            if self._index is None:
+                self._map_files()
+
+    def _map_files(self):
+        try:
+            with open(self.corpus_path, 'rb') as corpus, open(self.index_path, 'rb') as index:
+                corpus_map = mmap.mmap(corpus.fileno(), 0, access=mmap.ACCESS_READ)
+                index_map = mmap.mmap(index.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:  # Missing or empty files
+            print(f"Error opening quote cache: {e}")
+            return
+        self._corpus, self._index = corpus_map, index_map
+        self._count = len(index_map) // 8 - 1
+
+    def _write_corpus(self, texts):
+        """Writes the quotes one per line, plus the offset of every line start and of the end"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        offsets = array.array('Q', [0])
+        lines = []
+        for text in texts:
+            line = text.encode('utf-8') + b'\n'
+            lines.append(line)
+            offsets.append(offsets[-1] + len(line))
+        if not texts:
+            return
+        with self._lock:
+            if self._corpus is not None:
+                self._corpus.close()
+                self._index.close()
+            self._corpus = self._index = None
+            self._count = 0
+            _write_atomic(self.corpus_path, b''.join(lines))
+            _write_atomic(self.index_path, offsets.tobytes())
+            self._map_files()
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, meta):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _write_atomic(self.meta_path, json.dumps(meta).encode('utf-8'))
+
+def _write_atomic(path, data):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
@@ -0,0 +1,411 @@
+import datetime
+import functools
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from tzlocal import get_localzone
+from modules.lazy import lazy_import
+from modules.calendar_client import execute_batch, get_calendar_client, http_status, is_transient_error
+from modules.tracing import traced
+
+rrule = lazy_import('dateutil.rrule')
+
+# ======================== Constants ========================
+
+REMINDER_DB_PATH = os.path.join('data', 'reminders.db')
+CALENDAR_ID = 'primary'
+SYNC_INTERVAL = 300  # Seconds between background syncs with Google Calendar
+SYNC_RETRY_MIN = 5  # First retry delay after a failed sync; doubles up to SYNC_INTERVAL
+LIST_PAGE_SIZE = 250
+MAX_PUSH_ATTEMPTS = 10  # Queued writes failing this many times with server errors are dropped
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id TEXT PRIMARY KEY,          -- Google Calendar event id (generated locally for new reminders)
+    summary TEXT NOT NULL,
+    start_ts REAL NOT NULL,       -- Start as a UTC timestamp
+    all_day INTEGER NOT NULL DEFAULT 0,
+    time_zone TEXT,
+    recurrence TEXT,              -- JSON list of RRULE/EXDATE lines for recurring reminders
+    recurring_event_id TEXT,      -- Set on moved or cancelled instances of a recurring reminder
+    original_start_ts REAL,       -- The occurrence such an instance replaces
+    status TEXT NOT NULL DEFAULT 'confirmed'
+);
+CREATE INDEX IF NOT EXISTS reminders_by_start ON reminders (start_ts);
+CREATE INDEX IF NOT EXISTS reminders_by_series ON reminders (recurring_event_id);
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    action TEXT NOT NULL,         -- 'insert' or 'cancel'
+    event_id TEXT NOT NULL,
+    body TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# ======================== Reminder Store ========================
+
+class ReminderStore:
+    """Local SQLite copy of the reminders calendar; the Todo list is served from here.
+
+    Changes made locally are applied immediately and queued in an outbox that
+    ReminderSync pushes to Google Calendar whenever it is reachable.
+    """
+
+    def __init__(self, path=REMINDER_DB_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            if path != ':memory:':
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+
+    # ---------- Reading ----------
+
+    def get_reminders(self, start, end):
+        """Returns reminders starting in [start, end) as dicts with summary, time and id, in start order"""
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        with self._lock:
+            singles = self._db.execute(
+                "SELECT id, summary, start_ts, all_day FROM reminders "
+                "WHERE start_ts >= ? AND start_ts < ? AND recurrence IS NULL AND status != 'cancelled'",
+                (start_ts, end_ts)).fetchall()
+            series = self._db.execute(
+                "SELECT id, summary, start_ts, all_day, time_zone, recurrence FROM reminders "
+                "WHERE recurrence IS NOT NULL AND start_ts < ? AND status != 'cancelled'", (end_ts,)).fetchall()
+            exceptions = {}
+            for row in series:
+                exceptions[row['id']] = {ts for (ts,) in self._db.execute(
+                    "SELECT original_start_ts FROM reminders WHERE recurring_event_id = ?", (row['id'],))}
+        reminders = [(row['start_ts'], row['id'], row['summary'], row['all_day']) for row in singles]
+        for row in series:
+            for occurrence in _expand(row, start, end):
+                ts = occurrence.timestamp()
+                if ts not in exceptions[row['id']]:
+                    reminders.append((ts, _instance_id(row['id'], occurrence, row['all_day']), row['summary'], row['all_day']))
+        reminders.sort()
+        tz = get_localzone()
+        return [{'summary': summary, 'id': event_id,
+                 'time': "All Day" if all_day else datetime.datetime.fromtimestamp(ts, tz).strftime('%H:%M%p')}
+                for ts, event_id, summary, all_day in reminders]
+
+    def get_sync_token(self):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'sync_token'").fetchone()
+        return row[0] if row else None
+
+    def pending_writes(self):
+        """Returns queued outbox entries as (seq, action, event_id, body) in the order they were made"""
+        with self._lock:
+            rows = self._db.execute("SELECT seq, action, event_id, body FROM outbox ORDER BY seq").fetchall()
+        return [(row['seq'], row['action'], row['event_id'], json.loads(row['body']) if row['body'] else None)
+                for row in rows]
+
+    # ---------- Local changes ----------
+
+    def add(self, event):
+        """Stores a new reminder event and queues it for insertion; returns its id"""
+        return self.add_many([event])[0]
+
+    def add_many(self, events):
+        """Stores new reminder events in one transaction and queues their insertion; returns their ids"""
+        ids = []
+        with self._lock, self._db:
+            for event in events:
+                event = dict(event)
+                event.setdefault('id', uuid.uuid4().hex)  # Client-chosen ids make retried inserts idempotent
+                self._upsert(event)
+                self._db.execute("INSERT INTO outbox (action, event_id, body) VALUES ('insert', ?, ?)",
+                                 (event['id'], json.dumps(event)))
+                ids.append(event['id'])
+        return ids
+
+    def mark_done(self, event_id):
+        """Hides a reminder (or one occurrence of a recurring one) and queues its cancellation"""
+        self.mark_done_many([event_id])
+
+    def mark_done_many(self, event_ids):
+        """Hides several reminders in one transaction and queues their cancellation"""
+        with self._lock, self._db:
+            for event_id in event_ids:
+                updated = self._db.execute("UPDATE reminders SET status = 'cancelled' WHERE id = ?", (event_id,)).rowcount
+                if not updated:
+                    series_id, occurrence = _parse_instance_id(event_id)
+                    if occurrence is not None:
+                        self._db.execute(
+                            "INSERT OR REPLACE INTO reminders (id, summary, start_ts, recurring_event_id, original_start_ts, status) "
+                            "VALUES (?, '', ?, ?, ?, 'cancelled')",
+                            (event_id, occurrence.timestamp(), series_id, occurrence.timestamp()))
+                self._db.execute("INSERT INTO outbox (action, event_id) VALUES ('cancel', ?)", (event_id,))
+
+    # ---------- Sync support ----------
+
+    def apply_remote(self, events, sync_token=None, full=False):
+        """Applies events pulled from Google Calendar, keeping local changes that are not pushed yet"""
+        with self._lock, self._db:
+            pending = {event_id for (event_id,) in self._db.execute("SELECT event_id FROM outbox")}
+            if full:
+                placeholders = ','.join('?' * len(pending))
+                self._db.execute(f"DELETE FROM reminders WHERE id NOT IN ({placeholders})", tuple(pending))
+            for event in events:
+                if event['id'] not in pending:
+                    self._upsert(event)
+            if sync_token is not None:
+                self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('sync_token', ?)", (sync_token,))
+
+    def reset_sync_token(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM meta WHERE key = 'sync_token'")
+
+    def finish_write(self, seq):
+        """Removes a pushed (or permanently rejected) write from the outbox"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM outbox WHERE seq = ?", (seq,))
+
+    def retry_write(self, seq):
+        """Counts a failed push attempt; gives up on the write after MAX_PUSH_ATTEMPTS"""
+        with self._lock, self._db:
+            self._db.execute("UPDATE outbox SET attempts = attempts + 1 WHERE seq = ?", (seq,))
+            self._db.execute("DELETE FROM outbox WHERE seq = ? AND attempts >= ?", (seq, MAX_PUSH_ATTEMPTS))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _upsert(self, event):
+        if event.get('status') == 'cancelled' and 'start' not in event:
+            # Deleted events come back from incremental sync as little more than an id
+            original = event.get('originalStartTime')
+            if event.get('recurringEventId') and original:
+                ts, all_day, time_zone = _event_time(original)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO reminders (id, summary, start_ts, all_day, recurring_event_id, original_start_ts, status) "
+                    "VALUES (?, '', ?, ?, ?, ?, 'cancelled')", (event['id'], ts, all_day, event['recurringEventId'], ts))
+            else:
+                self._db.execute("UPDATE reminders SET status = 'cancelled' WHERE id = ?", (event['id'],))
+            return
+        ts, all_day, time_zone = _event_time(event['start'])
+        original_ts = _event_time(event['originalStartTime'])[0] if event.get('originalStartTime') else None
+        self._db.execute(
+            "INSERT OR REPLACE INTO reminders "
+            "(id, summary, start_ts, all_day, time_zone, recurrence, recurring_event_id, original_start_ts, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (event['id'], event.get('summary', 'No Title'), ts, all_day, time_zone,
+             json.dumps(event['recurrence']) if event.get('recurrence') else None,
+             event.get('recurringEventId'), original_ts, event.get('status', 'confirmed')))
+
+def _event_time(when):
+    """Converts a Calendar start/originalStartTime object to (UTC timestamp, all_day, time_zone)"""
+    time_zone = when.get('timeZone')
+    tz = _zone(time_zone)
+    if 'dateTime' in when:
+        moment = datetime.datetime.fromisoformat(when['dateTime'].replace('Z', '+00:00'))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=tz)
+        return moment.timestamp(), 0, time_zone
+    day = datetime.date.fromisoformat(when['date'])
+    return datetime.datetime(day.year, day.month, day.day, tzinfo=tz).timestamp(), 1, time_zone
+
+def _zone(name):
+    if name:
+        try:
+            from zoneinfo import ZoneInfo
+            return ZoneInfo(name)
+        except Exception:
+            pass
+    return get_localzone()
+
+def _expand(row, start, end):
+    """Yields the occurrences of a recurring reminder that start in [start, end)"""
+    rules = _parse_recurrence(row['recurrence'], row['start_ts'], row['time_zone'])
+    for occurrence in rules.between(start, end, inc=True):
+        if occurrence < end:
+            yield occurrence
+
+@functools.lru_cache(maxsize=256)
+def _parse_recurrence(recurrence, start_ts, time_zone):
+    """Parses RRULE/EXDATE lines once per series rather than on every view"""
+    dtstart = datetime.datetime.fromtimestamp(start_ts, _zone(time_zone))
+    return rrule.rrulestr('\n'.join(json.loads(recurrence)), dtstart=dtstart, forceset=True, cache=True)
+
+def _instance_id(series_id, occurrence, all_day):
+    """Builds the id Google Calendar gives one occurrence of a recurring event"""
+    if all_day:
+        return f"{series_id}_{occurrence.strftime('%Y%m%d')}"
+    return f"{series_id}_{occurrence.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')}"
+
+def _parse_instance_id(event_id):
+    """Splits an occurrence id into (series id, occurrence start), or (event_id, None) for plain ids"""
+    series_id, _, stamp = event_id.rpartition('_')
+    for fmt, tz in (('%Y%m%dT%H%M%SZ', datetime.timezone.utc), ('%Y%m%d', get_localzone())):
+        try:
+            return series_id, datetime.datetime.strptime(stamp, fmt).replace(tzinfo=tz)
+        except ValueError:
+            continue
+    return event_id, None
+
+# ======================== Background Sync ========================
+
+class ReminderSync:
+    """Pushes queued local changes to Google Calendar and pulls remote ones with syncToken.
+
+    Runs on a daemon thread every SYNC_INTERVAL seconds, or sooner when request_sync()
+    is called. While offline, writes stay queued and retries back off exponentially.
+    """
+
+    def __init__(self, store, interval=SYNC_INTERVAL):
+        self.store = store
+        self.interval = interval
+        self._listeners = []
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._sync_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sync_loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def request_sync(self):
+        """Asks the background thread to sync now"""
+        self._wake.set()
+
+    def add_listener(self, callback):
+        """Registers callback() to run on the sync thread whenever a sync changed the local store"""
+        self._listeners.append(callback)
+
+    def sync(self):
+        """Pushes then pulls once; returns True if Google Calendar was reachable"""
+        with self._sync_lock:
+            service = get_calendar_client().get_service()
+            pushed = self.push(service)
+            pulled = self.pull(service)
+        if pushed or pulled:
+            for callback in list(self._listeners):
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Error in reminder sync listener: {e}")
+        return True
+
+    @traced('calendar.push')
+    def push(self, service):
+        """Sends queued writes as batch requests; returns how many were applied.
+
+        Writes to the same event never share a batch, since calls inside a batch may run
+        in any order; an insert followed by its cancellation goes out in two rounds.
+        """
+        applied = 0
+        writes = self.store.pending_writes()
+        while writes:
+            round_writes, seen = [], set()
+            for write in writes:
+                if write[2] in seen:
+                    break
+                seen.add(write[2])
+                round_writes.append(write)
+            writes = writes[len(round_writes):]
+            requests = [self._write_request(service, action, event_id, body) for _, action, event_id, body in round_writes]
+            failed = False
+            for (seq, action, event_id, _), (_, error) in zip(round_writes, execute_batch(service, requests)):
+                status = http_status(error) if error is not None else None
+                if error is not None and is_transient_error(error):
+                    self.store.retry_write(seq)  # Offline errors raise from execute_batch, so only server errors count here
+                    failed = True
+                    continue
+                if error is not None and not ((action == 'insert' and status == 409) or (action == 'cancel' and status in (404, 410))):
+                    print(f"Dropping reminder {action} for {event_id}: {error}")
+                self.store.finish_write(seq)
+                applied += 1
+            if failed:
+                raise RuntimeError("Google Calendar rejected some reminder changes; they stay queued")
+        return applied
+
+    def _write_request(self, service, action, event_id, body):
+        if action == 'insert':
+            return service.events().insert(calendarId=CALENDAR_ID, body=body)
+        return service.events().patch(calendarId=CALENDAR_ID, eventId=event_id, body={'status': 'cancelled'})
+
+    @traced('calendar.pull')
+    def pull(self, service):
+        """Fetches changes since the last sync (everything on the first run); returns how many were applied"""
+        sync_token = self.store.get_sync_token()
+        try:
+            events, next_token = self._list_all(service, sync_token)
+        except Exception as e:
+            if sync_token is None or http_status(e) != 410:
+                raise
+            # The sync token expired; start over with a full sync
+            self.store.reset_sync_token()
+            sync_token = None
+            events, next_token = self._list_all(service, None)
+        self.store.apply_remote(events, next_token, full=sync_token is None)
+        return len(events)
+
+    def _list_all(self, service, sync_token):
+        events, page_token = [], None
+        while True:
+            kwargs = {'calendarId': CALENDAR_ID, 'showDeleted': True, 'maxResults': LIST_PAGE_SIZE}
+            if sync_token:
+                kwargs['syncToken'] = sync_token
+            if page_token:
+                kwargs['pageToken'] = page_token
+            result = service.events().list(**kwargs).execute()
+            events.extend(result.get('items', []))
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return events, result.get('nextSyncToken')
+
+    def _sync_loop(self):
+        delay = 0
+        while not self._stopped.is_set():
+            self._wake.wait(timeout=delay)
+            self._wake.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self.sync()
+                delay = self.interval
+            except Exception as e:
+                print(f"Reminder sync failed, will retry: {e}")
+                delay = min(max(delay * 2, SYNC_RETRY_MIN), self.interval)
+
+# ======================== Shared Instances ========================
+
+_store = None
+_sync = None
+_shared_lock = threading.Lock()
+
+def get_reminder_store():
+    """Returns the shared ReminderStore, opening the database on first use"""
+    global _store
+    if _store is None:
+        with _shared_lock:
+            if _store is None:
+                _store = ReminderStore()
+    return _store
+
+def get_reminder_sync():
+    """Returns the shared ReminderSync, starting its background thread on first use"""
+    global _sync
+    if _sync is None:
+        store = get_reminder_store()
+        with _shared_lock:
+            if _sync is None:
+                _sync = ReminderSync(store).start()
+    return _sync
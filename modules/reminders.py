@@ -1,22 +1,12 @@
 import datetime
-import os.path
 import re
-import spacy
-import parsedatetime as pdt
-from dateutil import parser
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from tzlocal import get_localzone
-from modules.utils import save_to_file
-
-# ======================== Google Calendar API Constants ========================
-
-# Define constants for Google Calendar API
-TOKEN_PATH = os.path.join('config', 'token.json')  # Path to store access token
-CREDENTIALS_PATH = os.path.join('config', 'credentials.json')  # Path to store API credentials
-SCOPES = ['https://www.googleapis.com/auth/calendar']  # Required scopes for Google Calendar access
+from modules.nlp import parse, parse_many
+from modules.datetime_parser import get_datetime_parser
+from modules.tracing import traced
+from modules.calendar_client import get_calendar_client
+from modules.reminder_store import get_reminder_store, get_reminder_sync
+from modules.intents import REMINDER_INQUIRY, classify_intent, is_reminder_intent
 
 # ======================== User Interaction Phrases ========================
 # Define phrases for interaction with the user
@@ -36,22 +26,6 @@ REMINDER_PHRASES = [
     "remind", "remember", "remind me", "set a reminder",
     "add to my reminders"
 ]
-# Patterns indicating a clear intent to set a reminder
-CLEAR_INTENT_PHRASES = [
-    "remind me to", "set a reminder to", "add to my reminders to"
-]
-# Patterns indicating a question or inquiry about setting a reminder
-INQUIRY_PHRASES = [
-    "can we set a reminder", "is it possible to set",
-    "how do i set", "can you set reminders",
-    "let's set a reminder", "i need a reminder",
-    "can you remind me something", "can you set a reminder for"
-]
-# Less specific commands that imply a reminder is needed
-VAGUE_PHRASES = [
-    "let's set a reminder", "i need a reminder",
-    "can you remind me something", "can you set a reminder for"
-]
 # Phrases to be removed when parsing reminder content
 REMOVAL_PHRASES = (
     r"\b(?:could you|can you|can we|let's|remind me to|set a reminder to|"
@@ -59,28 +33,15 @@ REMOVAL_PHRASES = (
     r"please|I need a reminder to|I have a|I need to|set a reminder for|"
     r"set a reminder called|on the|at|every day)\b"
 )
+_REMOVAL_PATTERN = re.compile(REMOVAL_PHRASES)
 
 # ============ Google Calendar Functions ============
 
 def get_calendar_service():
-    """Authenticates and returns a service object to interact with Google Calendar"""
-    creds = None
-    # Check if token file exists to reuse credentials
-    if os.path.exists(TOKEN_PATH):
-        creds = Credentials.from_authorized_user_file(TOKEN_PATH)
-    # Refresh or create new credentials if not valid    
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request()) # Refresh existing credentials
-        else:
-            # Initiate new authentication flow if no valid credentials
-            flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
-            creds = flow.run_local_server(port=0)
-            # Save new credentials to file
-            with open(TOKEN_PATH, 'w') as token:
-                token.write(creds.to_json())
-    return build('calendar', 'v3', credentials=creds)
+    """Returns the cached service object to interact with Google Calendar"""
+    return get_calendar_client().get_service()
 
+@traced('calendar.insert')
 def insert_google_event(service, event):
     """Inserts an event into Google Calendar and handles potential exceptions"""
     try:
@@ -93,21 +54,24 @@ def insert_google_event(service, event):
             print(f"Error inserting Google event: {e}")
             return None
 
-def set_google_reminder(date_str, time_str, reminder_content, is_recurring):
-    """Creates a Google Calendar event based on provided reminder details"""
-    service = get_calendar_service()
+def build_reminder_event(reminder_content, parsed):
+    """Builds the Google Calendar event body for a reminder at a ParsedDatetime"""
     local_timezone = str(get_localzone()) # Get the local timezone
-    reminder_datetime_str = f"{date_str} {time_str}"
-    reminder_datetime_obj = datetime.datetime.strptime(reminder_datetime_str, '%Y-%m-%d %I:%M %p')
-    rfc_datetime = reminder_datetime_obj.isoformat() # Convert to RFC3339 format
+    rfc_datetime = parsed.datetime.isoformat() # Convert to RFC3339 format
     event = {
         'summary': reminder_content,
         'start': {'dateTime': rfc_datetime, 'timeZone': local_timezone},
         'end': {'dateTime': rfc_datetime, 'timeZone': local_timezone},
         'reminders': {'useDefault': False, 'overrides': [{'method': 'popup', 'minutes': 10}]},
     }
-    if is_recurring:
-        event['recurrence'] = ['RRULE:FREQ=DAILY'] # Set recurrence for daily reminders
+    if parsed.is_recurring:
+        event['recurrence'] = [parsed.recurrence]
+    return event
+
+def set_google_reminder(reminder_content, parsed):
+    """Creates a Google Calendar event directly, bypassing the local reminder store"""
+    service = get_calendar_service()
+    event = build_reminder_event(reminder_content, parsed)
     event_link = insert_google_event(service, event)
     print(f"Event created: {event_link}")
 
@@ -115,14 +79,16 @@ def set_google_reminder(date_str, time_str, reminder_content, is_recurring):
 
 def is_reminder_request(user_input):
     """Determines if the user input is a request to set a reminder"""
-    user_input_lower = user_input.lower()
-    return any(pattern in user_input_lower for pattern in CLEAR_INTENT_PHRASES + INQUIRY_PHRASES + VAGUE_PHRASES)
+    return is_reminder_intent(classify_intent(user_input))
 
-def handle_reminder_request(user_input):
+@traced('reminder')
+def handle_reminder_request(user_input, intent=None):
     """Processes a user input to handle a reminder request"""
     response_messages = []
-    if is_reminder_request(user_input):
-        if any(pattern in user_input.lower() for pattern in INQUIRY_PHRASES):
+    if intent is None:
+        intent = classify_intent(user_input)
+    if is_reminder_intent(intent):
+        if intent.category == REMINDER_INQUIRY:
             response_messages.append(
                 "Yes, you can set a reminder. Please provide the details.")
             return response_messages
@@ -132,53 +98,95 @@ def handle_reminder_request(user_input):
             return response_messages
     return False
 
-def save_reminder(reminder_content, date_str, time_str, is_recurring):
-    """Saves reminder details and creates a Google Calendar event"""
+def save_reminder(reminder_content, parsed):
+    """Saves the reminder locally and queues its Google Calendar event for the background sync"""
     response_messages = []
-    reminder_datetime_str = f"{date_str} {time_str}"
-    reminder_datetime_obj = parser.parse(reminder_datetime_str)
-    formatted_time = reminder_datetime_obj.strftime('%I:%M %p')
-    formatted_date = reminder_datetime_obj.strftime('%Y-%m-%d')
-    if is_recurring:
-        reminder = f"Okay, I'll remind you every day at {formatted_time} to {reminder_content}."
+    if parsed.is_recurring:
+        reminder = f"Okay, I'll remind you every day at {parsed.time_str} to {reminder_content}."
     else:
-        reminder = f"Okay, I'll remind you on {formatted_date} at {formatted_time} to {reminder_content}."
+        reminder = f"Okay, I'll remind you on {parsed.date_str} at {parsed.time_str} to {reminder_content}."
+    event = build_reminder_event(reminder_content, parsed)
     try:
-        save_to_file("reminder", reminder)
+        get_reminder_store().add(event)
+        print(reminder)
         response_messages.append("Reminder saved successfully.")
-        set_google_reminder(date_str, time_str, reminder_content, is_recurring)
+        get_reminder_sync().request_sync()
     except Exception as e:
-        print(f"Error setting Google reminder: {e}")
-        response_messages.append("There was an error setting the reminder on Google Calendar.")
+        print(f"Error saving reminder: {e}")
+        response_messages.append("There was an error saving the reminder.")
     return response_messages
 
+def save_reminders(reminders):
+    """Saves many (content, ParsedDatetime) reminders at once; the sync sends them in batch requests"""
+    events = [build_reminder_event(content, parsed) for content, parsed in reminders]
+    ids = get_reminder_store().add_many(events)
+    get_reminder_sync().request_sync()
+    return ids
+
+def reminder_skip_reason(reminder_content, parsed):
+    """Returns why a dictation should be re-entered rather than saved, or None if it can be saved"""
+    if not reminder_content:
+        return "Couldn't understand what to remind you of."
+    if parsed.is_understood:
+        return None
+    if parsed.confidence == 0:
+        return "Couldn't understand the time or date. Please re-enter."
+    return f"{parsed.date_str} at {parsed.time_str} has already passed. Please re-enter."
+
+def import_reminders_from_file(path):
+    """Creates a reminder from each line of a text file, e.g. "Remind me to call mom tomorrow at 10 am".
+
+    Returns (number of reminders created, [(line, reason)] for lines that were skipped).
+    """
+    with open(path, encoding='utf-8') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    reminders, skipped = [], []
+    for line, (content, parsed) in zip(lines, extract_reminder_contents(lines)):
+        reason = reminder_skip_reason(content, parsed)
+        if reason:
+            skipped.append((line, reason))
+        else:
+            reminders.append((content, parsed))
+    if reminders:
+        save_reminders(reminders)
+    return len(reminders), skipped
+
 def create_reminder(user_input):
     """Main function to create a reminder from user input"""
     response_messages = []
-    date_str, time_str, is_recurring = get_reminder_datetime(user_input)
-    reminder_content = get_reminder_content(user_input, date_str, time_str)
-    if reminder_content and time_str:
-        try:
-            response_from_save = save_reminder(reminder_content, date_str, time_str, is_recurring)
-            response_messages.extend(response_from_save)
-        except ValueError:
-            response_messages.append("Couldn't understand the time or date. Please re-enter.")
+    parsed = get_reminder_datetime(user_input)
+    reminder_content = get_reminder_content(user_input, parsed)
+    if not reminder_content:
+        return response_messages  # Not a dictation after all; the caller answers it instead
+    reason = reminder_skip_reason(reminder_content, parsed)
+    if reason:
+        # Nothing recognised, or a time pinned to today that has passed; saving would fire it at once
+        response_messages.append(reason)
+        return response_messages
+    response_messages.extend(save_reminder(reminder_content, parsed))
     return response_messages
 
-def get_reminders_for_period(period):
-    """Retrieves reminders from Google Calendar for a given time period (day or week)"""
-    service = get_calendar_service()
-    tz = get_localzone()
-    now = datetime.datetime.now(tz)
-    time_min = now.isoformat()
+def get_period_bounds(period):
+    """Returns the (start, end) datetimes of a Todo list view ('day' or 'week') starting now"""
+    now = datetime.datetime.now(get_localzone())
     if period == 'day':
-        time_max = (now + datetime.timedelta(days=1)).isoformat()
+        return now, now + datetime.timedelta(days=1)
     elif period == 'week':
-        time_max = (now + datetime.timedelta(weeks=1)).isoformat()
-    else:
-        raise ValueError("Invalid period specified. Choose 'day' or 'week'.")
+        return now, now + datetime.timedelta(weeks=1)
+    raise ValueError("Invalid period specified. Choose 'day' or 'week'.")
+
+def get_reminders_for_period(period):
+    """Retrieves reminders for a given time period (day or week) from the local reminder store"""
+    start, end = get_period_bounds(period)
+    get_reminder_sync()  # Make sure the background sync is running
+    return get_reminder_store().get_reminders(start, end)
+
+@traced('calendar.list')
+def fetch_reminders_for_period(period):
+    """Retrieves reminders for a given time period straight from Google Calendar"""
+    service = get_calendar_service()
+    time_min, time_max = (moment.isoformat() for moment in get_period_bounds(period))
     events_result = service.events().list(calendarId='primary', timeMin=time_min, timeMax=time_max, singleEvents=True, orderBy='startTime').execute()
-    print("Debug - Raw API Response:", events_result)
 
     events = events_result.get('items', [])
     formatted_events = []
@@ -194,15 +202,22 @@ def get_reminders_for_period(period):
     return formatted_events
 
 def mark_reminder_as_done(event_id):
-    """Marks a reminder in Google Calendar as completed"""
-    service = get_calendar_service()
+    """Marks a reminder as completed locally and queues the cancellation for Google Calendar"""
+    try:
+        get_reminder_store().mark_done(event_id)
+    except Exception as e:
+        print(f"Error updating reminder status: {e}")
+        raise
+    get_reminder_sync().request_sync()
+
+def mark_reminders_as_done(event_ids):
+    """Marks several reminders as completed; the cancellations are sent together in batch requests"""
     try:
-        event = service.events().get(calendarId='primary', eventId=event_id).execute()
-        event['status'] = 'cancelled'
-        updated_event = service.events().update(calendarId='primary', eventId=event_id, body=event).execute()
+        get_reminder_store().mark_done_many(event_ids)
     except Exception as e:
         print(f"Error updating reminder status: {e}")
         raise
+    get_reminder_sync().request_sync()
 
 # ============ Utility and Extraction Functions ============
 
@@ -213,69 +228,45 @@ def generate_time_formats(time_str):
     time_short = base_time.split(':')[0].replace('am', 'a.m.').replace('pm', 'p.m.')
     return [time_str, time_alternate, time_short]
 
+@traced('reminder.datetime')
 def extract_datetime(user_input):
-    """Extracts date and time information from user input"""
-    cal = pdt.Calendar()
-    # Use parsedatetime to parse natural language date and time
-    time_struct, parse_status = cal.parse(user_input)
-    datetime_obj = datetime.datetime(*time_struct[:6])
-    # Adjust for dates set in the past
-    today = datetime.datetime.today()
-    if datetime_obj.date() < today.date():
-        datetime_obj = datetime_obj.replace(month=datetime_obj.month % 12 + 1)
-    # Adjust for 'on the XXth' phrases in user input
-    if "on the" in user_input and datetime_obj.day == 1:
-        match = re.search(r"on the (\d+)(st|nd|rd|th)", user_input)
-        if match:
-            mentioned_day = int(match.group(1))
-            datetime_obj = datetime_obj.replace(day=mentioned_day)
-    # Adjust for general time phrases like 'morning', 'evening'
-    time_adjustments = {
-        "morning": 7,
-        "afternoon": 13,
-        "evening": 19,
-        "night": 21
-    }
-    if datetime_obj.time() == datetime.time(0, 0):
-        for phrase, hour in time_adjustments.items():
-            if phrase in user_input:
-                datetime_obj = datetime_obj.replace(hour=hour)
-                break
-    date_str = datetime_obj.strftime('%Y-%m-%d')
-    time_str = datetime_obj.strftime('%I:%M %p')
-    is_recurring = "every day" in user_input or "everyday" in user_input
-    return date_str, time_str, is_recurring
+    """Returns the ParsedDatetime of the date, time and recurrence in user input"""
+    return get_datetime_parser().parse(user_input)
 
-def extract_reminder_content(user_input, date_str, time_str):
+def extract_reminder_content(user_input, parsed, doc=None):
     """Extracts the main content of the reminder from user input"""
-    nlp = spacy.load("en_core_web_sm")
-    doc = nlp(user_input)
+    if doc is None:
+        doc = parse(user_input)
     content_tokens = [token.text for token in doc if token.ent_type_ not in ['DATE', 'TIME', 'ORDINAL']]
     for i, token in enumerate(doc[:-1]):
         if token.text.lower() == "at" and doc[i + 1].ent_type_ == 'TIME':
             content_tokens.remove(token.text)
     content = ' '.join(content_tokens)
-    content = re.sub(REMOVAL_PHRASES, '', content).strip()
-    date_pattern = re.compile(r'\b' + re.escape(date_str) + r'\b')
-    content = date_pattern.sub('', content)
-    time_formats = generate_time_formats(time_str)
-    for time_format in time_formats:
-        time_pattern = re.compile(r'\b' + re.escape(time_format) + r'\b')
-        content = time_pattern.sub('', content)
+    content = _REMOVAL_PATTERN.sub('', content).strip()
+    # Remove the date and every time format in one pass, longest first as the sequential version did
+    leftovers = [parsed.date_str] + sorted(generate_time_formats(parsed.time_str), key=len, reverse=True)
+    content = re.sub(r'\b(?:' + '|'.join(re.escape(text) for text in leftovers) + r')\b', '', content)
     content = content.replace("  ", " ")
     content = content.strip(":")
     return content
 
-def get_reminder_content(user_input, date_str, time_str):
+def extract_reminder_contents(user_inputs):
+    """Extracts (content or None, ParsedDatetime) for many inputs, parsing them in one nlp.pipe pass"""
+    user_inputs = list(user_inputs)
+    results = []
+    parsed_datetimes = get_datetime_parser().parse_many(user_inputs)
+    for user_input, doc, parsed in zip(user_inputs, parse_many(user_inputs), parsed_datetimes):
+        content = extract_reminder_content(user_input, parsed, doc=doc)
+        results.append((content or None, parsed))
+    return results
+
+def get_reminder_content(user_input, parsed):
     """Wrapper function to extract reminder content"""
-    reminder_content = extract_reminder_content(user_input, date_str, time_str)
+    reminder_content = extract_reminder_content(user_input, parsed)
     if not reminder_content:
         return None
     return reminder_content
 
 def get_reminder_datetime(user_input):
-    """Extracts both the date and time for a reminder from user input"""
-    date_str, time_str, is_recurring = extract_datetime(user_input)
-    if not date_str or not time_str:
-        return None, None, None
-    return date_str, time_str, is_recurring
\ No newline at end of file
+    """Extracts the ParsedDatetime for a reminder from user input; later stages reuse it rather than re-parsing"""
+    return extract_datetime(user_input)
\ No newline at end of file
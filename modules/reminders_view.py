@@ -0,0 +1,173 @@
+import threading
+from modules.reminders import get_reminders_for_period, mark_reminders_as_done
+from modules.reminder_store import get_reminder_sync
+
+# ======================== Constants ========================
+
+MESSAGE_ROW_ID = 'message'  # Treeview id of the placeholder row ("Loading...", "No reminders", errors)
+EMPTY_MESSAGES = {'day': "No reminders for today.", 'week': "No reminders this week."}
+
+# ======================== Reminders View-Model ========================
+
+class RemindersViewModel:
+    """State of the Todo list panel, kept apart from Tk so every widget call stays on the Tk thread.
+
+    Fetches run on a background thread and hand their results back through `schedule`
+    (root.after on the GUI). Clicks that arrive while a fetch is running are coalesced
+    into a single follow-up fetch of the latest view. Listeners receive the full list
+    of rows each time and diff it against what is on screen.
+    """
+
+    def __init__(self, schedule, fetch=get_reminders_for_period, mark_done=mark_reminders_as_done,
+                 sync=lambda: get_reminder_sync().sync(), view='day'):
+        self.schedule = schedule
+        self.fetch = fetch
+        self.mark_done_fn = mark_done
+        self.sync = sync
+        self.view = view
+        self.rows = []  # (id, summary, time) in display order
+        self.message = "Loading reminders..."
+        self._listeners = []
+        self._error_listeners = []
+        self._hidden = set()  # Marked done here but not yet gone from fetched results
+        self._confirmed = []  # (ids, request number): unhide once a fetch for that request has landed
+        self._lock = threading.Lock()
+        self._requested = 0  # Number of refresh requests so far
+        self._in_flight = False
+        self._again = False  # Another refresh was requested while one was in flight
+        self._sync_requested = False
+
+    def add_listener(self, callback):
+        """Registers callback(rows, message), called on the Tk thread whenever the panel should change"""
+        self._listeners.append(callback)
+
+    def add_error_listener(self, callback):
+        """Registers callback(title, message), called on the Tk thread when an action fails"""
+        self._error_listeners.append(callback)
+
+    # ---------- Actions (call from the Tk thread) ----------
+
+    def refresh(self, sync=False):
+        """Fetches the current view in the background; with sync, pulls from Google Calendar first"""
+        with self._lock:
+            self._requested += 1
+            self._sync_requested = self._sync_requested or sync
+            if self._in_flight:
+                self._again = True
+                return
+            self._in_flight = True
+        threading.Thread(target=self._fetch_loop, daemon=True).start()
+
+    def set_view(self, view):
+        """Switches between 'day' and 'week', showing a placeholder until the new rows arrive"""
+        if view == self.view:
+            return
+        with self._lock:
+            self.view = view
+        self.rows, self.message = [], "Loading reminders..."
+        self._notify()
+        self.refresh()
+
+    def mark_done(self, event_ids):
+        """Removes the rows at once and records the change in the background, restoring them on failure"""
+        event_ids = [event_id for event_id in event_ids if event_id != MESSAGE_ROW_ID]
+        if not event_ids:
+            return
+        self._hidden.update(event_ids)
+        self.rows = [row for row in self.rows if row[0] not in self._hidden]
+        self._notify()
+
+        def work():
+            try:
+                self.mark_done_fn(event_ids)
+                self.schedule(lambda: self._confirm(event_ids))
+            except Exception as e:
+                self.schedule(lambda error=e: self._restore(event_ids, error))  # e is unbound after the block
+        threading.Thread(target=work, daemon=True).start()
+
+    # ---------- Background work ----------
+
+    def _fetch_loop(self):
+        while True:
+            with self._lock:
+                view, sync, request = self.view, self._sync_requested, self._requested
+                self._sync_requested = False
+            error = None
+            if sync:
+                try:
+                    self.sync()
+                except Exception as e:
+                    self._report("Refresh Error", f"An error occurred while refreshing reminders: {e}")
+            try:
+                reminders = self.fetch(view)
+            except Exception as e:
+                reminders, error = None, e
+            with self._lock:
+                if self._again:
+                    self._again = False
+                    continue  # A newer request came in; its result supersedes this one
+                self._in_flight = False
+            self.schedule(lambda: self._apply(view, reminders, error, request))
+            return
+
+    # ---------- Tk-thread state updates ----------
+
+    def _apply(self, view, reminders, error, request):
+        if view != self.view:
+            return  # The view changed after this fetch finished; its own fetch is on the way
+        if error is not None:
+            self.rows, self.message = [], f"Error fetching reminders: {error}"
+        else:
+            self.rows = [(reminder['id'], reminder['summary'], reminder['time'])
+                         for reminder in reminders if reminder['id'] not in self._hidden]
+            self.message = None if self.rows else EMPTY_MESSAGES.get(view, "No reminders.")
+            # Results fetched after a mark-done was recorded no longer contain those rows
+            for event_ids, confirmed_at in [entry for entry in self._confirmed if entry[1] <= request]:
+                self._hidden.difference_update(event_ids)
+                self._confirmed.remove((event_ids, confirmed_at))
+        self._notify()
+
+    def _confirm(self, event_ids):
+        self.refresh()
+        self._confirmed.append((event_ids, self._requested))
+
+    def _restore(self, event_ids, error):
+        self._hidden.difference_update(event_ids)
+        self._report("Reminder Error", f"Could not mark the reminder as done: {error}")
+        self.refresh()  # Brings the rows back from the store
+
+    def _notify(self):
+        for callback in list(self._listeners):
+            callback(list(self.rows), self.message)
+
+    def _report(self, title, message):
+        self.schedule(lambda: [callback(title, message) for callback in list(self._error_listeners)])
+
+# ======================== Row Diffing ========================
+
+def diff_rows(old_rows, new_rows):
+    """Compares two row lists by id and returns (removed ids, operations).
+
+    After deleting the removed ids, applying the operations in order turns a Treeview
+    showing old_rows into one showing new_rows: ('insert', index, row),
+    ('update', row) and ('move', index, id). Unchanged rows are left alone.
+    """
+    old = {row[0]: row for row in old_rows}
+    new_ids = {row[0] for row in new_rows}
+    removed = [row_id for row_id in old if row_id not in new_ids]
+    survivors = [row[0] for row in old_rows if row[0] in new_ids]  # Tree order once removed rows are gone
+    operations = []
+    position = 0  # survivors[:position] have been placed
+    for index, row in enumerate(new_rows):
+        previous = old.get(row[0])
+        if previous is None:
+            operations.append(('insert', index, row))
+            continue
+        if previous != row:
+            operations.append(('update', row))
+        if survivors[position] != row[0]:
+            operations.append(('move', index, row[0]))
+            survivors.remove(row[0])
+            survivors.insert(position, row[0])
+        position += 1
+    return removed, operations
@@ -0,0 +1,238 @@
+import array
+import base64
+import collections
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from modules.lazy import lazy_import
+
+numpy = lazy_import('numpy')
+
+# ======================== Constants ========================
+
+RESPONSE_CACHE_PATH = os.path.join('cache', 'responses.json')
+RESPONSE_CACHE_MAX_ENTRIES = 500  # Least recently used answers are evicted past this
+RESPONSE_CACHE_TTL = 7 * 24 * 3600  # Seconds an answer may be reused
+SIMILARITY_THRESHOLD = 0.93  # Minimum cosine similarity for a semantic hit
+CONTEXT_TURNS = 2  # Turns before the prompt that are part of the key
+SAVE_INTERVAL = 30  # Seconds between writes of the cache file; close() writes any remainder
+
+# ======================== Keys ========================
+
+def normalize_prompt(text):
+    """Lowercases and drops punctuation and extra whitespace, so "What can you do?" == "what can you do" """
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+def split_prompt(messages, turns=CONTEXT_TURNS):
+    """Splits chat messages into (latest user prompt, context fingerprint).
+
+    The fingerprint hashes the system instructions and the last `turns` turns before
+    the prompt, so an answer is only reused where the conversation led up to it the
+    same way. The running summary is left out. Returns (None, None) when the last
+    message is not from the user.
+    """
+    if not messages or messages[-1]['role'] != 'user':
+        return None, None
+    instructions = messages[0]['content'] if messages[0]['role'] == 'system' else ""
+    dialog = [message for message in messages[1:-1] if message['role'] != 'system']
+    recent = dialog[-turns:] if turns else []
+    context = [instructions] + [f"{message['role']}: {normalize_prompt(message['content'])}" for message in recent]
+    fingerprint = hashlib.sha1("\0".join(context).encode('utf-8')).hexdigest()[:16]
+    return messages[-1]['content'], fingerprint
+
+# ======================== Response Cache ========================
+
+class ResponseCache:
+    """Persistent LRU cache of assistant answers keyed by (context fingerprint, normalized prompt).
+
+    A lookup first tries the exact key. With an `embed` function (text -> vector) it then
+    compares the prompt's embedding with every cached prompt under the same context and
+    reuses the closest answer at or above `threshold`. Entries expire after `ttl`
+    seconds. Hits add the latency of the original completion to `saved_ms`.
+    """
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL,
+                 threshold=SIMILARITY_THRESHOLD, embed=None, clock=time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self.embed = embed
+        self.clock = clock
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+        self._entries = collections.OrderedDict()  # (context, prompt) -> entry dict, least recently used first
+        self._matrices = {}  # context -> (keys, normalized embedding matrix), rebuilt after changes
+        self._embeddings = {}  # Normalized prompt -> embedding computed by the last lookups, reused by put()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = clock()
+        self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ---------- Lookup ----------
+
+    def get(self, prompt, context):
+        """Returns a cached answer for the prompt in this context, or None"""
+        normalized = normalize_prompt(prompt)
+        key = (context, normalized)
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                self.saved_ms += entry['latency_ms']
+                return entry['response']
+            has_candidates = any(entry_context == context for entry_context, _ in self._entries)
+        if self.embed is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        vector = self._embed(normalized)
+        with self._lock:
+            key = self._nearest(context, vector) if has_candidates and vector is not None else None
+            if key is None:
+                self.misses += 1
+                return None
+            entry = self._entries[key]
+            self._entries.move_to_end(key)
+            self.semantic_hits += 1
+            self.saved_ms += entry['latency_ms']
+            return entry['response']
+
+    def _embed(self, normalized):
+        vector = self._embeddings.get(normalized)
+        if vector is not None:
+            return vector
+        try:
+            vector = numpy.asarray(self.embed(normalized), dtype=numpy.float32)
+        except Exception as e:
+            print(f"Error embedding prompt for the response cache: {e}")
+            return None
+        norm = numpy.linalg.norm(vector)
+        vector = vector / norm if norm else vector
+        with self._lock:
+            if len(self._embeddings) >= 32:
+                self._embeddings.pop(next(iter(self._embeddings)))
+            self._embeddings[normalized] = vector
+        return vector
+
+    def _nearest(self, context, vector):
+        """Returns the key of the most similar prompt cached under context if it clears the threshold"""
+        if context not in self._matrices:
+            keys = [key for key, entry in self._entries.items() if key[0] == context and entry.get('embedding') is not None]
+            rows = [self._entries[key]['embedding'] for key in keys]
+            self._matrices[context] = (keys, numpy.vstack(rows) if rows else None)
+        keys, matrix = self._matrices[context]
+        if matrix is None or matrix.shape[1] != vector.shape[0]:
+            return None
+        scores = matrix @ vector
+        best = int(scores.argmax())
+        return keys[best] if scores[best] >= self.threshold else None
+
+    # ---------- Storing ----------
+
+    def put(self, prompt, context, response, latency_ms):
+        """Caches the answer a completion gave for the prompt, with the time the completion took"""
+        normalized = normalize_prompt(prompt)
+        vector = self._embed(normalized) if self.embed is not None else None
+        with self._lock:
+            key = (context, normalized)
+            self._entries.pop(key, None)
+            self._entries[key] = {'response': response, 'latency_ms': latency_ms, 'created': self.clock(),
+                                  'embedding': vector}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrices.clear()
+            self._dirty = True
+            due = self.clock() - self._saved_at >= SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def _expire(self):
+        cutoff = self.clock() - self.ttl
+        expired = [key for key, entry in self._entries.items() if entry['created'] < cutoff]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrices.clear()
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+            self._dirty = True
+
+    # ---------- Stats ----------
+
+    def stats(self):
+        """Returns hit counts, hit rate and the completion time saved by hits"""
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'lookups': lookups,
+                'exact_hits': self.exact_hits,
+                'semantic_hits': self.semantic_hits,
+                'misses': self.misses,
+                'hit_rate': (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+                'saved_ms': self.saved_ms,
+            }
+
+    # ---------- Persistence ----------
+
+    def save(self):
+        """Writes the cache to disk if it changed; embeddings are stored as base64 float32"""
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            entries = [{'context': context, 'prompt': prompt, 'response': entry['response'],
+                        'latency_ms': entry['latency_ms'], 'created': entry['created'],
+                        'embedding': _encode_vector(entry['embedding'])}
+                       for (context, prompt), entry in self._entries.items()]
+            self._dirty = False
+            self._saved_at = self.clock()
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump({'version': 1, 'entries': entries}, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Error saving response cache: {e}")
+
+    close = save
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            for item in data.get('entries', []):
+                self._entries[(item['context'], item['prompt'])] = {
+                    'response': item['response'], 'latency_ms': item['latency_ms'], 'created': item['created'],
+                    'embedding': _decode_vector(item.get('embedding'))}
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading response cache: {e}")
+            self._entries.clear()
+        self._expire()
+
+def _encode_vector(vector):
+    if vector is None:
+        return None
+    return base64.b64encode(array.array('f', vector.tolist()).tobytes()).decode('ascii')
+
+def _decode_vector(text):
+    if not text:
+        return None
+    return numpy.frombuffer(base64.b64decode(text), dtype=numpy.float32)
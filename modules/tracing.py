@@ -0,0 +1,200 @@
+import collections
+import contextvars
+import functools
+import itertools
+import json
+import os
+import statistics
+import threading
+import time
+
+# ======================== Constants ========================
+
+TRACING = False  # Record spans; while off, span() and traced functions cost one flag check
+TRACE_BUFFER = 10000  # Finished spans kept for export; oldest are dropped beyond this
+METRICS_WINDOW = 100  # Samples kept per stage
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+_ids = itertools.count(1)
+
+# ======================== Metrics ========================
+
+class LatencyStats:
+    """Rolling per-stage latency samples in milliseconds"""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self._samples = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._samples[stage].append(seconds * 1000)
+
+    def summary(self):
+        """Returns count, mean, p50 and p95 for every stage"""
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+        return {
+            stage: {
+                'count': len(samples),
+                'mean': statistics.mean(samples),
+                'p50': statistics.median(samples),
+                'p95': samples[max(int(len(samples) * 0.95) - 1, 0)],
+            }
+            for stage, samples in snapshot.items() if samples
+        }
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+# ======================== Spans ========================
+
+class Span:
+    """One timed stage of a turn, e.g. 'openai' or 'calendar.insert'.
+
+    Use it as a context manager. While it is open it is the current span of its
+    context, so spans opened inside it, including in work handed to other threads
+    through wrap(), become its children. Inside a generator it stays current across
+    yields, so the consumer's work between items is attributed to it too.
+    """
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start', 'end', 'thread_id', 'args', '_token')
+
+    def __init__(self, name, args=None):
+        parent = _current_span.get()
+        self.name = name
+        self.span_id = next(_ids)
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.start = self.end = None
+        self.thread_id = None
+        self.args = args or {}
+        self._token = None
+
+    def set(self, **args):
+        """Attaches details shown with the span in the trace viewer"""
+        self.args.update(args)
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc is not None:
+            self.args['error'] = repr(exc)
+        try:
+            _current_span.reset(self._token)
+        except ValueError:  # A generator holding the span was closed from another context
+            pass
+        _tracer.record(self)
+        return False
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+class _NoopSpan:
+    """Returned by span() while tracing is off"""
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+# ======================== Tracer ========================
+
+class Tracer:
+    """Keeps finished spans for export and rolling latencies per span name"""
+
+    def __init__(self, buffer=TRACE_BUFFER, window=METRICS_WINDOW):
+        self.spans = collections.deque(maxlen=buffer)
+        self.stats = LatencyStats(window)
+        self.origin = time.perf_counter()
+        self._thread_names = {}
+
+    def record(self, span):
+        self.spans.append(span)
+        self.stats.record(span.name, span.duration)
+        if span.thread_id not in self._thread_names:
+            self._thread_names[span.thread_id] = threading.current_thread().name
+
+    def summary(self):
+        """Returns count, mean, p50 and p95 in milliseconds for every stage"""
+        return self.stats.summary()
+
+    def clear(self):
+        self.spans.clear()
+        self.stats.clear()
+
+    def chrome_trace(self):
+        """Returns the spans as a Chrome trace-event document (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_id, 'args': {'name': name}}
+                  for thread_id, name in list(self._thread_names.items())]
+        for span in list(self.spans):
+            args = dict(span.args, trace_id=span.trace_id, span_id=span.span_id)
+            if span.parent_id is not None:
+                args['parent_id'] = span.parent_id
+            events.append({
+                'name': span.name, 'cat': span.name.split('.')[0], 'ph': 'X', 'pid': pid, 'tid': span.thread_id,
+                'ts': (span.start - self.origin) * 1e6, 'dur': span.duration * 1e6,
+                'args': {key: value if isinstance(value, (int, float, bool, type(None))) else str(value)
+                         for key, value in args.items()},
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        """Writes chrome_trace() to path as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+_tracer = Tracer()
+
+def get_tracer():
+    return _tracer
+
+# ======================== Instrumentation ========================
+
+def set_enabled(enabled):
+    global TRACING
+    TRACING = enabled
+
+def span(name, **args):
+    """Returns a span to open with `with`; args are shown with it in the trace viewer"""
+    if not TRACING:
+        return _NOOP_SPAN
+    return Span(name, args)
+
+def traced(name):
+    """Decorator timing every call of a function as a span called name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACING:
+                return func(*args, **kwargs)
+            with Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def wrap(func):
+    """Binds func to the current span so work handed to another thread joins the same trace"""
+    if not TRACING or _current_span.get() is None:
+        return func
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
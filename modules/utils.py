@@ -1,15 +1,33 @@
-import pyttsx3
+import io
+import json
 import os
+import re
+import queue
 import datetime
-import speech_recognition as sr
-import pygame
-import requests
+import threading
+import tempfile
+import wave
+from modules.audio import MIXER_FREQUENCY, init_audio, pcm_to_16bit, speech_channel, stop_speech_output
+from modules.audio_cache import AudioCache
+from modules.http_client import get_http_client
+from modules.lazy import lazy_import
+from modules import tracing
+
+# Heavy audio and network libraries load on first use, not at startup
+pyttsx3 = lazy_import('pyttsx3')
+sr = lazy_import('speech_recognition')
+pygame = lazy_import('pygame')
 
 # ======================== Constants ========================
 
 # Input mode: (1 for typing, 2 for speech-to-text)
 INPUT_MODE = 1
 
+# Speech-to-text backend: ('google' for the Google Web Speech API, 'vosk' for fully local recognition)
+STT_BACKEND = 'google'
+VOSK_MODEL_PATH = os.path.join('models', 'vosk-model-small-en-us-0.15')  # Unpacked model from alphacephei.com/vosk/models
+VOSK_SAMPLE_RATE = 16000
+
 # Choose the text-to-speech engine: (1 for pyttsx3, 2 for ElevenLabs)
 TTS_ENGINE = 2
 
@@ -17,50 +35,382 @@ TTS_ENGINE = 2
 CHUNK_SIZE = 1024
 ELEVENLABS_API_KEY = ''   # Replace with your actual API key
 ELEVENLABS_VOICE = 'ThT5KcBeYPX3keUQqHPh' 
+ELEVENLABS_API_URL = 'https://api.elevenlabs.io/v1'
+
+# Streaming playback: start speaking as soon as the first audio arrives
+TTS_STREAMING = True
+STREAM_SAMPLE_RATE = MIXER_FREQUENCY  # The pcm_* output format requested from ElevenLabs
+STREAM_BLOCK_SECONDS = 0.2  # Length of each in-memory block queued on the speech channel
+
+# Replay previously synthesized phrases from disk instead of synthesizing them again
+TTS_CACHE = True
+
+_stop_event = threading.Event()  # Set by stop_speaking() to cut the current utterance short
+_speaking = threading.Event()
+
+# Sentence boundary used to hand finished sentences to TTS while text is still streaming
+SENTENCE_END = re.compile(r'(?:(?<=[.!?])|(?<=[.!?]["\')\]]))\s+')
+
+# All speech goes through one worker thread that owns the TTS engine
+_speech_queue = queue.Queue()  # (text, threading.Event or None, function speaking it in the caller's trace)
+_speech_worker = None
+_speech_worker_lock = threading.Lock()
+_audio_cache = AudioCache()
 
-# Initialize the text-to-speech engine for pyttsx3
-engine = pyttsx3.init() if TTS_ENGINE == 1 else None
+# The pyttsx3 engine is created on, and only used from, the speech worker thread
+engine = None
 
 def speak(text):
     """Function to speak text aloud and print"""
+    if threading.current_thread() is _speech_worker:
+        _speak_now(text)
+        return
+    done = threading.Event()
+    _enqueue_speech(text, done)
+    done.wait()
+
+def speak_async(text):
+    """Queue text to be spoken in order on the background speech thread"""
+    _enqueue_speech(text, None)
+
+def wait_until_spoken():
+    """Block until everything queued with speak_async has been spoken"""
+    _speech_queue.join()
+
+def stop_speaking():
+    """Interrupt the current utterance and drop anything still queued"""
+    _stop_event.set()
+    while True:
+        try:
+            _, done, _ = _speech_queue.get_nowait()
+        except queue.Empty:
+            break
+        if done:
+            done.set()
+        _speech_queue.task_done()
+    stop_speech_output()
+
+def is_speaking():
+    """Check whether speech is playing or waiting in the queue"""
+    return _speaking.is_set() or _speech_queue.unfinished_tasks > 0
+
+def _enqueue_speech(text, done):
+    global _speech_worker
+    with _speech_worker_lock:
+        if _speech_worker is None:
+            _speech_worker = threading.Thread(target=_speech_loop, daemon=True)
+            _speech_worker.start()
+    # The speech thread joins the caller's trace, so TTS shows up under the turn that queued it
+    _speech_queue.put((text, done, tracing.wrap(_speak_now)))
+
+def _speech_loop():
+    global engine
+    if TTS_ENGINE == 1:
+        engine = pyttsx3.init()
+    while True:
+        text, done, speak_now = _speech_queue.get()
+        try:
+            speak_now(text)
+        except Exception as e:
+            print(f"Error speaking: {e}")
+        finally:
+            _speech_queue.task_done()
+            if done:
+                done.set()
+
+def _speak_now(text):
+    """Speaks text on the current (speech worker) thread"""
     print(f"IVA: {text}")
-    if TTS_ENGINE == 1 and engine is not None:
-        engine.say(text)
-        engine.runAndWait()
-    elif TTS_ENGINE == 2:
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": ELEVENLABS_API_KEY
-        }
-        data = {
-            "text": text,
-            "model_id": "eleven_monolingual_v1",
-            "voice_settings": {
-            "stability": 0.5,
-            "similarity_boost": 0.5
-            }
+    _stop_event.clear()
+    _speaking.set()
+    try:
+        with tracing.span('tts', engine=TTS_ENGINE, chars=len(text)):
+            if TTS_ENGINE == 1 and engine is not None:
+                speak_pyttsx3(text)
+            elif TTS_ENGINE == 2:
+                speak_elevenlabs(text)
+    finally:
+        _speaking.clear()
+
+class SentenceSplitter:
+    """Collects streamed text and returns each sentence once it is complete"""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, delta):
+        """Add streamed text and return the sentences it completed"""
+        self.buffer += delta
+        parts = SENTENCE_END.split(self.buffer)
+        self.buffer = parts.pop()
+        return [part.strip() for part in parts if part.strip()]
+
+    def flush(self):
+        """Return whatever text is left once the stream has ended"""
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+@tracing.traced('tts.request')
+def request_elevenlabs_audio(text, stream=TTS_STREAMING):
+    """Sends text to ElevenLabs and returns the (optionally streaming) HTTP response"""
+    headers = {
+        "Content-Type": "application/json",
+        "xi-api-key": ELEVENLABS_API_KEY
+    }
+    data = {
+        "text": text,
+        "model_id": "eleven_monolingual_v1",
+        "voice_settings": {
+        "stability": 0.5,
+        "similarity_boost": 0.5
         }
+    }
+    url = f"{ELEVENLABS_API_URL}/text-to-speech/{ELEVENLABS_VOICE}"
+    params = None
+    if stream:
+        url += "/stream"
+        params = {"output_format": f"pcm_{STREAM_SAMPLE_RATE}"}
+    else:
+        headers["Accept"] = "audio/mpeg"
+    return get_http_client().post(url, json=data, headers=headers, params=params, stream=stream,
+                                  endpoint="elevenlabs.tts")
+
+def speak_pyttsx3(text):
+    """Speaks text with pyttsx3, synthesizing to a cached WAV file that the mixer plays"""
+    voice = engine.getProperty('voice')
+    path = _audio_cache.get('pyttsx3', voice, text) if TTS_CACHE else None
+    if path is None:
+        fd, tmp_path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            engine.save_to_file(text, tmp_path)
+            engine.runAndWait()
+            with open(tmp_path, 'rb') as f:
+                data = f.read()
+        finally:
+            os.remove(tmp_path)
+        path = _audio_cache.put('pyttsx3', voice, text, data, 'wav') if TTS_CACHE else None
+        if path is None:
+            play_audio_bytes(data, 'wav')
+            return
+    play_audio_file(path)
+
+def speak_elevenlabs(text, on_first_audio=None):
+    """Speaks text with ElevenLabs, streaming PCM into the mixer when TTS_STREAMING is set"""
+    path = _audio_cache.get('elevenlabs', ELEVENLABS_VOICE, text) if TTS_CACHE else None
+    if path is not None:
+        play_audio_file(path, on_first_audio)
+        return
+    response = request_elevenlabs_audio(text)
+    if response.status_code != 200:
+        print(f"Error with ElevenLabs TTS: HTTP Status Code {response.status_code}, Response: {response.text}")
+        return
+    if TTS_STREAMING:
+        audio = bytearray()
+
+        def recorded(chunks):
+            for chunk in chunks:
+                audio.extend(chunk)
+                yield chunk
+
+        try:
+            completed = play_pcm_stream(recorded(response.iter_content(chunk_size=CHUNK_SIZE)), on_first_audio)
+        finally:
+            response.close()  # An interrupted stream would otherwise hold its pooled connection
+        if completed and TTS_CACHE:
+            _audio_cache.put('elevenlabs', ELEVENLABS_VOICE, text, pcm_to_wav(bytes(audio)), 'wav')
+    else:
+        data = response.content
+        play_mp3_bytes(data, on_first_audio)
+        if TTS_CACHE:
+            _audio_cache.put('elevenlabs', ELEVENLABS_VOICE, text, data, 'mp3')
+
+def pcm_to_wav(pcm, sample_rate=STREAM_SAMPLE_RATE):
+    """Wraps 16-bit mono PCM in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+def play_pcm_stream(chunks, on_first_audio=None):
+    """Plays 16-bit mono PCM chunks as they arrive; returns True if the stream was not interrupted"""
+    channel = speech_channel()
+    block_bytes = int(STREAM_SAMPLE_RATE * STREAM_BLOCK_SECONDS) * 2
+    pending = bytearray()
+    started = False
 
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE}"
-        response = requests.post(url, json=data, headers=headers)
-        if response.status_code == 200:
-            audio_file = 'output.mp3'
-            pygame.mixer.init()
-            if pygame.mixer.music.get_busy():
-                pygame.mixer.music.stop()
-            with open(audio_file, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
-                    if chunk:
-                        f.write(chunk)
-            pygame.mixer.music.load(audio_file)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-            pygame.mixer.quit()
+    def enqueue(block):
+        nonlocal started
+        sound = pygame.mixer.Sound(buffer=bytes(block))
+        while channel.get_queue() is not None and not _stop_event.is_set():
+            pygame.time.wait(5)
+        if channel.get_busy():
+            channel.queue(sound)
         else:
-            print(f"Error with ElevenLabs TTS: HTTP Status Code {response.status_code}, Response: {response.text}")
+            channel.play(sound)
+        if not started:
+            started = True
+            if on_first_audio:
+                on_first_audio()
+
+    for chunk in chunks:
+        if _stop_event.is_set():
+            return
+        if not chunk:
+            continue
+        pending.extend(chunk)
+        while len(pending) >= block_bytes:
+            enqueue(pending[:block_bytes])
+            del pending[:block_bytes]
+    pending = pending[:len(pending) - len(pending) % 2]  # Drop a trailing half sample
+    if pending:
+        enqueue(pending)
+    while channel.get_busy() and not _stop_event.is_set():
+        pygame.time.wait(10)
+    return True
+
+def play_mp3_bytes(data, on_first_audio=None):
+    """Plays a complete MP3 from memory on the shared mixer"""
+    init_audio()
+    if pygame.mixer.music.get_busy():
+        pygame.mixer.music.stop()
+    pygame.mixer.music.load(io.BytesIO(data), "mp3")
+    pygame.mixer.music.play()
+    if on_first_audio:
+        on_first_audio()
+    while pygame.mixer.music.get_busy() and not _stop_event.is_set():
+        pygame.time.wait(10)
+
+def play_audio_bytes(data, extension, on_first_audio=None):
+    """Plays a complete WAV or MP3 clip from memory"""
+    init_audio()
+    if extension == 'mp3':
+        play_mp3_bytes(data, on_first_audio)
+    else:
+        _play_sound(pygame.mixer.Sound(file=io.BytesIO(data)), on_first_audio)
+
+def play_audio_file(path, on_first_audio=None):
+    """Plays a cached clip on the speech channel (MP3 through the music stream)"""
+    init_audio()
+    if path.endswith('.mp3'):
+        with open(path, 'rb') as f:
+            play_mp3_bytes(f.read(), on_first_audio)
+    else:
+        _play_sound(pygame.mixer.Sound(file=path), on_first_audio)
+
+def _play_sound(sound, on_first_audio=None):
+    channel = speech_channel()
+    channel.play(sound)
+    if on_first_audio:
+        on_first_audio()
+    while channel.get_busy() and not _stop_event.is_set():
+        pygame.time.wait(10)
+
+# ======================== Speech-to-Text Backends ========================
+
+class STTStream:
+    """Incremental recognition of one utterance; the default buffers audio and transcribes at the end"""
+
+    def __init__(self, backend, sample_rate, sample_width=2):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.frames = []
+
+    def feed(self, chunk):
+        """Add raw PCM audio to the utterance"""
+        self.frames.append(chunk)
+
+    def finish(self):
+        """Return the final transcript, or None if nothing was recognized"""
+        audio = sr.AudioData(b''.join(self.frames), self.sample_rate, self.sample_width)
+        return self.backend.transcribe(audio)
+
+class STTBackend:
+    """Base class for speech-to-text engines"""
+    name = None
+
+    def transcribe(self, audio):
+        """Return text for an sr.AudioData, or None if nothing was recognized"""
+        raise NotImplementedError
+
+    def open_stream(self, sample_rate, sample_width=2, on_partial=None):
+        """Start recognizing an utterance that will arrive in chunks"""
+        return STTStream(self, sample_rate, sample_width)
+
+class GoogleSTT(STTBackend):
+    """Google Web Speech API through speech_recognition (needs a network connection)"""
+    name = 'google'
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, audio):
+        try:
+            return self.recognizer.recognize_google(audio)
+        except sr.UnknownValueError:
+            return None
+
+class VoskStream(STTStream):
+    """Feeds audio to a Kaldi recognizer as it arrives and reports partial transcripts"""
+
+    def __init__(self, backend, sample_rate, sample_width=2, on_partial=None):
+        super().__init__(backend, sample_rate, sample_width)
+        self.recognizer = backend.vosk.KaldiRecognizer(backend.model, sample_rate)
+        self.on_partial = on_partial
+        self.segments = []
+
+    def feed(self, chunk):
+        if self.sample_width != 2:
+            chunk = pcm_to_16bit(chunk, self.sample_width)
+        if self.recognizer.AcceptWaveform(chunk):
+            text = json.loads(self.recognizer.Result()).get('text', '')
+            if text:
+                self.segments.append(text)
+            partial = ''
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        if self.on_partial:
+            self.on_partial(' '.join(self.segments + [partial]).strip())
+
+    def finish(self):
+        text = json.loads(self.recognizer.FinalResult()).get('text', '')
+        return ' '.join(self.segments + [text]).strip() or None
+
+class VoskSTT(STTBackend):
+    """Fully local recognition with Vosk; the model is loaded once and shared"""
+    name = 'vosk'
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        import vosk  # Optional dependency: pip install vosk
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def transcribe(self, audio):
+        stream = self.open_stream(VOSK_SAMPLE_RATE)
+        stream.feed(audio.get_raw_data(convert_rate=VOSK_SAMPLE_RATE, convert_width=2))
+        return stream.finish()
+
+    def open_stream(self, sample_rate, sample_width=2, on_partial=None):
+        return VoskStream(self, sample_rate, sample_width, on_partial)
+
+STT_BACKENDS = {'google': GoogleSTT, 'vosk': VoskSTT}
+_stt_backends = {}
+_stt_lock = threading.Lock()
+
+def get_stt_backend(name=None):
+    """Return the shared instance of a speech-to-text backend (STT_BACKEND by default)"""
+    name = name or STT_BACKEND
+    with _stt_lock:
+        if name not in _stt_backends:
+            _stt_backends[name] = STT_BACKENDS[name]()
+        return _stt_backends[name]
 
+@tracing.traced('stt')
 def recognize_speech():
     """Function to recognize speech"""
     r = sr.Recognizer()
@@ -68,7 +418,9 @@ def recognize_speech():
         print("Speak now...")
         audio = r.listen(source, timeout=5, phrase_time_limit=5)
     try:
-        text = r.recognize_google(audio)
+        text = get_stt_backend().transcribe(audio)
+        if text is None:
+            raise sr.UnknownValueError()
         print(f"You: {text}")
         return text
     except sr.UnknownValueError:
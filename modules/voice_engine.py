@@ -0,0 +1,331 @@
+import collections
+import itertools
+import queue
+import statistics
+import threading
+import time
+import wave
+from modules.audio import pcm_rms, pcm_to_mono
+from modules.lazy import lazy_import
+from modules.process_input import process_input_stream
+from modules.utils import speak, stop_speaking, get_stt_backend, SentenceSplitter
+from modules.tracing import LatencyStats, span
+
+sr = lazy_import('speech_recognition')
+
+# ======================== Constants ========================
+
+QUEUE_SIZE = 4  # Bound for each queue between stages
+AUDIO_QUEUE_SIZE = 256  # Audio chunks buffered ahead of speech recognition
+CHUNK = 1024  # Audio frames read per capture step
+PAUSE_SECONDS = 0.8  # Silence that ends a phrase
+PHRASE_TIME_LIMIT = 15  # Longest phrase before it is cut and sent to recognition
+PRE_ROLL_SECONDS = 0.3  # Audio kept from before speech starts so the first syllable is not lost
+CALIBRATION_SECONDS = 1  # Ambient noise sampled once when the engine starts
+MIN_ENERGY_THRESHOLD = 300
+BARGE_IN_ENERGY_FACTOR = 2.0  # Speech must be this much louder while IVA talks, so IVA does not interrupt itself
+
+# ======================== Audio Sources ========================
+
+class MicrophoneSource:
+    """Keeps one microphone stream open for the whole session"""
+    live = True
+
+    def __init__(self, device_index=None):
+        self.microphone = sr.Microphone(device_index=device_index)
+        self.stream = None
+
+    def open(self):
+        self.microphone.__enter__()
+        self.stream = self.microphone.stream
+        self.SAMPLE_RATE = self.microphone.SAMPLE_RATE
+        self.SAMPLE_WIDTH = self.microphone.SAMPLE_WIDTH
+        self.CHUNK = self.microphone.CHUNK
+        return self
+
+    def read_chunk(self):
+        return self.stream.read(self.CHUNK)
+
+    def close(self):
+        if self.stream is not None:
+            self.microphone.__exit__(None, None, None)
+            self.stream = None
+
+class WavSource:
+    """Plays WAV files into the engine as if they were spoken into the microphone"""
+    live = False
+
+    def __init__(self, paths, chunk=CHUNK, realtime=False, gap_seconds=1.0):
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.CHUNK = chunk
+        self.realtime = realtime
+        self.gap_seconds = gap_seconds
+        self._chunks = None
+
+    def open(self):
+        with wave.open(self.paths[0], 'rb') as wav:
+            self.SAMPLE_RATE = wav.getframerate()
+            self.SAMPLE_WIDTH = wav.getsampwidth()
+        self._chunks = self._iter_chunks()
+        return self
+
+    def _iter_chunks(self):
+        gap = b'\0' * self.SAMPLE_WIDTH * int(self.SAMPLE_RATE * self.gap_seconds)
+        for path in self.paths:
+            with wave.open(path, 'rb') as wav:
+                if (wav.getframerate(), wav.getsampwidth()) != (self.SAMPLE_RATE, self.SAMPLE_WIDTH):
+                    raise ValueError(f"{path} does not match the sample format of {self.paths[0]}")
+                frames = wav.readframes(wav.getnframes())
+                if wav.getnchannels() > 1:
+                    frames = pcm_to_mono(frames, self.SAMPLE_WIDTH, wav.getnchannels())
+            # Trailing silence so every file ends as its own phrase
+            data = frames + gap
+            step = self.CHUNK * self.SAMPLE_WIDTH
+            for i in range(0, len(data), step):
+                yield data[i:i + step]
+
+    def read_chunk(self):
+        chunk = next(self._chunks, None)
+        if chunk is not None and self.realtime:
+            time.sleep(len(chunk) / self.SAMPLE_WIDTH / self.SAMPLE_RATE)
+        return chunk
+
+    def close(self):
+        self._chunks = None
+
+# ======================== Voice Engine ========================
+
+class VoiceEngine:
+    """Pipelined voice loop: capture -> speech-to-text -> intent/LLM -> text-to-speech.
+
+    Each stage runs on its own thread with a bounded queue in front of it, so IVA keeps
+    listening while it thinks and talks. Speaking over IVA interrupts it (barge-in).
+    Callbacks run on the engine's threads; GUI callers must marshal them to Tk themselves.
+    """
+
+    def __init__(self, previous_questions_and_answers, source=None, stt=None,
+                 respond=None, speak_fn=speak, barge_in=True, calibrate=None, on_partial_text=None,
+                 on_user_text=None, on_response_start=None, on_response_delta=None, on_response_end=None):
+        self.previous_questions_and_answers = previous_questions_and_answers
+        self.source = source or MicrophoneSource()
+        self.stt = stt or get_stt_backend()
+        self.respond = respond or process_input_stream
+        self.speak_fn = speak_fn
+        self.barge_in = barge_in
+        self.calibrate = self.source.live if calibrate is None else calibrate
+        self.on_partial_text = on_partial_text
+        self.on_user_text = on_user_text
+        self.on_response_start = on_response_start
+        self.on_response_delta = on_response_delta
+        self.on_response_end = on_response_end
+        self.metrics = LatencyStats()
+        self.energy_threshold = MIN_ENERGY_THRESHOLD
+        self.audio_queue = queue.Queue(maxsize=AUDIO_QUEUE_SIZE)
+        self.text_queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.speech_queue = queue.Queue(maxsize=QUEUE_SIZE * 4)
+        self._turn = 0  # Bumped by cancel_speech(); replies from an older turn are dropped
+        self._utterances = itertools.count(1)  # Ids of recognized utterances, for per-reply metrics
+        self._speaking = threading.Event()
+        self._running = threading.Event()
+        self._threads = []
+
+    # ---------- Lifecycle ----------
+
+    def start(self):
+        """Opens the audio source and starts every stage thread"""
+        self.source.open()
+        self._running.set()
+        for target in (self._capture_loop, self._recognize_loop, self._respond_loop, self._speak_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """Stops capturing; stages finish their current item and exit"""
+        self._running.clear()
+        self.cancel_speech()
+
+    def join(self, timeout=None):
+        """Waits for the pipeline to drain, e.g. after a WavSource is exhausted"""
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def cancel_speech(self):
+        """Stops the current reply and drops any sentences still waiting to be spoken"""
+        self._turn += 1
+        _drain(self.speech_queue)
+        if self._speaking.is_set():
+            stop_speaking()
+
+    # ---------- Stages ----------
+
+    def _capture_loop(self):
+        source = self.source
+        chunk_seconds = source.CHUNK / source.SAMPLE_RATE
+        pre_roll = collections.deque(maxlen=max(int(PRE_ROLL_SECONDS / chunk_seconds), 1))
+        phrase = None
+        silent_chunks = 0
+        try:
+            if self.calibrate:
+                self._calibrate(chunk_seconds)
+            while self._running.is_set():
+                chunk = source.read_chunk()
+                if chunk is None:
+                    break
+                energy = pcm_rms(chunk, source.SAMPLE_WIDTH)
+                threshold = self.energy_threshold
+                if self._speaking.is_set():
+                    threshold *= BARGE_IN_ENERGY_FACTOR
+                if phrase is None:
+                    pre_roll.append(chunk)
+                    if energy > threshold:
+                        if self.barge_in and self._speaking.is_set():
+                            self.cancel_speech()
+                        phrase = self._open_phrase()
+                        for buffered in pre_roll:
+                            self._put_audio(('chunk', phrase, buffered))
+                        phrase_chunks = len(pre_roll)
+                        silent_chunks = 0
+                    continue
+                self._put_audio(('chunk', phrase, chunk))
+                phrase_chunks += 1
+                silent_chunks = silent_chunks + 1 if energy <= threshold else 0
+                if silent_chunks * chunk_seconds >= PAUSE_SECONDS or phrase_chunks * chunk_seconds >= PHRASE_TIME_LIMIT:
+                    self._put_audio(('end', phrase, time.monotonic(), self._turn))
+                    phrase = None
+                    pre_roll.clear()
+            if phrase is not None:
+                self._put_audio(('end', phrase, time.monotonic(), self._turn))
+        finally:
+            source.close()
+            self._put_audio(None)
+
+    def _calibrate(self, chunk_seconds):
+        """Sets the speech energy threshold from a short sample of ambient noise"""
+        energies = [pcm_rms(self.source.read_chunk(), self.source.SAMPLE_WIDTH)
+                    for _ in range(max(int(CALIBRATION_SECONDS / chunk_seconds), 1))]
+        self.energy_threshold = max(statistics.mean(energies) * 1.5, MIN_ENERGY_THRESHOLD)
+
+    def _open_phrase(self):
+        """Starts a recognition stream so partial text is available while the user speaks"""
+        return self.stt.open_stream(self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH, on_partial=self.on_partial_text)
+
+    def _recognize_loop(self):
+        while True:
+            item = self.audio_queue.get()
+            if item is None:
+                self._put(self.text_queue, None)
+                return
+            if item[0] == 'chunk':
+                _, stream, chunk = item
+                try:
+                    stream.feed(chunk)
+                except Exception as e:
+                    print(f"Speech recognition error: {e}")
+                continue
+            _, stream, speech_end, turn = item
+            start = time.monotonic()
+            with span('stt'):
+                try:
+                    text = stream.finish()
+                except sr.UnknownValueError:
+                    text = None
+                except Exception as e:
+                    print(f"Speech recognition error: {e}")
+                    text = None
+            # Time from end of speech to final transcript; streaming backends do most work earlier
+            self.metrics.record('stt', time.monotonic() - start)
+            if text:
+                print(f"You: {text}")
+                if self.on_user_text:
+                    self.on_user_text(text)
+                self._put(self.text_queue, (text, speech_end, turn, next(self._utterances)))
+
+    def _respond_loop(self):
+        while True:
+            item = self.text_queue.get()
+            if item is None:
+                self._put(self.speech_queue, None)
+                return
+            text, speech_end, turn, utterance = item
+            start = time.monotonic()
+            splitter = SentenceSplitter()
+            started = False
+            for delta in self.respond(text, self.previous_questions_and_answers):
+                if turn != self._turn:
+                    break  # The user talked over this reply
+                if not started:
+                    started = True
+                    self.metrics.record('llm_first_token', time.monotonic() - start)
+                    if self.on_response_start:
+                        self.on_response_start()
+                if self.on_response_delta:
+                    self.on_response_delta(delta)
+                for sentence in splitter.feed(delta):
+                    self._put(self.speech_queue, (sentence, speech_end, turn, utterance))
+            else:
+                for sentence in splitter.flush():
+                    self._put(self.speech_queue, (sentence, speech_end, turn, utterance))
+            self.metrics.record('llm', time.monotonic() - start)
+            if self.on_response_end:
+                self.on_response_end()
+
+    def _speak_loop(self):
+        last_utterance = None
+        while True:
+            item = self.speech_queue.get()
+            if item is None:
+                return
+            sentence, speech_end, turn, utterance = item
+            if turn != self._turn:
+                continue
+            start = time.monotonic()
+            if utterance != last_utterance:
+                last_utterance = utterance  # First sentence of this reply
+                self.metrics.record('end_to_end', start - speech_end)
+            self._speaking.set()
+            try:
+                self.speak_fn(sentence)
+            finally:
+                self._speaking.clear()
+            self.metrics.record('tts', time.monotonic() - start)
+
+    def _put_audio(self, item):
+        """Enqueues captured audio; live sources drop the oldest item instead of blocking capture.
+
+        Blocking here would stop reading the microphone, overflowing its buffer and
+        missing barge-in while IVA talks.
+        """
+        if not self.source.live:
+            self._put(self.audio_queue, item)
+            return
+        while True:
+            try:
+                self.audio_queue.put_nowait(item)
+                return
+            except queue.Full:
+                _drain(self.audio_queue, limit=1)
+
+    def _put(self, q, item):
+        """Enqueues an item, waiting for room so a slow stage applies back-pressure to the one before it"""
+        while True:
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                if not self._running.is_set() and item is not None:
+                    return  # Shutting down; drop work nobody will consume
+
+def _drain(q, limit=None):
+    """Removes up to limit items (all by default) from a queue without blocking"""
+    removed = 0
+    while limit is None or removed < limit:
+        try:
+            item = q.get_nowait()
+        except queue.Empty:
+            return
+        if item is None:
+            q.put_nowait(None)  # Keep shutdown sentinels
+            return
+        removed += 1
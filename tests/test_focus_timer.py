@@ -0,0 +1,116 @@
+"""Pause/resume, persistence and phase roll-over of modules.focus_timer with fake clocks.
+
+Run from the repository root: python -m unittest tests.test_focus_timer
+"""
+import os
+import tempfile
+import unittest
+from modules.focus_timer import BREAK, MIN_SECONDS, WORK, FocusTimer
+
+class FakeClock:
+    """Monotonic and wall clocks that only move when the test advances them"""
+
+    def __init__(self, wall=1_000_000.0):
+        self.now = 100.0
+        self.wall_now = wall
+
+    def monotonic(self):
+        return self.now
+
+    def wall(self):
+        return self.wall_now
+
+    def advance(self, seconds):
+        self.now += seconds
+        self.wall_now += seconds
+
+class FocusTimerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.state_path = os.path.join(tempfile.mkdtemp(), 'focus_session.json')
+
+    def timer(self, **kwargs):
+        kwargs.setdefault('state_path', self.state_path)
+        return FocusTimer(work_seconds=1500, break_seconds=300, clock=self.clock.monotonic,
+                          wall_clock=self.clock.wall, **kwargs)
+
+    def test_pause_freezes_and_resume_continues(self):
+        timer = self.timer()
+        self.assertTrue(timer.start())
+        self.assertFalse(timer.start())
+        self.clock.advance(100.25)
+        self.assertTrue(timer.pause())
+        self.assertEqual(timer.remaining(), 1399.75)
+        self.clock.advance(600)  # Time spent paused does not count
+        self.assertEqual(timer.remaining(), 1399.75)
+        self.assertEqual(timer.display_text(), "23:20")
+        timer.start()
+        self.clock.advance(399.75)
+        self.assertEqual(timer.remaining(), 1000)
+        self.assertEqual(timer.phase, WORK)
+
+    def test_adjust_only_while_paused_and_within_bounds(self):
+        timer = self.timer(state_path=None)
+        self.assertTrue(timer.adjust(-3000))
+        self.assertEqual(timer.remaining(), MIN_SECONDS)
+        timer.start()
+        self.assertFalse(timer.adjust(300))
+
+    def test_restart_continues_a_running_session(self):
+        self.timer().start()
+        self.clock.advance(300)
+        self.clock.now = 5.0  # A new process starts a new monotonic clock; only the wall clock carries over
+        restored = self.timer()
+        self.assertTrue(restored.running)
+        self.assertEqual(restored.phase, WORK)
+        self.assertEqual(restored.remaining(), 1200)
+
+    def test_restart_keeps_a_paused_session(self):
+        timer = self.timer()
+        timer.start()
+        self.clock.advance(500)
+        timer.pause()
+        self.clock.advance(3600)
+        restored = self.timer()
+        self.assertFalse(restored.running)
+        self.assertEqual(restored.remaining(), 1000)
+
+    def test_restart_skips_phases_that_ended_while_closed(self):
+        self.timer().start()
+        self.clock.advance(1500 + 60)  # Work ended a minute ago, so the break has 240 s left
+        restored = self.timer()
+        self.assertEqual(restored.phase, BREAK)
+        self.assertEqual(restored.remaining(), 240)
+        self.clock.advance(240 + 1500 + 10)  # Then the break and the next work phase went by too
+        restored = self.timer()
+        self.assertEqual(restored.phase, BREAK)
+        self.assertEqual(restored.remaining(), 290)
+
+    def test_phase_rolls_over_from_the_deadline(self):
+        phases = []
+        timer = self.timer(state_path=None, on_phase_end=lambda finished, following: phases.append((finished, following)))
+        timer.start()
+        self.clock.advance(1499.5)
+        self.assertIsNone(timer.tick())
+        self.assertEqual(timer.display_text(), "00:01")
+        self.clock.advance(2.5)  # The tick arrives two seconds late
+        self.assertEqual(timer.tick(), WORK)
+        self.assertEqual(timer.phase, BREAK)
+        self.assertEqual(timer.remaining(), 298)  # The late tick is not added to the break
+        self.clock.advance(298)
+        self.assertEqual(timer.tick(), BREAK)
+        self.assertEqual(timer.phase, WORK)
+        self.assertEqual(timer.remaining(), 1500)
+        self.assertEqual(phases, [(WORK, BREAK), (BREAK, WORK)])
+
+    def test_reset_returns_to_a_full_work_phase(self):
+        timer = self.timer()
+        timer.start()
+        self.clock.advance(1600)
+        timer.tick()
+        timer.reset()
+        self.assertEqual((timer.phase, timer.running, timer.remaining()), (WORK, False, 1500))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+"""Retry, timeout and latency histogram behaviour of modules.http_client against a local stub server.
+
+Run from the repository root: python -m unittest tests.test_http_client
+"""
+import threading
+import time
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from modules.http_client import HTTPClient, LatencyHistogram
+
+class StubServer:
+    """Answers each request with the next scripted (status, delay seconds), then with the last one"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/stub"
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _next(self):
+        with self._lock:
+            step = self.script[min(self.request_count, len(self.script) - 1)]
+            self.request_count += 1
+        return step
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                status, delay = server._next()
+                if delay:
+                    time.sleep(delay)
+                body = b"ok" if status == 200 else b""
+                try:
+                    self.send_response(status)
+                    if status in (429, 503):
+                        self.send_header('Retry-After', '0')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up waiting
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                self.do_GET()
+
+        return Handler
+
+class HTTPClientTest(unittest.TestCase):
+
+    def serve(self, *script):
+        server = StubServer(script).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def client(self, **kwargs):
+        kwargs.setdefault('backoff', 0)
+        client = HTTPClient(**kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def test_retries_503_until_success(self):
+        server = self.serve((503, 0), (503, 0), (200, 0))
+        client = self.client(retries=3)
+        response = client.get(server.url, endpoint='stub')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, "ok")
+        self.assertEqual(server.request_count, 3)
+        stats = client.stats()['stub']
+        self.assertEqual((stats['count'], stats['retries'], stats['errors']), (1, 2, 0))
+
+    def test_gives_up_after_repeated_429(self):
+        server = self.serve((429, 0))
+        client = self.client(retries=2)
+        response = client.get(server.url, endpoint='stub')
+        self.assertEqual(response.status_code, 429)  # Returned as-is once the retries are used up
+        self.assertEqual(server.request_count, 3)
+        stats = client.stats()['stub']
+        self.assertEqual((stats['count'], stats['retries'], stats['errors']), (1, 2, 1))
+
+    def test_post_is_not_retried_after_an_error_status(self):
+        server = self.serve((503, 0), (200, 0))
+        client = self.client(retries=3)
+        response = client.post(server.url, json={'text': "hello"}, endpoint='stub')
+        self.assertEqual(response.status_code, 503)  # The server may have acted on it already
+        self.assertEqual(server.request_count, 1)
+
+    def test_post_is_retried_when_the_connection_fails(self):
+        server = self.serve((200, 0))
+        client = self.client(retries=2)
+        attempts = []
+
+        def refuse(*args, **kwargs):
+            attempts.append(args)
+            raise ConnectionRefusedError("refused")
+
+        with mock.patch('urllib3.util.connection.create_connection', side_effect=refuse):
+            with self.assertRaises(requests.ConnectionError):
+                client.post(server.url, json={'text': "hello"}, endpoint='stub')
+        self.assertEqual(len(attempts), 3)  # Nothing reached the server, so resending is safe
+        self.assertEqual(server.request_count, 0)
+        self.assertEqual(client.stats()['stub']['errors'], 1)
+
+    def test_read_timeout_is_raised_without_retrying(self):
+        server = self.serve((200, 1.0))
+        client = self.client(timeout=(1, 0.2), retries=3)
+        start = time.perf_counter()
+        with self.assertRaises(requests.ReadTimeout):
+            client.get(server.url, endpoint='stub')
+        self.assertLess(time.perf_counter() - start, 0.9)
+        self.assertEqual(server.request_count, 1)  # A request the server may have processed is not resent
+        stats = client.stats()['stub']
+        self.assertEqual((stats['count'], stats['errors']), (0, 1))
+
+    def test_default_endpoint_is_method_host_and_path(self):
+        server = self.serve((200, 0))
+        client = self.client()
+        client.get(server.url + "?q=1")
+        host = server.url.split('/')[2]
+        self.assertEqual(list(client.stats()), [f"GET {host}/stub"])
+
+class LatencyHistogramTest(unittest.TestCase):
+
+    def test_percentiles_report_bucket_upper_bounds(self):
+        histogram = LatencyHistogram(bounds=(10, 100))
+        for ms in (1, 2, 3, 50, 500):
+            histogram.record(ms)
+        summary = histogram.summary()
+        self.assertEqual(summary['buckets'], {'<=10': 3, '<=100': 1, 'inf': 1})
+        self.assertEqual(summary['p50_ms'], 10)
+        self.assertEqual(summary['p95_ms'], 500)  # The overflow bucket reports the slowest request
+        self.assertEqual(summary['max_ms'], 500)
+        self.assertAlmostEqual(summary['mean_ms'], 111.2)
+
+    def test_empty_histogram(self):
+        summary = LatencyHistogram().summary()
+        self.assertEqual(summary['count'], 0)
+        self.assertIsNone(summary['mean_ms'])
+        self.assertIsNone(summary['p50_ms'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
-import requests
-import json
+# Run from the repository root: python -m tools.EL_Voices
+from modules.http_client import get_http_client
 
 XI_API_KEY = "ba51100a1f87c3c2f1361d44d9b082d7"  # Replace with your actual API key
 
@@ -10,7 +10,8 @@ headers = {
     "Content-Type": "application/json"
 }
 
-response = requests.get(url, headers=headers)
+response = get_http_client().get(url, headers=headers, endpoint="elevenlabs.voices")
+response.raise_for_status()
 data = response.json()
 
 for voice in data['voices']: